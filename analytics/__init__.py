@@ -0,0 +1,8 @@
+"""
+Sandman Analytics
+
+A regular package (unlike the other subsystem directories) so that running
+analytics/analytics.py or analytics/fleet.py as a script still imports the
+package: with the parent directory first on sys.path, a package with an
+__init__.py is found before the analytics.py module next to the script.
+"""
@@ -3,15 +3,38 @@
 Sandman Usage Analytics Tracker
 
 Tracks sandbox usage statistics, launch frequency, and usage patterns.
+Date and hour reports are answered from pre-aggregated rollups
+(analytics/rollups.py), so raw launches can expire after a retention
+period without losing history. Session length and memory percentiles come
+from mergeable quantile sketches (analytics/sketches.py). Optionally, heavy
+hitters (analytics/heavyhitters.py) bound the per-configuration and
+per-template statistics to fixed memory.
 """
 
+import heapq
+import itertools
 import json
 import os
+import sys
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional
 import uuid
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from analytics.heavyhitters import HeavyHitters, empty_heavy_hitters
+from analytics.rollups import LaunchRollups
+from analytics.sketches import (QuantileSketch, add_launch, empty_launch_sketches,
+                                encode_launch_sketches, launch_percentiles)
+from metrics.registry import ERRORS, record_json_io
+
+# With heavy hitters enabled, rollups and sketches count launches of names
+# outside the allow-list under this name
+OTHER = "(other)"
+
 
 class AnalyticsTracker:
     """Track and analyze Sandman usage statistics"""
@@ -26,15 +49,38 @@ class AnalyticsTracker:
             self.analytics_file = Path(workspace) / "analytics.json"
 
         self.data = self._load_data()
+        self._sketch_json: Dict = {}
+        self._percentiles = None
+        self._attach_aggregates()
+
+    def _attach_aggregates(self):
+        """Set up the rollups and sketches, building them from the stored
+        launches the first time a file without them is loaded"""
+        if "rollups" not in self.data:
+            self.rollups = LaunchRollups(self.data.setdefault("rollups", {}))
+            self.rollups.backfill(self.data["launches"])
+        else:
+            self.rollups = LaunchRollups(self.data["rollups"])
+
+        if "sketches" not in self.data:
+            self.data["sketches"] = empty_launch_sketches()
+            for launch in self.data["launches"]:
+                add_launch(self.data["sketches"], launch)
+
+        hitters = self.data.get("heavy_hitters")
+        self.heavy_hitters = HeavyHitters(hitters) if hitters is not None else None
 
     def _load_data(self) -> Dict:
         """Load analytics data from file"""
         if self.analytics_file.exists():
             try:
+                started = time.perf_counter()
                 with open(self.analytics_file, 'r') as f:
-                    return json.load(f)
+                    data = json.load(f)
+                    record_json_io("analytics", "load", f, started)
+                return data
             except (json.JSONDecodeError, IOError):
-                pass
+                ERRORS.inc(component="analytics", kind="load")
 
         # Initialize new analytics data structure
         return {
@@ -54,8 +100,20 @@ class AnalyticsTracker:
     def _save_data(self):
         """Save analytics data to file"""
         self.analytics_file.parent.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
         with open(self.analytics_file, 'w') as f:
-            json.dump(self.data, f, indent=2)
+            # Compact: json's C encoder is only used without indentation,
+            # and the rollups make this file large enough for that to matter
+            f.write(self._encode_data())
+            record_json_io("analytics", "save", f, started)
+
+    def _encode_data(self) -> str:
+        """analytics.json contents, with the sketches encoded last from the
+        per-configuration cache"""
+        encoded = json.dumps({key: value for key, value in self.data.items() if key != "sketches"},
+                             separators=(",", ":"))
+        sketches = encode_launch_sketches(self.data["sketches"], self._sketch_json)
+        return encoded[:-1] + ',"sketches":' + sketches + "}"
 
     def track_launch(self, config_name: str, template: Optional[str] = None,
                      memory_mb: int = 4096, duration_minutes: Optional[int] = None):
@@ -71,11 +129,28 @@ class AnalyticsTracker:
             "hour": datetime.now().hour
         }
 
-        # Add to launches list
+        # With heavy hitters enabled, only allow-listed names keep exact
+        # statistics; the rest are counted in fixed memory
+        hitters = self.heavy_hitters
+        exact_config = hitters is None or hitters.allowed(config_name)
+        exact_template = hitters is None or not template or hitters.allowed(template)
+        if hitters is not None:
+            hitters.record("configs", config_name, launch_event["timestamp"], duration_minutes or 0)
+            if template:
+                hitters.record("templates", template, launch_event["timestamp"])
+
+        # Add to launches list and rollups
         self.data["launches"].append(launch_event)
+        aggregate_event = launch_event
+        if not (exact_config and exact_template):
+            aggregate_event = dict(launch_event,
+                                   config_name=config_name if exact_config else OTHER,
+                                   template=template if exact_template else OTHER)
+        self.rollups.add(aggregate_event)
+        add_launch(self.data["sketches"], aggregate_event)
 
         # Update configuration stats
-        if config_name not in self.data["configurations"]:
+        if exact_config and config_name not in self.data["configurations"]:
             self.data["configurations"][config_name] = {
                 "launch_count": 0,
                 "total_runtime_minutes": 0,
@@ -83,14 +158,15 @@ class AnalyticsTracker:
                 "last_used": launch_event["timestamp"]
             }
 
-        config_stats = self.data["configurations"][config_name]
-        config_stats["launch_count"] += 1
-        config_stats["last_used"] = launch_event["timestamp"]
-        if duration_minutes:
-            config_stats["total_runtime_minutes"] += duration_minutes
+        if exact_config:
+            config_stats = self.data["configurations"][config_name]
+            config_stats["launch_count"] += 1
+            config_stats["last_used"] = launch_event["timestamp"]
+            if duration_minutes:
+                config_stats["total_runtime_minutes"] += duration_minutes
 
         # Update template stats
-        if template:
+        if template and exact_template:
             if template not in self.data["templates"]:
                 self.data["templates"][template] = {
                     "usage_count": 0,
@@ -113,24 +189,25 @@ class AnalyticsTracker:
         # Keep only last 1000 launches to prevent file bloat
         if len(self.data["launches"]) > 1000:
             self.data["launches"] = self.data["launches"][-1000:]
+        self.apply_retention()
 
         self._save_data()
 
+    def apply_retention(self, force: bool = False) -> Dict[str, int]:
+        """Expire raw launches and rollup buckets past their retention
+        (checked at most once a day unless forced). Returns the number of
+        launches and buckets dropped."""
+        return self.rollups.prune(self.data["launches"], force=force)
+
     def _update_most_used(self):
         """Update most used configuration and template"""
-        if self.data["configurations"]:
-            most_used_config = max(
-                self.data["configurations"].items(),
-                key=lambda x: x[1]["launch_count"]
-            )
-            self.data["statistics"]["most_used_config"] = most_used_config[0]
+        top_configs = self.get_top_configurations(1)
+        if top_configs:
+            self.data["statistics"]["most_used_config"] = top_configs[0]["name"]
 
-        if self.data["templates"]:
-            most_used_template = max(
-                self.data["templates"].items(),
-                key=lambda x: x[1]["usage_count"]
-            )
-            self.data["statistics"]["most_used_template"] = most_used_template[0]
+        top_templates = self.get_top_templates(1)
+        if top_templates:
+            self.data["statistics"]["most_used_template"] = top_templates[0]["name"]
 
     def get_statistics(self) -> Dict:
         """Get overall statistics"""
@@ -144,6 +221,17 @@ class AnalyticsTracker:
         else:
             stats["average_session_minutes"] = 0
 
+        # Percentiles show the long tail the average hides; they only
+        # change when a launch is counted
+        sketches = self.data["sketches"]
+        key = (sketches["duration_minutes"]["count"], sketches["memory_mb"]["count"])
+        if self._percentiles is None or self._percentiles[0] is not sketches or self._percentiles[1] != key:
+            self._percentiles = (sketches, key,
+                                 QuantileSketch(sketches["duration_minutes"]).quantiles(),
+                                 QuantileSketch(sketches["memory_mb"]).quantiles())
+        stats["session_minutes_percentiles"] = dict(self._percentiles[2])
+        stats["memory_mb_percentiles"] = dict(self._percentiles[3])
+
         # Add recent activity
         stats["last_7_days"] = self._get_recent_launches(7)
         stats["last_30_days"] = self._get_recent_launches(30)
@@ -152,70 +240,120 @@ class AnalyticsTracker:
 
     def _get_recent_launches(self, days: int) -> int:
         """Count launches in the last N days"""
-        cutoff = datetime.now() - timedelta(days=days)
-        count = 0
-
-        for launch in self.data["launches"]:
-            try:
-                launch_time = datetime.fromisoformat(launch["timestamp"])
-                if launch_time >= cutoff:
-                    count += 1
-            except (ValueError, KeyError):
-                continue
-
-        return count
+        return self.rollups.count(datetime.now() - timedelta(days=days))
 
     def get_config_stats(self, config_name: str) -> Optional[Dict]:
-        """Get statistics for a specific configuration"""
-        return self.data["configurations"].get(config_name)
+        """Get statistics for a specific configuration (an estimated launch
+        count for names outside the heavy-hitter allow-list)"""
+        stats = self.data["configurations"].get(config_name)
+        if stats is None and self.heavy_hitters is not None:
+            estimate = self.heavy_hitters.estimate("configs", config_name)
+            return estimate if estimate["launch_count"] else None
+        return stats
+
+    def get_percentiles(self, config_name: Optional[str] = None, start=None, end=None) -> Optional[Dict]:
+        """Session length and memory percentiles (count, mean, min, max,
+        p50/p90/p99), overall or for one configuration; with start/end, for
+        that range of whole days from the rollups (overall only)"""
+        if start is None and end is None:
+            return launch_percentiles(self.data["sketches"], config_name)
+        if config_name is not None:
+            raise ValueError("Percentiles for a date range are kept for all configurations together")
+        return {field: sketch.summary() for field, sketch in self.rollups.sketches(start, end).items()}
 
     def get_top_configurations(self, limit: int = 10) -> List[Dict]:
-        """Get top N most used configurations"""
-        configs = [
-            {"name": name, **stats}
-            for name, stats in self.data["configurations"].items()
-        ]
-        configs.sort(key=lambda x: x["launch_count"], reverse=True)
-        return configs[:limit]
+        """Get top N most used configurations. With heavy hitters enabled,
+        entries outside the allow-list are approximate ("approximate": True,
+        launch_count overestimated by at most "error")."""
+        exact = self.data["configurations"]
+        configs = ({"name": name, **stats} for name, stats in exact.items())
+        if self.heavy_hitters is not None:
+            configs = itertools.chain(configs, (
+                entry for entry in self.heavy_hitters.top("configs", limit + len(exact))
+                if entry["name"] not in exact))
+        return heapq.nlargest(limit, configs, key=lambda x: x["launch_count"])
 
     def get_top_templates(self, limit: int = 10) -> List[Dict]:
-        """Get top N most used templates"""
-        templates = [
-            {"name": name, **stats}
-            for name, stats in self.data["templates"].items()
-        ]
-        templates.sort(key=lambda x: x["usage_count"], reverse=True)
-        return templates[:limit]
-
-    def get_usage_by_date(self, days: int = 30) -> Dict[str, int]:
-        """Get launch counts by date for the last N days"""
-        cutoff = datetime.now() - timedelta(days=days)
-        usage_by_date = {}
-
-        for launch in self.data["launches"]:
-            try:
-                launch_time = datetime.fromisoformat(launch["timestamp"])
-                if launch_time >= cutoff:
-                    date = launch["date"]
-                    usage_by_date[date] = usage_by_date.get(date, 0) + 1
-            except (ValueError, KeyError):
-                continue
-
-        return dict(sorted(usage_by_date.items()))
-
-    def get_usage_by_hour(self) -> Dict[int, int]:
-        """Get launch counts by hour of day"""
-        usage_by_hour = {hour: 0 for hour in range(24)}
-
-        for launch in self.data["launches"]:
-            try:
-                hour = launch.get("hour")
-                if hour is not None:
-                    usage_by_hour[hour] += 1
-            except (ValueError, KeyError):
-                continue
-
-        return usage_by_hour
+        """Get top N most used templates (approximate outside the heavy-hitter
+        allow-list, as for configurations)"""
+        exact = self.data["templates"]
+        templates = ({"name": name, **stats} for name, stats in exact.items())
+        if self.heavy_hitters is not None:
+            templates = itertools.chain(templates, (
+                {"name": entry["name"], "usage_count": entry["launch_count"],
+                 "error": entry["error"], "approximate": True}
+                for entry in self.heavy_hitters.top("templates", limit + len(exact))
+                if entry["name"] not in exact))
+        return heapq.nlargest(limit, templates, key=lambda x: x["usage_count"])
+
+    def get_trending_configurations(self, limit: int = 10) -> List[Dict]:
+        """Configurations ranked by launches decayed with the heavy-hitter
+        half-life (empty unless heavy hitters are enabled)"""
+        return self.heavy_hitters.trending("configs", limit) if self.heavy_hitters else []
+
+    def get_trending_templates(self, limit: int = 10) -> List[Dict]:
+        """Templates ranked like get_trending_configurations"""
+        return self.heavy_hitters.trending("templates", limit) if self.heavy_hitters else []
+
+    def enable_heavy_hitters(self, allow: Optional[List[str]] = None, **settings) -> HeavyHitters:
+        """Switch to bounded-memory tracking: configurations and templates
+        outside the allow-list move from the exact maps into the heavy-hitter
+        counters (settings: capacity, half_life_days, width, depth).
+        Enabling again changes the allow-list only."""
+        if self.heavy_hitters is None:
+            self.data["heavy_hitters"] = empty_heavy_hitters(allow=allow, **settings)
+            self.heavy_hitters = HeavyHitters(self.data["heavy_hitters"])
+        elif settings:
+            raise ValueError("Heavy hitters are already enabled; disable them to change settings")
+        elif allow:
+            self.heavy_hitters.allow(allow)
+        self._fold_into_heavy_hitters()
+        return self.heavy_hitters
+
+    def _fold_into_heavy_hitters(self):
+        """Move exact statistics of names outside the allow-list into the
+        heavy-hitter counters, oldest last use first"""
+        hitters = self.heavy_hitters
+        for kind, key, count_key in (("configs", "configurations", "launch_count"),
+                                     ("templates", "templates", "usage_count")):
+            exact = self.data[key]
+            folded = sorted((name for name in exact if not hitters.allowed(name)),
+                            key=lambda name: exact[name]["last_used"])
+            for name in folded:
+                stats = exact.pop(name)
+                if stats[count_key]:
+                    hitters.record(kind, name, stats["last_used"],
+                                   stats.get("total_runtime_minutes", 0), count=stats[count_key])
+
+    def disallow_heavy_hitters(self, names: List[str]):
+        """Remove names from the allow-list; their exact statistics are
+        folded into the heavy-hitter counters"""
+        if self.heavy_hitters is None:
+            raise ValueError("Heavy hitters are not enabled")
+        self.heavy_hitters.disallow(names)
+        self._fold_into_heavy_hitters()
+
+    def disable_heavy_hitters(self):
+        """Return to exact statistics for every name. Counts held only by
+        the heavy hitters are dropped."""
+        self.data.pop("heavy_hitters", None)
+        self.heavy_hitters = None
+
+    def get_usage_by_date(self, days: int = 30, start=None, end=None) -> Dict[str, int]:
+        """Get launch counts by date for the last N days, or for [start, end)
+        (datetimes or ISO strings; end defaults to now)"""
+        if start is None:
+            start = datetime.now() - timedelta(days=days)
+        return self.rollups.by_date(start, end)
+
+    def get_usage_by_hour(self, start=None, end=None) -> Dict[int, int]:
+        """Get launch counts by hour of day, over all history or [start, end)"""
+        return self.rollups.by_hour(start, end)
+
+    def get_usage_summary(self, start=None, end=None) -> Dict:
+        """Launches, runtime, memory distribution and per-configuration and
+        per-template counts for [start, end), from the rollups"""
+        return self.rollups.summarize(start, end)
 
     def get_summary_report(self) -> str:
         """Generate a human-readable summary report"""
@@ -235,6 +373,10 @@ class AnalyticsTracker:
         report.append(f"Total Launches:          {stats['total_launches']}")
         report.append(f"Total Runtime:           {stats['total_runtime_minutes']} minutes")
         report.append(f"Average Session:         {stats['average_session_minutes']} minutes")
+        session = stats["session_minutes_percentiles"]
+        if session["p50"] is not None:
+            report.append(f"Session p50/p90/p99:     {session['p50']} / {session['p90']} / "
+                          f"{session['p99']} minutes")
         report.append(f"Last 7 Days:             {stats['last_7_days']} launches")
         report.append(f"Last 30 Days:            {stats['last_30_days']} launches")
         report.append("")
@@ -245,7 +387,7 @@ class AnalyticsTracker:
         if top_configs:
             for i, config in enumerate(top_configs, 1):
                 report.append(f"{i}. {config['name']}")
-                report.append(f"   Launches: {config['launch_count']} | "
+                report.append(f"   Launches: {config['launch_count']}{self._error_note(config)} | "
                             f"Runtime: {config['total_runtime_minutes']} min")
         else:
             report.append("No configurations used yet")
@@ -257,7 +399,7 @@ class AnalyticsTracker:
         if top_templates:
             for i, template in enumerate(top_templates, 1):
                 report.append(f"{i}. {template['name']}")
-                report.append(f"   Usage: {template['usage_count']} times")
+                report.append(f"   Usage: {template['usage_count']} times{self._error_note(template)}")
         else:
             report.append("No templates used yet")
         report.append("")
@@ -265,6 +407,12 @@ class AnalyticsTracker:
         report.append("=" * 60)
         return "\n".join(report)
 
+    @staticmethod
+    def _error_note(entry: Dict) -> str:
+        if entry.get("approximate") and entry["error"]:
+            return f" (approx., at most {entry['error']} high)"
+        return ""
+
     def export_to_csv(self, output_file: str):
         """Export launch data to CSV"""
         import csv
@@ -286,6 +434,19 @@ class AnalyticsTracker:
                     'hour': launch.get('hour', '')
                 })
 
+    def export_to_jsonl(self, output_file: str, since: Optional[str] = None) -> int:
+        """Export launch events as JSON lines, oldest first (the format fleet
+        aggregation reads). since is an ISO timestamp; only later launches are
+        written. Returns the number of events written."""
+        written = 0
+        with open(output_file, 'w', encoding='utf-8') as f:
+            for launch in self.data["launches"]:
+                if since and launch.get("timestamp", "") <= since:
+                    continue
+                f.write(json.dumps(launch) + "\n")
+                written += 1
+        return written
+
     def clear_data(self, confirm: bool = False):
         """Clear all analytics data (requires confirmation)"""
         if not confirm:
@@ -304,17 +465,18 @@ class AnalyticsTracker:
                 "most_used_template": None
             }
         }
+        self._attach_aggregates()
         self._save_data()
 
 
 # CLI interface
-if __name__ == "__main__":
-    import sys
-
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point (also used by `sandman analytics`)"""
+    argv = sys.argv[1:] if argv is None else argv
     tracker = AnalyticsTracker()
 
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
+    if argv:
+        command = argv[0].lower()
 
         if command == "report":
             print(tracker.get_summary_report())
@@ -323,22 +485,142 @@ if __name__ == "__main__":
             stats = tracker.get_statistics()
             print(json.dumps(stats, indent=2))
 
-        elif command == "track" and len(sys.argv) >= 3:
-            config_name = sys.argv[2]
-            template = sys.argv[3] if len(sys.argv) > 3 else None
+        elif command == "track" and len(argv) >= 2:
+            config_name = argv[1]
+            template = argv[2] if len(argv) > 2 else None
             tracker.track_launch(config_name, template=template)
             print(f"✓ Tracked launch of '{config_name}'")
 
-        elif command == "export" and len(sys.argv) >= 3:
-            output_file = sys.argv[2]
+        elif command == "export" and len(argv) >= 2:
+            output_file = argv[1]
             tracker.export_to_csv(output_file)
             print(f"✓ Exported to '{output_file}'")
 
+        elif command == "export-jsonl" and len(argv) >= 2:
+            output_file = argv[1]
+            since = argv[2] if len(argv) > 2 else None
+            count = tracker.export_to_jsonl(output_file, since)
+            print(f"✓ Exported {count} launches to '{output_file}'")
+
+        elif command == "usage":
+            start = argv[1] if len(argv) > 1 else None
+            end = argv[2] if len(argv) > 2 else None
+            try:
+                summary = tracker.get_usage_summary(start, end)
+            except ValueError as e:
+                print(f"✗ {e}")
+                return 2
+            summary["by_date"] = tracker.rollups.by_date(start, end)
+            summary["percentiles"] = tracker.get_percentiles(start=start, end=end)
+            print(json.dumps(summary, indent=2))
+
+        elif command == "percentiles":
+            config_name = argv[1] if len(argv) > 1 else None
+            percentiles = tracker.get_percentiles(config_name)
+            if percentiles is None:
+                print(f"✗ No launches recorded for '{config_name}'")
+                return 1
+            print(json.dumps(percentiles, indent=2))
+
+        elif command == "retention":
+            try:
+                changes = {}
+                for arg in argv[1:]:
+                    tier, _, days = arg.partition("=")
+                    changes[tier] = None if days in ("", "none", "forever") else int(days)
+                tracker.rollups.set_retention(**changes)
+            except ValueError as e:
+                print(f"✗ {e}")
+                return 2
+            if changes:
+                dropped = tracker.apply_retention(force=True)
+                tracker._save_data()
+                print(f"✓ Retention updated; dropped {dropped['raw']} launches and "
+                      f"{dropped['hour'] + dropped['day'] + dropped['month']} buckets")
+            print(json.dumps(tracker.rollups.stats(), indent=2))
+
+        elif command == "backfill" and len(argv) >= 2:
+            from analytics.fleet import iter_events
+            try:
+                added = tracker.rollups.backfill(iter_events(Path(argv[1])))
+            except (OSError, ValueError) as e:
+                print(f"✗ Could not read '{argv[1]}': {e}")
+                return 1
+            tracker._save_data()
+            print(f"✓ Backfilled {added} older launches into the rollups")
+
+        elif command in ("top", "trending"):
+            limit = int(argv[1]) if len(argv) > 1 and argv[1].isdigit() else 10
+            if command == "top":
+                result = {"configurations": tracker.get_top_configurations(limit),
+                          "templates": tracker.get_top_templates(limit)}
+            elif tracker.heavy_hitters is None:
+                print("✗ Trending needs heavy hitters: python analytics.py heavy-hitters enable")
+                return 1
+            else:
+                result = {"configurations": tracker.get_trending_configurations(limit),
+                          "templates": tracker.get_trending_templates(limit)}
+            print(json.dumps(result, indent=2))
+
+        elif command == "heavy-hitters":
+            action = argv[1].lower() if len(argv) > 1 else "status"
+            names = [arg for arg in argv[2:] if "=" not in arg]
+            try:
+                if action == "enable":
+                    settings = {}
+                    for arg in argv[2:]:
+                        key, sep, value = arg.partition("=")
+                        if sep:
+                            key = {"half_life": "half_life_days"}.get(key, key)
+                            if key not in ("capacity", "half_life_days", "width", "depth"):
+                                raise ValueError(f"Unknown setting: {key}")
+                            settings[key] = float(value) if key == "half_life_days" else int(value)
+                    tracker.enable_heavy_hitters(names, **settings)
+                    print("✓ Heavy hitters enabled")
+                elif action == "allow" and names:
+                    if tracker.heavy_hitters is None:
+                        raise ValueError("Heavy hitters are not enabled")
+                    tracker.enable_heavy_hitters(names)
+                    print(f"✓ Exact statistics kept for {', '.join(names)}")
+                elif action == "disallow" and names:
+                    tracker.disallow_heavy_hitters(names)
+                    print(f"✓ {', '.join(names)} counted by the heavy hitters")
+                elif action == "disable":
+                    tracker.disable_heavy_hitters()
+                    print("✓ Heavy hitters disabled; every name keeps exact statistics again")
+                elif action != "status":
+                    raise ValueError(f"Unknown heavy-hitters command: {action}")
+            except ValueError as e:
+                print(f"✗ {e}")
+                return 2
+            if action != "status":
+                tracker._save_data()
+            if tracker.heavy_hitters is None:
+                print("Heavy hitters: disabled (exact statistics for every name)")
+            else:
+                print(json.dumps(tracker.heavy_hitters.stats(), indent=2))
+
         else:
             print("Usage:")
             print("  python analytics.py report          - Show summary report")
             print("  python analytics.py stats           - Show statistics JSON")
             print("  python analytics.py track <name>    - Track a launch")
             print("  python analytics.py export <file>   - Export to CSV")
+            print("  python analytics.py export-jsonl <file> [since] - Export launches as JSON lines")
+            print("  python analytics.py usage [start] [end]         - Usage summary for a date range")
+            print("  python analytics.py percentiles [config]        - Session length and memory percentiles")
+            print("  python analytics.py retention [tier=days ...]   - Show or set retention (raw, hour, day, month)")
+            print("  python analytics.py backfill <file>             - Add older history to the rollups")
+            print("  python analytics.py top [n]                     - Top configurations and templates")
+            print("  python analytics.py trending [n]                - Trending (time-decayed) top")
+            print("  python analytics.py heavy-hitters [enable [names] [capacity=N half_life=D] | "
+                  "allow <names> | disallow <names> | disable]")
+            return 2
     else:
         print(tracker.get_summary_report())
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
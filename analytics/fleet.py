@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Sandman Fleet Analytics
+
+Aggregates the launch history of many hosts. Each host is a directory
+holding its analytics.json (the AnalyticsTracker store) and/or JSON-lines
+exports (`analytics.py export-jsonl`). Every source is streamed in
+timestamp order and the sources are combined with a k-way merge, so memory
+does not grow with the number of events:
+
+- At most fan_in sources are open at once. With more hosts, groups of
+  fan_in sources are merged into sorted spill files first, and the spill
+  files are merged in turn.
+- A copy of an event has the same timestamp as the original, so after the
+  merge duplicates are adjacent: events are deduplicated by id while only
+  remembering the ids of the current timestamp.
+- The aggregates (per configuration, template, host, day and hour, and
+  quantile sketches of session length and memory overall and per
+  configuration) grow with the number of distinct names, hosts and days,
+  not with events.
+
+The aggregates and a watermark per host (its latest timestamp and the ids
+seen at it) can be kept in a state file. The next run then reads only
+events newer than each host's watermark and adds them to the stored
+aggregates. Events that arrive later with older timestamps are not picked
+up until a --full rebuild.
+
+Usage:
+    python analytics/fleet.py hosts/host-a hosts/host-b
+    python analytics/fleet.py --hosts-dir hosts --state fleet-state.json
+    python analytics/fleet.py --hosts-dir hosts --state fleet-state.json --full --json
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from analytics.sketches import add_launch, empty_launch_sketches, launch_percentiles
+from metrics.registry import ERRORS
+
+
+DEFAULT_FAN_IN = 64
+STATE_VERSION = 2
+STORE_NAME = "analytics.json"
+EXPORT_SUFFIX = ".jsonl"
+
+_CHUNK = 1 << 16
+_LAUNCHES = re.compile(r'"launches"\s*:\s*\[')
+_SEPARATORS = re.compile(r'[\s,]*')
+
+
+# ----------------------------------------------------------------------
+# Reading sources
+# ----------------------------------------------------------------------
+
+def _iter_store(path: Path) -> Iterator[Dict]:
+    """Stream the "launches" array of an analytics.json without loading the
+    rest of the document"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(_CHUNK)
+        match = _LAUNCHES.search(buffer)
+        if match is None:
+            # Not written by AnalyticsTracker (launches come later): load it whole
+            f.seek(0)
+            yield from json.load(f).get("launches", [])
+            return
+
+        position = match.end()
+        while True:
+            position = _SEPARATORS.match(buffer, position).end()
+            if position < len(buffer):
+                if buffer[position] == "]":
+                    return
+                try:
+                    event, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    end = None  # the event continues in the next chunk
+                if end is not None:
+                    yield event
+                    position = end
+                    continue
+
+            more = f.read(_CHUNK)
+            if not more:
+                if position < len(buffer):
+                    raise ValueError(f"{path}: truncated launches array")
+                return
+            buffer = buffer[position:] + more
+            position = 0
+
+
+def iter_events(path: Path) -> Iterator[Dict]:
+    """Stream launch events from an analytics.json store or a JSON-lines export"""
+    path = Path(path)
+    if path.suffix == EXPORT_SUFFIX:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        yield from _iter_store(path)
+
+
+def discover_sources(hosts: List[Path]) -> List[Tuple[str, Path]]:
+    """(host, file) pairs for host directories (or single analytics files,
+    named after their parent directory)"""
+    sources = []
+    for host in hosts:
+        host = Path(host)
+        if host.is_file():
+            sources.append((host.parent.name or host.stem, host))
+            continue
+        if (host / STORE_NAME).is_file():
+            sources.append((host.name, host / STORE_NAME))
+        for path in sorted(host.glob(f"*{EXPORT_SUFFIX}")):
+            sources.append((host.name, path))
+    return sources
+
+
+def hosts_in(directory: Path) -> List[Path]:
+    """Every subdirectory of a directory, one per host"""
+    return sorted(path for path in Path(directory).iterdir() if path.is_dir())
+
+
+# ----------------------------------------------------------------------
+# Merging
+# ----------------------------------------------------------------------
+
+class _Counters:
+    """Per-run counts shared by the source streams"""
+
+    def __init__(self):
+        self.read = 0
+        self.skipped = 0
+        self.invalid = 0
+        self.out_of_order = 0
+        self.sequence = itertools.count()
+
+
+def _source_stream(host: str, path: Path, watermark: Optional[Dict],
+                   counters: _Counters) -> Iterator[Tuple]:
+    """(timestamp, sequence, host, event) for a source's events past the
+    host's watermark. The file is opened on the first next(), so only the
+    streams being merged hold open files."""
+    since = watermark["timestamp"] if watermark else None
+    seen_at_since = set(watermark["ids"]) if watermark else set()
+    last = None
+    try:
+        for event in iter_events(path):
+            timestamp = event.get("timestamp") if isinstance(event, dict) else None
+            if not isinstance(timestamp, str):
+                counters.invalid += 1
+                continue
+            counters.read += 1
+            if since is not None and (timestamp < since or
+                                      (timestamp == since and event.get("id") in seen_at_since)):
+                counters.skipped += 1
+                continue
+            if last is not None and timestamp < last:
+                counters.out_of_order += 1
+            last = timestamp
+            yield timestamp, next(counters.sequence), host, event
+    except (OSError, ValueError) as e:
+        ERRORS.inc(component="fleet", kind="read")
+        print(f"✗ {path}: {e}", file=sys.stderr)
+
+
+def _dedupe(merged: Iterator[Tuple], stats: Dict,
+            on_duplicate: Optional[Callable[[str, str, object], None]] = None) -> Iterator[Tuple]:
+    """Drop events whose id was already seen at the same timestamp,
+    calling on_duplicate(host, timestamp, id) for each one dropped"""
+    current = None
+    seen = set()
+    for item in merged:
+        timestamp, event = item[0], item[3]
+        if timestamp != current:
+            current = timestamp
+            seen = set()
+        event_id = event.get("id")
+        if event_id is not None:
+            if event_id in seen:
+                stats["duplicates"] += 1
+                if on_duplicate is not None:
+                    on_duplicate(item[2], timestamp, event_id)
+                continue
+            seen.add(event_id)
+        yield item
+
+
+def _spill_stream(path: Path, counters: _Counters) -> Iterator[Tuple]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            timestamp, host, event = json.loads(line)
+            yield timestamp, next(counters.sequence), host, event
+
+
+def merge_sources(sources: List[Tuple[str, Path]], watermarks: Optional[Dict] = None,
+                  fan_in: int = DEFAULT_FAN_IN, spill_dir: Optional[Path] = None,
+                  stats: Optional[Dict] = None,
+                  on_duplicate: Optional[Callable[[str, str, object], None]] = None
+                  ) -> Iterator[Tuple[str, str, Dict]]:
+    """Yield (timestamp, host, event) for every source, in timestamp order,
+    without duplicates (on_duplicate is called with the host, timestamp
+    and id of each copy dropped).
+
+    Sources are expected to be in time order, as AnalyticsTracker writes
+    them (out-of-order events are counted in stats["out_of_order"] and
+    still merged, but may defeat deduplication). With more than fan_in
+    sources, intermediate merges are spilled to files in spill_dir.
+    """
+    fan_in = max(2, fan_in)
+    watermarks = watermarks or {}
+    stats = stats if stats is not None else {}
+    stats.setdefault("duplicates", 0)
+    counters = _Counters()
+
+    streams = [_source_stream(host, path, watermarks.get(host), counters)
+               for host, path in sources]
+
+    with tempfile.TemporaryDirectory(dir=spill_dir, prefix="sandman-fleet-") as tmp:
+        level = 0
+        while len(streams) > fan_in:
+            spilled = []
+            for start in range(0, len(streams), fan_in):
+                path = Path(tmp) / f"merge-{level}-{start // fan_in}{EXPORT_SUFFIX}"
+                with open(path, 'w', encoding='utf-8') as f:
+                    for timestamp, _, host, event in _dedupe(
+                            heapq.merge(*streams[start:start + fan_in]), stats, on_duplicate):
+                        f.write(json.dumps([timestamp, host, event], separators=(",", ":")) + "\n")
+                spilled.append(_spill_stream(path, counters))
+            streams = spilled
+            level += 1
+        stats["spill_levels"] = level
+
+        for timestamp, _, host, event in _dedupe(heapq.merge(*streams), stats, on_duplicate):
+            yield timestamp, host, event
+
+    stats.update({"read": counters.read, "skipped": counters.skipped,
+                  "invalid": counters.invalid, "out_of_order": counters.out_of_order})
+
+
+# ----------------------------------------------------------------------
+# Aggregation
+# ----------------------------------------------------------------------
+
+def empty_state() -> Dict:
+    """Aggregates with nothing counted yet"""
+    return {
+        "version": STATE_VERSION,
+        "updated": None,
+        "watermarks": {},
+        "total_launches": 0,
+        "total_runtime_minutes": 0,
+        "configurations": {},
+        "templates": {},
+        "hosts": {},
+        "days": {},
+        "hours": [0] * 24,
+        "sketches": empty_launch_sketches()
+    }
+
+
+def _add_event(state: Dict, timestamp: str, host: str, event: Dict):
+    runtime = event.get("duration_minutes") or 0
+    state["total_launches"] += 1
+    state["total_runtime_minutes"] += runtime
+
+    name = event.get("config_name")
+    if name:
+        stats = state["configurations"].get(name)
+        if stats is None:
+            stats = state["configurations"][name] = {
+                "launch_count": 0, "total_runtime_minutes": 0,
+                "first_used": timestamp, "last_used": timestamp}
+        stats["launch_count"] += 1
+        stats["total_runtime_minutes"] += runtime
+        stats["last_used"] = max(stats["last_used"], timestamp)
+
+    template = event.get("template")
+    if template:
+        stats = state["templates"].get(template)
+        if stats is None:
+            stats = state["templates"][template] = {
+                "usage_count": 0, "first_used": timestamp, "last_used": timestamp}
+        stats["usage_count"] += 1
+        stats["last_used"] = max(stats["last_used"], timestamp)
+
+    stats = state["hosts"].get(host)
+    if stats is None:
+        stats = state["hosts"][host] = {
+            "launch_count": 0, "total_runtime_minutes": 0,
+            "first_seen": timestamp, "last_seen": timestamp}
+    stats["launch_count"] += 1
+    stats["total_runtime_minutes"] += runtime
+    stats["last_seen"] = max(stats["last_seen"], timestamp)
+
+    day = timestamp[:10]
+    state["days"][day] = state["days"].get(day, 0) + 1
+    hour = event.get("hour")
+    if not isinstance(hour, int) or not 0 <= hour < 24:
+        try:
+            hour = int(timestamp[11:13])
+        except ValueError:
+            hour = None
+    if hour is not None:
+        state["hours"][hour] += 1
+    add_launch(state["sketches"], event)
+    _advance_watermark(state, host, timestamp, event.get("id"))
+
+
+def _advance_watermark(state: Dict, host: str, timestamp: str, event_id):
+    """Mark a host's event as read, whether it was counted or dropped as a
+    duplicate of another host's copy (otherwise the next run would re-read
+    that copy and count it)"""
+    watermark = state["watermarks"].get(host)
+    if watermark is None or timestamp > watermark["timestamp"]:
+        state["watermarks"][host] = {"timestamp": timestamp, "ids": [event_id]}
+    elif timestamp == watermark["timestamp"]:
+        watermark["ids"].append(event_id)
+
+
+def aggregate(sources: List[Tuple[str, Path]], state: Optional[Dict] = None,
+              fan_in: int = DEFAULT_FAN_IN, spill_dir: Optional[Path] = None) -> Tuple[Dict, Dict]:
+    """Merge sources into state (a fresh one by default).
+
+    Events at or before a host's watermark in state are skipped, so passing
+    the state of the previous run only reads what is new. Returns the
+    updated state and this run's counts (read, merged, skipped, duplicates,
+    invalid, out_of_order, spill_levels, seconds).
+    """
+    started = time.perf_counter()
+    state = state if state is not None else empty_state()
+    stats = {"merged": 0}
+    def on_duplicate(host: str, timestamp: str, event_id):
+        _advance_watermark(state, host, timestamp, event_id)
+
+    for timestamp, host, event in merge_sources(sources, state["watermarks"], fan_in,
+                                                spill_dir, stats, on_duplicate):
+        _add_event(state, timestamp, host, event)
+        stats["merged"] += 1
+    state["updated"] = datetime.now().isoformat()
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return state, stats
+
+
+def load_state(path: Path) -> Dict:
+    """Read a state file; a missing or unreadable one starts from scratch"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return empty_state()
+
+
+def save_state(state: Dict, path: Path):
+    """Write a state file atomically"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def fleet_report(state: Dict, top: int = 10, days: Optional[int] = None) -> Dict:
+    """Fleet-wide view of the aggregates: top configurations and templates,
+    the per-host breakdown and launches per day (the last `days` days that
+    have data, or all)"""
+    configs = sorted(({"name": name, **stats} for name, stats in state["configurations"].items()),
+                     key=lambda item: (-item["launch_count"], item["name"]))
+    templates = sorted(({"name": name, **stats} for name, stats in state["templates"].items()),
+                       key=lambda item: (-item["usage_count"], item["name"]))
+    hosts = sorted(({"name": name, **stats} for name, stats in state["hosts"].items()),
+                   key=lambda item: (-item["launch_count"], item["name"]))
+    overall = launch_percentiles(state["sketches"])
+    for config in configs[:top]:
+        percentiles = launch_percentiles(state["sketches"], config["name"])
+        if percentiles is not None:
+            config["session_minutes"] = percentiles["duration_minutes"]
+
+    per_day = dict(sorted(state["days"].items()))
+    if days is not None and per_day:
+        last = datetime.fromisoformat(max(per_day))
+        cutoff = (last - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        per_day = {day: count for day, count in per_day.items() if day >= cutoff}
+
+    return {
+        "hosts": len(state["hosts"]),
+        "total_launches": state["total_launches"],
+        "total_runtime_minutes": state["total_runtime_minutes"],
+        "session_minutes": overall["duration_minutes"],
+        "memory_mb": overall["memory_mb"],
+        "top_configurations": configs[:top],
+        "top_templates": templates[:top],
+        "per_host": hosts,
+        "per_day": per_day,
+        "per_hour": dict(enumerate(state["hours"])),
+        "updated": state["updated"]
+    }
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+
+def print_report(report: Dict, stats: Dict, top: int):
+    print(f"🌐 Fleet analytics: {report['hosts']} hosts, {report['total_launches']} launches, "
+          f"{report['total_runtime_minutes']} runtime minutes")
+    print(f"  This run: {stats['merged']} new events merged, {stats['skipped']} already counted, "
+          f"{stats['duplicates']} duplicates in {stats['seconds']}s")
+    session = report["session_minutes"]
+    if session["count"]:
+        print(f"  Sessions: p50 {session['p50']}, p90 {session['p90']}, p99 {session['p99']} minutes "
+              f"(mean {session['mean']})")
+    if stats["invalid"] or stats["out_of_order"]:
+        print(f"  ✗ {stats['invalid']} events without a timestamp, "
+              f"{stats['out_of_order']} out of time order")
+
+    print("\n🏆 TOP CONFIGURATIONS")
+    for i, config in enumerate(report["top_configurations"], 1):
+        p90 = config.get("session_minutes", {}).get("p90")
+        print(f"  {i}. {config['name']}: {config['launch_count']} launches, "
+              f"{config['total_runtime_minutes']} min" + (f", p90 session {p90} min" if p90 else ""))
+    print("\n📦 TOP TEMPLATES")
+    for i, template in enumerate(report["top_templates"], 1):
+        print(f"  {i}. {template['name']}: {template['usage_count']} launches")
+    print("\n🖥  HOSTS")
+    for host in report["per_host"][:top]:
+        print(f"  {host['name']}: {host['launch_count']} launches, last {host['last_seen'][:16]}")
+    if len(report["per_host"]) > top:
+        print(f"  … {len(report['per_host']) - top} more (use --json)")
+    if report["per_day"]:
+        print("\n📅 LAUNCHES PER DAY")
+        peak = max(report["per_day"].values())
+        for day, count in report["per_day"].items():
+            print(f"  {day} {'█' * max(1, round(count * 40 / peak))} {count}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point (also used by `sandman fleet`)"""
+    parser = argparse.ArgumentParser(prog="sandman.py fleet",
+                                     description="Aggregate analytics from many hosts")
+    parser.add_argument("hosts", nargs="*", help="host directories (or analytics files)")
+    parser.add_argument("--hosts-dir", help="directory with one subdirectory per host")
+    parser.add_argument("--state", help="state file for incremental runs")
+    parser.add_argument("--full", action="store_true", help="ignore the state file's watermarks and rebuild")
+    parser.add_argument("--fan-in", type=int, default=DEFAULT_FAN_IN,
+                        help=f"sources merged at once (default {DEFAULT_FAN_IN})")
+    parser.add_argument("--top", type=int, default=10, help="entries per top list (default 10)")
+    parser.add_argument("--days", type=int, default=14, help="days in the per-day histogram (default 14)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    hosts = [Path(host) for host in args.hosts]
+    if args.hosts_dir:
+        hosts.extend(hosts_in(Path(args.hosts_dir)))
+    sources = discover_sources(hosts)
+    if not sources:
+        print("✗ No analytics found (give host directories or --hosts-dir)")
+        return 2
+
+    state = load_state(Path(args.state)) if args.state and not args.full else None
+    state, stats = aggregate(sources, state, args.fan_in)
+    if args.state:
+        save_state(state, Path(args.state))
+
+    report = fleet_report(state, args.top, args.days)
+    if args.json:
+        print(json.dumps(dict(report, run=stats), indent=2))
+    else:
+        print_report(report, stats, args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
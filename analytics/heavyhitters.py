@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Sandman Heavy Hitters
+
+Bounded-memory tracking of the most launched configurations and templates,
+for workspaces whose configuration names are generated per run and would
+otherwise make the `configurations` and `templates` maps in analytics.json
+grow forever. Once enabled, AnalyticsTracker keeps exact statistics only for
+an allow-list of names; every other name goes into fixed-size structures:
+
+- Space-Saving keeps `capacity` counters. A name that is not tracked takes
+  over the smallest counter and inherits its count as its error, so a
+  reported count overestimates the true one by at most `error`, and
+  error <= launches / capacity. Every name launched more often than that
+  is guaranteed to be tracked.
+- A Count-Min sketch (`depth` rows of `width` counters) estimates the
+  launch count of any name, tracked or not: never below the true count,
+  and above it by at most e/width of all launches with probability
+  1 - e^-depth. Top lists report the lower of the two upper bounds.
+- A second Space-Saving with forward decay ranks "trending" names: a
+  launch at time t adds 2^((t - landmark) / half_life), so comparing
+  counters compares exponentially decayed counts without ever touching
+  the other counters. Counters are rescaled when the weights grow large.
+
+Memory is O(capacity + width * depth) per kind, whatever the number of
+distinct names.
+"""
+
+import hashlib
+import math
+from datetime import datetime
+from typing import Dict, List, Optional
+
+DEFAULT_CAPACITY = 100
+DEFAULT_HALF_LIFE_DAYS = 7.0
+DEFAULT_WIDTH = 1024
+DEFAULT_DEPTH = 4
+
+KINDS = ("configs", "templates")
+
+# Rescale the trending counters once a weight exceeds 2^_MAX_EXPONENT
+_MAX_EXPONENT = 64
+
+
+def _days(timestamp: str) -> float:
+    """Timestamp as fractional days since the epoch"""
+    return datetime.fromisoformat(timestamp).timestamp() / 86400
+
+
+def empty_heavy_hitters(capacity: int = DEFAULT_CAPACITY,
+                        half_life_days: float = DEFAULT_HALF_LIFE_DAYS,
+                        width: int = DEFAULT_WIDTH, depth: int = DEFAULT_DEPTH,
+                        allow: Optional[List[str]] = None) -> Dict:
+    """Heavy-hitter state as stored in analytics.json"""
+    if capacity < 1 or width < 1 or not 1 <= depth <= 8:
+        raise ValueError("capacity and width must be at least 1 and depth between 1 and 8")
+    if half_life_days <= 0:
+        raise ValueError("half_life_days must be positive")
+    return {
+        "capacity": capacity,
+        "half_life_days": half_life_days,
+        "width": width,
+        "depth": depth,
+        "allow": sorted(set(allow or [])),
+        "landmark": None,
+        **{kind: {"launches": 0, "top": {}, "trending": {},
+                  "cms": [[0] * width for _ in range(depth)]} for kind in KINDS}
+    }
+
+
+class SpaceSaving:
+    """Space-Saving counters over a {name: [count, error, runtime]} dict"""
+
+    def __init__(self, counters: Dict[str, List], capacity: int):
+        self.counters = counters
+        self.capacity = capacity
+
+    def add(self, name: str, weight: float = 1, runtime: int = 0) -> Optional[str]:
+        """Count name; returns the name it evicted, if any"""
+        counter = self.counters.get(name)
+        if counter is not None:
+            counter[0] += weight
+            counter[2] += runtime
+            return None
+        evicted = None
+        floor = 0
+        if len(self.counters) >= self.capacity:
+            evicted = min(self.counters, key=lambda key: self.counters[key][0])
+            floor = self.counters.pop(evicted)[0]
+        self.counters[name] = [floor + weight, floor, runtime]
+        return evicted
+
+    def top(self, limit: int) -> List[tuple]:
+        """(name, count, error, runtime), highest count first"""
+        ranked = sorted(self.counters.items(), key=lambda item: (-item[1][0], item[0]))
+        return [(name, count, error, runtime) for name, (count, error, runtime) in ranked[:limit]]
+
+    def scale(self, factor: float):
+        for counter in self.counters.values():
+            counter[0] *= factor
+            counter[1] *= factor
+
+
+class CountMin:
+    """Count-Min sketch over `depth` rows of counters"""
+
+    def __init__(self, rows: List[List[int]]):
+        self.rows = rows
+        self.width = len(rows[0])
+
+    def _columns(self, name: str) -> List[int]:
+        # A stable hash (unlike hash()), split into one 32-bit value per row
+        digest = hashlib.blake2b(name.encode("utf-8"), digest_size=4 * len(self.rows)).digest()
+        return [int.from_bytes(digest[4 * row:4 * row + 4], "little") % self.width
+                for row in range(len(self.rows))]
+
+    def add(self, name: str, weight: int = 1):
+        for row, column in zip(self.rows, self._columns(name)):
+            row[column] += weight
+
+    def estimate(self, name: str) -> int:
+        return min(row[column] for row, column in zip(self.rows, self._columns(name)))
+
+
+class HeavyHitters:
+    """Approximate top-K, trending and point estimates for configurations
+    and templates, over a dict stored in analytics.json"""
+
+    def __init__(self, data: Dict):
+        self.data = data
+        self._allow = set(data["allow"])
+
+    def allowed(self, name: Optional[str]) -> bool:
+        """Whether name keeps exact statistics"""
+        return name in self._allow
+
+    def allow(self, names: List[str]):
+        self._allow.update(names)
+        self.data["allow"] = sorted(self._allow)
+
+    def disallow(self, names: List[str]):
+        self._allow.difference_update(names)
+        self.data["allow"] = sorted(self._allow)
+
+    def _weight(self, days: float) -> float:
+        """Forward-decay weight of a launch at `days`, rescaling the trending
+        counters when it would grow too large"""
+        data = self.data
+        if data["landmark"] is None:
+            data["landmark"] = days
+        exponent = (days - data["landmark"]) / data["half_life_days"]
+        if exponent > _MAX_EXPONENT:
+            factor = 2.0 ** -exponent
+            for kind in KINDS:
+                SpaceSaving(data[kind]["trending"], data["capacity"]).scale(factor)
+            data["landmark"] = days
+            exponent = 0
+        return 2.0 ** exponent
+
+    def record(self, kind: str, name: str, timestamp: str, runtime: int = 0, count: int = 1):
+        """Count `count` launches of name (a configuration or template)"""
+        data = self.data
+        section = data[kind]
+        section["launches"] += count
+        SpaceSaving(section["top"], data["capacity"]).add(name, count, runtime)
+        SpaceSaving(section["trending"], data["capacity"]).add(
+            name, count * self._weight(_days(timestamp)), runtime)
+        CountMin(section["cms"]).add(name, count)
+
+    def top(self, kind: str, limit: int = 10) -> List[Dict]:
+        """Most launched names: the true count lies between
+        launch_count - error and launch_count"""
+        section = self.data[kind]
+        sketch = CountMin(section["cms"])
+        entries = []
+        for name, (count, error, runtime) in section["top"].items():
+            # Both counts are upper bounds; a name that took over a large
+            # counter usually has a much lower Count-Min estimate
+            upper = min(count, sketch.estimate(name))
+            entries.append({"name": name, "launch_count": upper, "error": upper - (count - error),
+                            "total_runtime_minutes": runtime, "approximate": True})
+        entries.sort(key=lambda entry: (-entry["launch_count"], entry["name"]))
+        return entries[:limit]
+
+    def trending(self, kind: str, limit: int = 10, now: Optional[datetime] = None) -> List[Dict]:
+        """Names ranked by launches decayed with the half-life; score is the
+        decayed launch count as of now"""
+        data = self.data
+        if data["landmark"] is None:
+            return []
+        now_days = (now or datetime.now()).timestamp() / 86400
+        decay = 2.0 ** ((data["landmark"] - now_days) / data["half_life_days"])
+        counters = SpaceSaving(data[kind]["trending"], data["capacity"])
+        return [{"name": name, "score": round(count * decay, 2), "error": round(error * decay, 2)}
+                for name, count, error, _ in counters.top(limit)]
+
+    def estimate(self, kind: str, name: str) -> Dict:
+        """Launch count of any name: the Space-Saving counter when it is
+        tracked, else the Count-Min estimate"""
+        section = self.data[kind]
+        counter = section["top"].get(name)
+        estimate = CountMin(section["cms"]).estimate(name)
+        if counter is not None:
+            upper = min(counter[0], estimate)
+            return {"launch_count": upper, "error": upper - (counter[0] - counter[1]), "approximate": True}
+        # Count-Min error bound: e/width of all launches, w.p. 1 - e^-depth
+        bound = math.ceil(math.e / self.data["width"] * section["launches"])
+        return {"launch_count": estimate, "error": min(estimate, bound), "approximate": True}
+
+    def stats(self) -> Dict:
+        data = self.data
+        return {
+            "capacity": data["capacity"],
+            "half_life_days": data["half_life_days"],
+            "count_min": {"width": data["width"], "depth": data["depth"]},
+            "allow": data["allow"],
+            **{kind: {"launches": data[kind]["launches"], "tracked": len(data[kind]["top"]),
+                      "max_error": math.ceil(data[kind]["launches"] / data["capacity"])}
+               for kind in KINDS}
+        }
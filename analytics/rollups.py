@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Sandman Launch Rollups
+
+Pre-aggregated launch history for AnalyticsTracker. Every launch is added
+to an hourly, a daily and a monthly bucket holding the launch count,
+runtime sum, memory distribution and per-configuration and per-template
+counts; daily and monthly buckets also keep a 24-hour histogram and a
+quantile sketch of session lengths (analytics/sketches.py). Buckets
+are keyed by a prefix of the launch timestamp ("2024-11-19T10",
+"2024-11-19", "2024-11").
+
+Retention downsamples the history: raw launches expire after `raw` days,
+hourly buckets after `hour` days and daily buckets after `day` days, while
+monthly buckets are kept (unless `month` is set). A range query covers
+[start, end) with the coarsest buckets that fit - hours up to the first
+midnight, days up to the first of a month, whole months, then days and
+hours again - so its cost grows with the number of buckets, not with the
+number of launches. Ranges reaching back past a tier's retention are
+widened to the next tier's boundaries; times are resolved to the hour.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from analytics.sketches import QuantileSketch, empty_sketch
+
+ROLLUPS_VERSION = 1
+
+# (tier, timestamp prefix length), finest first
+TIERS: List[Tuple[str, int]] = [("hour", 13), ("day", 10), ("month", 7)]
+KEY_LENGTH = dict(TIERS)
+_SPAN = {"hour": timedelta(hours=1), "day": timedelta(days=1), "month": timedelta(days=31)}
+
+# Days to keep each tier; None keeps it forever. "raw" applies to the
+# tracker's launch list.
+DEFAULT_RETENTION: Dict[str, Optional[int]] = {"raw": 30, "hour": 14, "day": 400, "month": None}
+
+
+def empty_rollups() -> Dict:
+    return {
+        "version": ROLLUPS_VERSION,
+        "retention": dict(DEFAULT_RETENTION),
+        "floor": {"hour": None, "day": None, "month": None},
+        "first": None,
+        "pruned": None,
+        "hour": {},
+        "day": {},
+        "month": {}
+    }
+
+
+def as_datetime(value: Union[datetime, str, None]) -> Optional[datetime]:
+    """Accept a datetime or an ISO date/timestamp string"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _key(when: datetime, tier: str) -> str:
+    return when.isoformat()[:KEY_LENGTH[tier]]
+
+
+def _floor(when: datetime, tier: str) -> datetime:
+    when = when.replace(minute=0, second=0, microsecond=0)
+    if tier in ("day", "month"):
+        when = when.replace(hour=0)
+    if tier == "month":
+        when = when.replace(day=1)
+    return when
+
+
+def _next(when: datetime, tier: str) -> datetime:
+    if tier == "hour":
+        return when + timedelta(hours=1)
+    if tier == "day":
+        return when + timedelta(days=1)
+    return (when.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _ceil(when: datetime, tier: str) -> datetime:
+    start = _floor(when, tier)
+    return start if start == when else _next(start, tier)
+
+
+def _key_start(key: str) -> datetime:
+    """Start of the bucket with this key"""
+    if len(key) == KEY_LENGTH["month"]:
+        key += "-01"
+    elif len(key) == KEY_LENGTH["hour"]:
+        key += ":00"
+    return datetime.fromisoformat(key)
+
+
+class LaunchRollups:
+    """Hourly, daily and monthly launch aggregates over a dict that is
+    stored in analytics.json under "rollups" """
+
+    def __init__(self, data: Dict):
+        self.data = data
+        for key, value in empty_rollups().items():
+            data.setdefault(key, value)
+        for tier, days in DEFAULT_RETENTION.items():
+            data["retention"].setdefault(tier, days)
+
+    # ------------------------------------------------------------------
+    # Updating
+    # ------------------------------------------------------------------
+
+    def add(self, event: Dict) -> bool:
+        """Add one launch event; returns False if it has no valid timestamp"""
+        timestamp = event.get("timestamp")
+        if not isinstance(timestamp, str) or len(timestamp) < 13:
+            return False
+        try:
+            hour = int(timestamp[11:13])
+        except ValueError:
+            return False
+
+        duration = event.get("duration_minutes")
+        runtime = duration or 0
+        memory = str(event.get("memory_mb"))
+        config = event.get("config_name")
+        template = event.get("template")
+        floor = self.data["floor"]
+
+        for tier, length in TIERS:
+            key = timestamp[:length]
+            if floor[tier] is not None and key < floor[tier]:
+                continue  # already expired at this granularity
+            buckets = self.data[tier]
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = {"launches": 0, "runtime_minutes": 0,
+                                         "memory": {}, "configs": {}, "templates": {}}
+                if tier != "hour":
+                    bucket["hours"] = [0] * 24
+            bucket["launches"] += 1
+            bucket["runtime_minutes"] += runtime
+            bucket["memory"][memory] = bucket["memory"].get(memory, 0) + 1
+            if config:
+                counts = bucket["configs"].setdefault(config, [0, 0])
+                counts[0] += 1
+                counts[1] += runtime
+            if template:
+                bucket["templates"][template] = bucket["templates"].get(template, 0) + 1
+            if tier != "hour":
+                bucket["hours"][hour] += 1
+                if duration is not None:
+                    QuantileSketch(bucket.setdefault("duration", empty_sketch())).add(duration)
+
+        if self.data["first"] is None or timestamp < self.data["first"]:
+            self.data["first"] = timestamp
+        return True
+
+    def backfill(self, events: Iterable[Dict]) -> int:
+        """Add history that predates the rollups: only events older than the
+        first launch already rolled up are added, so a backfill never counts
+        a launch twice. Returns the number of events added."""
+        first = self.data["first"]
+        added = 0
+        for event in events:
+            timestamp = event.get("timestamp")
+            if first is not None and (not isinstance(timestamp, str) or timestamp >= first):
+                continue
+            if self.add(event):
+                added += 1
+        return added
+
+    def set_retention(self, **days: Optional[int]):
+        """Change the retention of some tiers (days, or None to keep forever)"""
+        for tier, value in days.items():
+            if tier not in DEFAULT_RETENTION:
+                raise ValueError(f"Unknown retention tier: {tier}")
+            if value is not None and value < 1:
+                raise ValueError(f"Retention for {tier} must be at least 1 day")
+            self.data["retention"][tier] = value
+        self.data["pruned"] = None
+
+    def prune(self, launches: Optional[List[Dict]] = None, now: Optional[datetime] = None,
+              force: bool = False) -> Dict[str, int]:
+        """Drop buckets past their tier's retention, and raw launches (a list
+        in time order, trimmed in place) past the raw retention. Runs at most
+        once a day unless forced; returns the number dropped per tier."""
+        now = now or datetime.now()
+        today = _key(now, "day")
+        dropped = {"raw": 0, **{tier: 0 for tier, _ in TIERS}}
+        if self.data["pruned"] == today and not force:
+            return dropped
+
+        days = self.data["retention"].get("raw")
+        if launches is not None and days is not None:
+            cutoff = (now - timedelta(days=days)).isoformat()
+            while dropped["raw"] < len(launches) and launches[dropped["raw"]].get("timestamp", "") < cutoff:
+                dropped["raw"] += 1
+            del launches[:dropped["raw"]]
+
+        for tier, _ in TIERS:
+            days = self.data["retention"].get(tier)
+            if days is None:
+                continue
+            cutoff = _key(_floor(now - timedelta(days=days), tier), tier)
+            buckets = self.data[tier]
+            for key in [key for key in buckets if key < cutoff]:
+                del buckets[key]
+                dropped[tier] += 1
+            floor = self.data["floor"]
+            if floor[tier] is None or cutoff > floor[tier]:
+                floor[tier] = cutoff
+
+        self.data["pruned"] = today
+        return dropped
+
+    # ------------------------------------------------------------------
+    # Range queries
+    # ------------------------------------------------------------------
+
+    def _retained(self, when: datetime, coarsest: str, upper: bool) -> datetime:
+        """Widen a range boundary to the finest tier still retained there
+        (outwards: lower bounds move back, upper bounds forward)"""
+        floor = self.data["floor"]
+        for finer, coarser in (("hour", "day"), ("day", "month")):
+            inside = when - timedelta(hours=1) if upper else when
+            if finer == coarsest or floor[finer] is None or _key(inside, finer) >= floor[finer]:
+                break
+            when = _ceil(when, coarser) if upper else _floor(when, coarser)
+        return when
+
+    def _span(self, start: datetime, end: datetime, tier: str) -> Iterator[Tuple[str, str, Dict]]:
+        buckets = self.data[tier]
+        if start >= end:
+            return
+        if len(buckets) <= (end - start) / _SPAN[tier]:
+            # Sparse history: scanning the stored keys is cheaper than
+            # stepping through the range (keys sort chronologically)
+            first, last = _key(start, tier), _key(end, tier)
+            for key in sorted(key for key in buckets if first <= key < last):
+                yield tier, key, buckets[key]
+            return
+        while start < end:
+            key = _key(start, tier)
+            bucket = buckets.get(key)
+            if bucket is not None:
+                yield tier, key, bucket
+            start = _next(start, tier)
+
+    def _cover(self, start: datetime, end: datetime, coarsest: str) -> Iterator[Tuple[str, str, Dict]]:
+        """(tier, key, bucket) of the stored buckets among the fewest that
+        cover [start, end): hours, then days, months, days and hours"""
+        start = self._retained(_floor(start, "hour"), coarsest, upper=False)
+        end = self._retained(_ceil(end, "hour"), coarsest, upper=True)
+        first_day, last_day = _ceil(start, "day"), _floor(end, "day")
+        if coarsest == "hour" or first_day >= last_day:
+            yield from self._span(start, end, "hour")
+            return
+
+        yield from self._span(start, first_day, "hour")
+        first_month, last_month = _ceil(first_day, "month"), _floor(last_day, "month")
+        if coarsest == "month" and first_month < last_month:
+            yield from self._span(first_day, first_month, "day")
+            yield from self._span(first_month, last_month, "month")
+            yield from self._span(last_month, last_day, "day")
+        else:
+            yield from self._span(first_day, last_day, "day")
+        yield from self._span(last_day, end, "hour")
+
+    def _bounds(self, start, end) -> Tuple[Optional[datetime], datetime]:
+        start = as_datetime(start)
+        end = as_datetime(end)
+        if end is None:
+            end = _ceil(datetime.now(), "hour")
+        if start is None:
+            keys = [min(self.data[tier]) for tier, _ in TIERS if self.data[tier]]
+            if not keys:
+                return None, end
+            start = _key_start(min(keys))
+        return start, end
+
+    def buckets(self, start=None, end=None, coarsest: str = "month") -> Iterator[Tuple[str, str, Dict]]:
+        """(tier, key, bucket) of the stored buckets covering [start, end),
+        using tiers no coarser than `coarsest`. start defaults to the oldest
+        bucket and end to the current hour."""
+        start, end = self._bounds(start, end)
+        if start is None:
+            return iter(())
+        return self._cover(start, end, coarsest)
+
+    def summarize(self, start=None, end=None) -> Dict:
+        """Aggregate launches in [start, end): counts, runtime, memory
+        distribution, per-configuration and per-template counts and the
+        24-hour histogram"""
+        total = {"launches": 0, "runtime_minutes": 0, "memory": {}, "configs": {},
+                 "templates": {}, "hours": [0] * 24, "buckets": 0}
+        configs, templates, memory = total["configs"], total["templates"], total["memory"]
+        for tier, key, bucket in self.buckets(start, end):
+            total["buckets"] += 1
+            total["launches"] += bucket["launches"]
+            total["runtime_minutes"] += bucket["runtime_minutes"]
+            for size, count in bucket["memory"].items():
+                memory[size] = memory.get(size, 0) + count
+            for name, (launches, runtime) in bucket["configs"].items():
+                stats = configs.get(name)
+                if stats is None:
+                    stats = configs[name] = {"launch_count": 0, "total_runtime_minutes": 0}
+                stats["launch_count"] += launches
+                stats["total_runtime_minutes"] += runtime
+            for name, count in bucket["templates"].items():
+                templates[name] = templates.get(name, 0) + count
+            self._add_hours(total["hours"], tier, key, bucket)
+
+        total["memory"] = dict(sorted(memory.items(),
+                                      key=lambda item: int(item[0]) if item[0].isdigit() else -1))
+        return total
+
+    @staticmethod
+    def _add_hours(hours: List[int], tier: str, key: str, bucket: Dict):
+        if tier == "hour":
+            hours[int(key[11:13])] += bucket["launches"]
+        else:
+            for hour, count in enumerate(bucket["hours"]):
+                hours[hour] += count
+
+    def count(self, start=None, end=None) -> int:
+        """Number of launches in [start, end)"""
+        return sum(bucket["launches"] for _, _, bucket in self.buckets(start, end))
+
+    def by_date(self, start=None, end=None) -> Dict[str, int]:
+        """Launch counts per date in [start, end), for dates with launches.
+        Dates whose daily buckets have expired are not reported."""
+        usage: Dict[str, int] = {}
+        for _, key, bucket in self.buckets(start, end, "day"):
+            if bucket["launches"]:
+                date = key[:10]
+                usage[date] = usage.get(date, 0) + bucket["launches"]
+        return dict(sorted(usage.items()))
+
+    def by_hour(self, start=None, end=None) -> Dict[int, int]:
+        """Launch counts by hour of day over [start, end)"""
+        hours = [0] * 24
+        for tier, key, bucket in self.buckets(start, end):
+            self._add_hours(hours, tier, key, bucket)
+        return dict(enumerate(hours))
+
+    def sketches(self, start=None, end=None) -> Dict[str, QuantileSketch]:
+        """Session length and memory sketches for [start, end), widened to
+        whole days (hourly buckets keep no sketches)"""
+        start, end = self._bounds(start, end)
+        duration, memory = QuantileSketch(), QuantileSketch()
+        if start is not None:
+            for _, _, bucket in self._cover(_floor(start, "day"), _ceil(end, "day"), "month"):
+                if "duration" in bucket:
+                    duration.merge(bucket["duration"])
+                for size, count in bucket["memory"].items():
+                    if size.isdigit():
+                        memory.add(int(size), count)
+        return {"duration_minutes": duration, "memory_mb": memory}
+
+    def stats(self) -> Dict:
+        """Bucket counts per tier plus the retention settings"""
+        return {
+            "first": self.data["first"],
+            "retention": dict(self.data["retention"]),
+            "buckets": {tier: len(self.data[tier]) for tier, _ in TIERS},
+            "floor": dict(self.data["floor"])
+        }
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Sandman Quantile Sketches
+
+Mergeable quantile sketches for launch durations and memory sizes, in the
+style of DDSketch: a positive value v is counted in bin ceil(log_gamma(v)),
+with gamma = (1 + alpha) / (1 - alpha), so every quantile is answered with
+a relative error of at most alpha (1% by default). A sketch is a plain dict
+that is stored in JSON as is:
+
+    {"alpha": 0.01, "count": 120, "zero": 0, "sum": 5400,
+     "min": 3, "max": 480, "bins": {"110": 4, "111": 9, ...}}
+
+Adding a value is O(1). Two sketches with the same alpha merge by adding
+their bins, so per-configuration, per-time-bucket and per-host sketches
+combine into exactly the sketch of all their values. The number of bins
+grows with the log of the value range, not with the number of values, and
+is capped at MAX_BINS by folding the lowest bins together (only the
+lowest quantiles then lose accuracy).
+"""
+
+import json
+import math
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_ACCURACY = 0.01
+MAX_BINS = 1024
+PERCENTILES = (0.5, 0.9, 0.99)
+
+# The per-launch sketches AnalyticsTracker and fleet aggregation keep
+LAUNCH_FIELDS = ("duration_minutes", "memory_mb")
+
+_LOG_GAMMA: Dict[float, float] = {}
+
+
+def empty_sketch(alpha: float = DEFAULT_ACCURACY) -> Dict:
+    return {"alpha": alpha, "count": 0, "zero": 0, "sum": 0, "min": None, "max": None, "bins": {}}
+
+
+def _log_gamma(alpha: float) -> float:
+    log_gamma = _LOG_GAMMA.get(alpha)
+    if log_gamma is None:
+        if not 0 < alpha < 1:
+            raise ValueError(f"Relative accuracy must be between 0 and 1, got {alpha}")
+        log_gamma = _LOG_GAMMA[alpha] = math.log((1 + alpha) / (1 - alpha))
+    return log_gamma
+
+
+class QuantileSketch:
+    """Operations on a sketch dict, which is updated in place"""
+
+    def __init__(self, data: Optional[Dict] = None, alpha: float = DEFAULT_ACCURACY):
+        self.data = data if data is not None else empty_sketch(alpha)
+        self.log_gamma = _log_gamma(self.data["alpha"])
+
+    @property
+    def count(self) -> int:
+        return self.data["count"]
+
+    def add(self, value, count: int = 1):
+        """Count a value (None is ignored; zero and negatives share one bin)"""
+        if value is None or count <= 0:
+            return
+        data = self.data
+        if value <= 0:
+            data["zero"] += count
+        else:
+            key = str(self._index(value))
+            bins = data["bins"]
+            if key in bins:
+                bins[key] += count
+            else:
+                bins[key] = count
+                if len(bins) > MAX_BINS:
+                    self._collapse()
+        data["count"] += count
+        data["sum"] += value * count
+        if data["min"] is None or value < data["min"]:
+            data["min"] = value
+        if data["max"] is None or value > data["max"]:
+            data["max"] = value
+
+    def merge(self, other: Dict):
+        """Add another sketch dict (with the same alpha) into this one"""
+        if not other["count"]:
+            return
+        if other["alpha"] != self.data["alpha"]:
+            raise ValueError(f"Cannot merge sketches with relative accuracy "
+                             f"{other['alpha']} and {self.data['alpha']}")
+        data = self.data
+        bins = data["bins"]
+        for key, count in other["bins"].items():
+            bins[key] = bins.get(key, 0) + count
+        if len(bins) > MAX_BINS:
+            self._collapse()
+        data["zero"] += other["zero"]
+        data["count"] += other["count"]
+        data["sum"] += other["sum"]
+        if data["min"] is None or other["min"] < data["min"]:
+            data["min"] = other["min"]
+        if data["max"] is None or other["max"] > data["max"]:
+            data["max"] = other["max"]
+
+    def _collapse(self):
+        """Fold the lowest bins into one so that at most MAX_BINS remain"""
+        bins = self.data["bins"]
+        indexes = sorted(int(key) for key in bins)
+        excess = indexes[:len(indexes) - MAX_BINS + 1]
+        target = str(excess[-1])
+        bins[target] = sum(bins.pop(str(index)) for index in excess)
+
+    def _index(self, value) -> int:
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0..1), or None if the sketch is empty"""
+        return self._estimate([q])[0]
+
+    def _estimate(self, qs: List[float]) -> List[Optional[float]]:
+        data = self.data
+        if not data["count"]:
+            return [None] * len(qs)
+        low, high = data["min"], data["max"]
+        # Any value in the target bin is within alpha; the exact min and
+        # max are the best choice in their own bins
+        low_index = self._index(low) if low > 0 else None
+        high_index = self._index(high) if high > 0 else None
+        gamma = math.exp(self.log_gamma)
+        bins = sorted((int(key), count) for key, count in data["bins"].items())
+
+        estimates = []
+        position, seen = 0, data["zero"]
+        for q in qs:
+            rank = q * (data["count"] - 1)
+            if rank < data["zero"]:
+                estimates.append(0)
+                continue
+            while position < len(bins) and seen + bins[position][1] <= rank:
+                seen += bins[position][1]
+                position += 1
+            if position == len(bins):
+                estimates.append(high)
+                continue
+            index = bins[position][0]
+            if index == high_index:
+                estimates.append(high)
+            elif index == low_index:
+                estimates.append(low)
+            else:
+                estimates.append(min(max(2 * gamma ** index / (gamma + 1), low), high))
+        return estimates
+
+    def quantiles(self, qs: Iterable[float] = PERCENTILES) -> Dict[str, Optional[float]]:
+        """{"p50": ..., "p90": ..., "p99": ...} for the given quantiles"""
+        qs = sorted(qs)
+        return {f"p{q * 100:g}": round(value, 1) if value is not None else None
+                for q, value in zip(qs, self._estimate(qs))}
+
+    def summary(self, qs: Iterable[float] = PERCENTILES) -> Dict:
+        """Count, mean, min, max and percentiles"""
+        data = self.data
+        mean = round(data["sum"] / data["count"], 2) if data["count"] else None
+        return {"count": data["count"], "mean": mean, "min": data["min"], "max": data["max"],
+                **self.quantiles(qs)}
+
+
+def merge_sketches(sketches: Iterable[Dict], alpha: float = DEFAULT_ACCURACY) -> QuantileSketch:
+    """A new sketch holding the values of all the given sketch dicts"""
+    merged = QuantileSketch(alpha=alpha)
+    for sketch in sketches:
+        merged.merge(sketch)
+    return merged
+
+
+# ----------------------------------------------------------------------
+# Launch sketches: global and per configuration
+# ----------------------------------------------------------------------
+
+def empty_launch_sketches() -> Dict:
+    return {**{field: empty_sketch() for field in LAUNCH_FIELDS}, "configs": {}}
+
+
+def add_launch(sketches: Dict, event: Dict):
+    """Count a launch event's duration and memory in the global and its
+    configuration's sketches"""
+    config = event.get("config_name")
+    per_config = None
+    if config:
+        per_config = sketches["configs"].get(config)
+        if per_config is None:
+            per_config = sketches["configs"][config] = {field: empty_sketch() for field in LAUNCH_FIELDS}
+    for field in LAUNCH_FIELDS:
+        value = event.get(field)
+        if value is None:
+            continue
+        QuantileSketch(sketches[field]).add(value)
+        if per_config is not None:
+            QuantileSketch(per_config[field]).add(value)
+
+
+def encode_launch_sketches(sketches: Dict, cache: Dict) -> str:
+    """Compact JSON for launch sketches, reusing the JSON of configurations
+    whose sketches have not changed since the last call with the same cache.
+    A launch only touches its own configuration's sketches, so a save
+    re-encodes one of them instead of all."""
+    parts = []
+    for name, per_config in sketches["configs"].items():
+        key = tuple(per_config[field]["count"] for field in LAUNCH_FIELDS)
+        cached = cache.get(name)
+        # Holding the dict keeps its identity from being reused by a new one
+        if cached is None or cached[0] is not per_config or cached[1] != key:
+            cached = cache[name] = (per_config, key, json.dumps(name) + ":" + _dumps(per_config))
+        parts.append(cached[2])
+    if len(cache) > len(parts):
+        for name in [name for name in cache if name not in sketches["configs"]]:
+            del cache[name]
+    head = _dumps({key: value for key, value in sketches.items() if key != "configs"})
+    return head[:-1] + ',"configs":{' + ",".join(parts) + "}}"
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def launch_percentiles(sketches: Dict, config_name: Optional[str] = None) -> Optional[Dict]:
+    """Summaries of the duration and memory sketches, for one configuration
+    or overall; None for a configuration without sketches"""
+    source = sketches if config_name is None else sketches["configs"].get(config_name)
+    if source is None:
+        return None
+    return {field: QuantileSketch(source[field]).summary() for field in LAUNCH_FIELDS}
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Sandman Scale Fixtures
+
+Deterministic, seeded generators for large test data in the layouts the
+subsystems read:
+
+    configs        .wsb files derived from the templates/ corpus
+    analytics      analytics.json (or JSON lines) launch histories with
+                   daily and weekly usage cycles
+    profiles       profiles.json stores
+    notifications  notifications-history.json
+    git            a configuration repository with many commits, built
+                   through `git fast-import`
+
+Everything is streamed to disk (or to git) as it is generated, so memory
+use stays flat however much data is requested. The same seed and options
+always produce the same data, apart from timestamps, which are anchored
+at --end (default: the current hour).
+
+Usage:
+    python benchmarks/fixtures.py configs --count 100000 --out fixtures/workspace
+    python benchmarks/fixtures.py analytics --count 2000000 --days 365 --out fixtures/analytics.json
+    python benchmarks/fixtures.py analytics --count 2000000 --format jsonl --out fixtures/launches.jsonl
+    python benchmarks/fixtures.py profiles --count 100000 --out fixtures/profiles.json
+    python benchmarks/fixtures.py notifications --count 100000 --out fixtures/notifications-history.json
+    python benchmarks/fixtures.py git --commits 5000 --configs 200 --out fixtures/repo
+"""
+
+import argparse
+import json
+import math
+import random
+import subprocess
+import sys
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+TEMPLATES_DIR = REPO_ROOT / "templates"
+
+# Relative launch activity by hour of day (0-23) and day of week (Mon-Sun):
+# quiet nights, a morning peak, a dip at lunch and quieter weekends
+HOUR_WEIGHTS = [0.5, 0.3, 0.2, 0.2, 0.2, 0.3, 0.8, 2.0, 4.5, 6.5, 7.0, 6.0,
+                4.0, 5.5, 6.5, 6.0, 5.0, 3.5, 2.5, 2.0, 1.8, 1.5, 1.0, 0.7]
+WEEKDAY_WEIGHTS = [1.0, 1.05, 1.05, 1.0, 0.85, 0.3, 0.25]
+
+MEMORY_CHOICES = [2048, 4096, 4096, 6144, 8192, 8192, 16384]
+FOLDER_ROOTS = ["C:\\dev\\projects", "C:\\Users\\tester\\Downloads", "D:\\datasets",
+                "C:\\tools", "E:\\samples", "C:\\Users\\tester\\Documents\\reports"]
+TAG_WORDS = ["dev", "test", "secure", "browser", "malware", "office", "data", "build",
+             "demo", "qa", "ci", "sandbox", "gpu", "offline", "shared", "temp"]
+NOTIFICATION_TYPES = ["launch", "launch", "launch", "completion", "completion", "error",
+                      "warning", "custom"]
+
+# Generated git history is attributed to the same author as commit_config()
+GIT_AUTHOR = "Sandman <sandman@local>"
+
+
+def _zipf_cum_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Cumulative Zipf weights, so a few items are much more popular than the rest"""
+    total = 0.0
+    cumulative = []
+    for rank in range(1, count + 1):
+        total += 1.0 / rank ** exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _default_end() -> datetime:
+    return datetime.now().replace(minute=0, second=0, microsecond=0)
+
+
+def config_names(count: int) -> List[str]:
+    """Names of the configurations the generators refer to, by template"""
+    templates = sorted(path.stem for path in TEMPLATES_DIR.glob("*.wsb"))
+    return [f"{templates[i % len(templates)]}-{i:06d}" for i in range(count)]
+
+
+# ----------------------------------------------------------------------
+# .wsb configurations
+# ----------------------------------------------------------------------
+
+class ConfigFactory:
+    """Renders randomized .wsb documents from the bundled templates"""
+
+    def __init__(self, seed: int = 42):
+        self.rng = random.Random(seed)
+        self.templates = [(path.stem, ET.parse(path).getroot())
+                          for path in sorted(TEMPLATES_DIR.glob("*.wsb"))]
+
+    def render(self, index: int) -> str:
+        """XML of the index-th configuration (randomized from its template)"""
+        rng = self.rng
+        _, template = self.templates[index % len(self.templates)]
+        root = ET.Element("Configuration")
+
+        for elem in template:
+            if elem.tag == "MappedFolders":
+                continue
+            copy = ET.SubElement(root, elem.tag)
+            copy.text = elem.text
+            copy.extend(list(elem))
+            if elem.tag == "MemoryInMB":
+                copy.text = str(rng.choice(MEMORY_CHOICES))
+            elif elem.tag in ("Networking", "VGpu") and rng.random() < 0.25:
+                copy.text = "Disable" if elem.text == "Default" else "Default"
+
+        folder_count = rng.choice([0, 1, 1, 2, 3])
+        if folder_count:
+            mapped = ET.SubElement(root, "MappedFolders")
+            for _ in range(folder_count):
+                folder = ET.SubElement(mapped, "MappedFolder")
+                ET.SubElement(folder, "HostFolder").text = (
+                    f"{rng.choice(FOLDER_ROOTS)}\\project-{rng.randint(1, 500)}")
+                ET.SubElement(folder, "ReadOnly").text = rng.choice(["true", "true", "false"])
+
+        return ET.tostring(root, encoding="unicode") + "\n"
+
+
+def generate_configs(out_dir: Path, count: int, seed: int = 42,
+                     progress: Optional[Callable[[int], None]] = None) -> int:
+    """Write count .wsb files named like config_names(count); returns bytes written"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    factory = ConfigFactory(seed)
+    written = 0
+
+    for i, name in enumerate(config_names(count)):
+        xml = factory.render(i)
+        with open(out_dir / f"{name}.wsb", 'w', encoding='utf-8') as f:
+            f.write(xml)
+        written += len(xml)
+        if progress and (i + 1) % 10000 == 0:
+            progress(i + 1)
+
+    return written
+
+
+# ----------------------------------------------------------------------
+# Analytics launch histories
+# ----------------------------------------------------------------------
+
+def _hourly_counts(count: int, start: datetime, hours: int, rng: random.Random) -> List[int]:
+    """Split count launches over hours in proportion to the diurnal weights"""
+    weights = [HOUR_WEIGHTS[(start + timedelta(hours=h)).hour] *
+               WEEKDAY_WEIGHTS[(start + timedelta(hours=h)).weekday()] for h in range(hours)]
+    total = sum(weights)
+
+    counts = [int(count * w / total) for w in weights]
+    remainder = count - sum(counts)
+    for h in rng.choices(range(hours), weights=weights, k=remainder):
+        counts[h] += 1
+    return counts
+
+
+def launch_events(count: int, days: int = 90, seed: int = 42, configs: int = 200,
+                  end: Optional[datetime] = None) -> Iterator[Dict]:
+    """Yield count launch events in time order, in AnalyticsTracker's layout.
+
+    Launches follow HOUR_WEIGHTS and WEEKDAY_WEIGHTS over the `days` before
+    `end`; configuration popularity is Zipf-distributed and each
+    configuration keeps its template and memory size.
+    """
+    rng = random.Random(seed)
+    end = end or _default_end()
+    start = end - timedelta(days=days)
+    names = config_names(configs)
+    cum_weights = _zipf_cum_weights(configs)
+    templates = {name: name.rsplit("-", 1)[0] for name in names}
+    memory = {name: rng.choice(MEMORY_CHOICES) for name in names}
+
+    for hour, hour_count in enumerate(_hourly_counts(count, start, days * 24, rng)):
+        if not hour_count:
+            continue
+        hour_start = start + timedelta(hours=hour)
+        for offset in sorted(rng.random() * 3600 for _ in range(hour_count)):
+            when = hour_start + timedelta(seconds=offset)
+            config = rng.choices(names, cum_weights=cum_weights)[0]
+            duration = None
+            if rng.random() < 0.7:
+                duration = max(1, int(rng.lognormvariate(3.2, 0.9)))
+            yield {
+                "id": _uuid(rng),
+                "config_name": config,
+                "template": templates[config],
+                "memory_mb": memory[config],
+                "timestamp": when.isoformat(),
+                "duration_minutes": duration,
+                "date": when.strftime("%Y-%m-%d"),
+                "hour": when.hour
+            }
+
+
+def generate_analytics(path: Path, count: int, days: int = 90, seed: int = 42,
+                       configs: int = 200, fmt: str = "json",
+                       end: Optional[datetime] = None) -> Dict:
+    """Write a launch history as analytics.json ("json") or one event per line ("jsonl").
+
+    The JSON form also carries the per-configuration, per-template and
+    global statistics AnalyticsTracker keeps; only those aggregates are
+    held in memory. Returns the global statistics.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    config_stats: Dict[str, Dict] = {}
+    template_stats: Dict[str, Dict] = {}
+    total_runtime = 0
+    launches = 0
+
+    with open(path, 'w', encoding='utf-8') as f:
+        if fmt == "json":
+            f.write('{"version": "1.0", "created": %s, "launches": [\n'
+                    % json.dumps((end or _default_end()).isoformat()))
+
+        for event in launch_events(count, days, seed, configs, end):
+            if fmt == "json":
+                f.write((",\n" if launches else "") + json.dumps(event))
+            else:
+                f.write(json.dumps(event) + "\n")
+            launches += 1
+
+            runtime = event["duration_minutes"] or 0
+            total_runtime += runtime
+            stats = config_stats.get(event["config_name"])
+            if stats is None:
+                stats = config_stats[event["config_name"]] = {
+                    "launch_count": 0, "total_runtime_minutes": 0,
+                    "first_used": event["timestamp"], "last_used": event["timestamp"]}
+            stats["launch_count"] += 1
+            stats["total_runtime_minutes"] += runtime
+            stats["last_used"] = event["timestamp"]
+
+            stats = template_stats.get(event["template"])
+            if stats is None:
+                stats = template_stats[event["template"]] = {
+                    "usage_count": 0, "first_used": event["timestamp"],
+                    "last_used": event["timestamp"]}
+            stats["usage_count"] += 1
+            stats["last_used"] = event["timestamp"]
+
+        statistics = {
+            "total_launches": launches,
+            "total_runtime_minutes": total_runtime,
+            "most_used_config": max(config_stats, key=lambda n: config_stats[n]["launch_count"],
+                                    default=None),
+            "most_used_template": max(template_stats, key=lambda n: template_stats[n]["usage_count"],
+                                      default=None)
+        }
+
+        if fmt == "json":
+            f.write('\n], "configurations": %s, "templates": %s, "statistics": %s}\n' % (
+                json.dumps(config_stats), json.dumps(template_stats), json.dumps(statistics)))
+
+    return statistics
+
+
+# ----------------------------------------------------------------------
+# Profiles and notification history
+# ----------------------------------------------------------------------
+
+def generate_profiles(path: Path, count: int, seed: int = 42, configs: int = 500,
+                      tag_count: int = 200, end: Optional[datetime] = None) -> int:
+    """Stream a profiles.json with count profiles; returns total launches.
+
+    Tags and launch counts are skewed (a few tags and profiles dominate).
+    frecency is left out so ProfileManager seeds it from the launch stats.
+    """
+    rng = random.Random(seed)
+    end = end or _default_end()
+    names = config_names(configs)
+    tags = [f"{TAG_WORDS[i % len(TAG_WORDS)]}-{i:03d}" for i in range(tag_count)]
+    tag_weights = _zipf_cum_weights(tag_count)
+    total_launches = 0
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"version": "1.0", "profiles": {\n')
+        for i in range(count):
+            name = f"profile-{i:06d}"
+            launch_count = int(rng.paretovariate(1.2)) - 1
+            total_launches += launch_count
+            created = end - timedelta(days=rng.uniform(30, 720))
+            last_used = None
+            if launch_count:
+                last_used = (end - timedelta(days=rng.expovariate(1 / 20.0))).isoformat()
+            profile = {
+                "name": name,
+                "config_name": rng.choice(names),
+                "description": f"{rng.choice(TAG_WORDS).title()} environment {i}",
+                "hotkey": f"ctrl+alt+{i % 10}" if i < 10 else None,
+                "icon": "⚡",
+                "tags": sorted(set(rng.choices(tags, cum_weights=tag_weights,
+                                               k=rng.randint(0, 4)))),
+                "created": created.isoformat(),
+                "last_used": last_used,
+                "launch_count": launch_count
+            }
+            f.write((",\n" if i else "") + f"{json.dumps(name)}: {json.dumps(profile)}")
+        f.write('\n}, "groups": {}, "default_profile": null}\n')
+
+    return total_launches
+
+
+def generate_notifications(path: Path, count: int, seed: int = 42, configs: int = 200,
+                           days: int = 30, end: Optional[datetime] = None) -> Dict[str, int]:
+    """Stream a notifications-history.json with count notifications; returns counts by type"""
+    rng = random.Random(seed)
+    end = end or _default_end()
+    names = config_names(configs)
+    by_type: Dict[str, int] = {}
+    step = timedelta(days=days) / max(count, 1)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"notifications": [\n')
+        for i in range(count):
+            kind = rng.choice(NOTIFICATION_TYPES)
+            config = rng.choice(names)
+            by_type[kind] = by_type.get(kind, 0) + 1
+            notification = {
+                "timestamp": (end - timedelta(days=days) + step * i).isoformat(),
+                "type": kind,
+                "title": f"Sandbox {kind.title()}",
+                "message": f"{kind.title()} for {config}",
+                "config_name": config
+            }
+            f.write((",\n" if i else "") + json.dumps(notification))
+        f.write('\n], "statistics": %s}\n' % json.dumps({"total_sent": count, "by_type": by_type}))
+
+    return by_type
+
+
+# ----------------------------------------------------------------------
+# Git history
+# ----------------------------------------------------------------------
+
+def _fast_import_data(text: str) -> bytes:
+    payload = text.encode("utf-8")
+    return b"data %d\n" % len(payload) + payload + b"\n"
+
+
+def generate_git_history(repo_dir: Path, commits: int, configs: int = 200, seed: int = 42,
+                         days: int = 365, end: Optional[datetime] = None) -> int:
+    """Create a repository with commits commits over a workspace of configs files.
+
+    The first commit adds .gitignore (as ConfigVersionControl.initialize()
+    writes it) and every configuration; each later commit edits one to
+    three configurations. The stream goes straight into `git fast-import`,
+    and the working tree is checked out at the end. Returns the number of
+    commits created.
+    """
+    repo_dir = Path(repo_dir)
+    repo_dir.mkdir(parents=True, exist_ok=True)
+    subprocess.run(["git", "init", "-q", str(repo_dir)], check=True)
+
+    rng = random.Random(seed)
+    factory = ConfigFactory(seed)
+    names = config_names(configs)
+    cum_weights = _zipf_cum_weights(configs)
+    end = end or _default_end()
+    start = end - timedelta(days=days)
+    name, email = GIT_AUTHOR[:-1].split(" <")
+
+    importer = subprocess.Popen(["git", "-C", str(repo_dir), "fast-import", "--quiet"],
+                                stdin=subprocess.PIPE)
+    stream = importer.stdin
+    try:
+        for i in range(commits):
+            when = start + (end - start) * (i / max(commits - 1, 1))
+            stamp = f"{int(when.replace(tzinfo=timezone.utc).timestamp())} +0000"
+            if i == 0:
+                message = "Initial commit: Sandman configuration repository"
+                files = [(".gitignore", "# Sandman Git Ignore\n*.bak\n*.tmp\n*.log\n"
+                                        ".sandman-vcs.json\nanalytics.json\n")]
+                files += [(f"{n}.wsb", factory.render(index)) for index, n in enumerate(names)]
+            else:
+                changed = sorted(set(rng.choices(range(configs), cum_weights=cum_weights,
+                                                 k=rng.randint(1, 3))))
+                files = [(f"{names[index]}.wsb", factory.render(index)) for index in changed]
+                message = (f"Update configuration: {names[changed[0]]}" if len(changed) == 1
+                           else f"Update configurations - {when.strftime('%Y-%m-%d %H:%M:%S')}")
+
+            stream.write(b"commit refs/heads/master\n")
+            stream.write(f"author {name} <{email}> {stamp}\n".encode())
+            stream.write(f"committer {name} <{email}> {stamp}\n".encode())
+            stream.write(_fast_import_data(message))
+            for file_path, content in files:
+                stream.write(f"M 100644 inline {file_path}\n".encode())
+                stream.write(_fast_import_data(content))
+            stream.write(b"\n")
+    finally:
+        stream.close()
+        if importer.wait() != 0:
+            raise RuntimeError("git fast-import failed")
+
+    subprocess.run(["git", "-C", str(repo_dir), "symbolic-ref", "HEAD", "refs/heads/master"],
+                   check=True)
+    subprocess.run(["git", "-C", str(repo_dir), "checkout", "-q", "-f", "master"], check=True)
+    return commits
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+
+def _size(path: Path) -> str:
+    size = path.stat().st_size if path.is_file() else sum(
+        p.stat().st_size for p in path.rglob("*") if p.is_file())
+    units = ["B", "KB", "MB", "GB"]
+    power = min(int(math.log(max(size, 1), 1024)), len(units) - 1)
+    return f"{size / 1024 ** power:.1f} {units[power]}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate large, seeded Sandman test data")
+    sub = parser.add_subparsers(dest="kind")
+    sub.required = True
+
+    def add(kind: str, help_text: str, count_default: int):
+        command = sub.add_parser(kind, help=help_text)
+        command.add_argument("--out", required=True, help="output file or directory")
+        command.add_argument("--count", type=int, default=count_default, help="items to generate")
+        command.add_argument("--seed", type=int, default=42)
+        command.add_argument("--end", help="ISO timestamp the data ends at (default: current hour)")
+        return command
+
+    add("configs", "write .wsb files from the templates", 100000)
+    analytics = add("analytics", "write an analytics launch history", 1000000)
+    analytics.add_argument("--days", type=int, default=365, help="days of history")
+    analytics.add_argument("--configs", type=int, default=200, help="distinct configurations")
+    analytics.add_argument("--format", choices=["json", "jsonl"], default="json",
+                           help="analytics.json layout or one event per line")
+    profiles = add("profiles", "write a profiles.json store", 100000)
+    profiles.add_argument("--configs", type=int, default=500, help="distinct configurations")
+    profiles.add_argument("--tags", type=int, default=200, help="size of the tag pool")
+    notifications = add("notifications", "write a notification history", 100000)
+    notifications.add_argument("--days", type=int, default=30, help="days of history")
+    git = add("git", "create a configuration repository", 0)
+    git.add_argument("--commits", type=int, default=5000, help="commits to create")
+    git.add_argument("--configs", type=int, default=200, help="configurations in the repository")
+    git.add_argument("--days", type=int, default=365, help="days the history spans")
+    args = parser.parse_args(argv)
+
+    out = Path(args.out)
+    end = datetime.fromisoformat(args.end) if args.end else None
+    started = time.perf_counter()
+
+    if args.kind == "configs":
+        generate_configs(out, args.count, args.seed,
+                         progress=lambda n: print(f"  {n} configs...", file=sys.stderr))
+        summary = f"{args.count} configurations"
+    elif args.kind == "analytics":
+        stats = generate_analytics(out, args.count, args.days, args.seed, args.configs,
+                                   args.format, end)
+        summary = f"{stats['total_launches']} launches over {args.days} days"
+    elif args.kind == "profiles":
+        launches = generate_profiles(out, args.count, args.seed, args.configs, args.tags, end)
+        summary = f"{args.count} profiles, {launches} recorded launches"
+    elif args.kind == "notifications":
+        generate_notifications(out, args.count, args.seed, days=args.days, end=end)
+        summary = f"{args.count} notifications"
+    else:
+        generate_git_history(out, args.commits, args.configs, args.seed, args.days, end)
+        summary = f"{args.commits} commits over {args.configs} configurations"
+
+    print(f"✓ {summary} in {out} ({_size(out)}, {time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
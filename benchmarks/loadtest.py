@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Sandman Web API Load Test
+
+Generates a synthetic workspace from the bundled templates in a temporary
+directory, then drives web/app.py in-process (Flask test client) and over
+real sockets with concurrent workers. Writes a JSON report of throughput and
+latency percentiles and can compare it against a saved baseline.
+
+Usage:
+    python benchmarks/loadtest.py [--configs N] [--requests N] [--workers N]
+                                  [--modes inprocess,socket] [--output report.json]
+                                  [--baseline baseline.json] [--tolerance 0.25]
+                                  [--save-baseline baseline.json]
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+TEMPLATES_DIR = REPO_ROOT / "templates"
+
+SCENARIOS = ["list", "list_filtered", "get", "create", "update", "download",
+             "template_apply", "delete"]
+
+FOLDER_ROOTS = ["C:\\dev\\projects", "C:\\Users\\tester\\Downloads", "D:\\datasets",
+                "C:\\tools", "E:\\samples", "C:\\Users\\tester\\Documents\\reports"]
+
+
+def generate_workspace(workspace: Path, count: int, seed: int = 42) -> List[str]:
+    """Write count synthetic .wsb files built from the bundled templates"""
+    rng = random.Random(seed)
+    templates = sorted(TEMPLATES_DIR.glob("*.wsb"))
+    names = []
+
+    for i in range(count):
+        root = ET.parse(templates[i % len(templates)]).getroot()
+
+        root.find("MemoryInMB").text = str(rng.choice([2048, 4096, 6144, 8192, 16384]))
+        if rng.random() < 0.3:
+            root.find("Networking").text = "Disable"
+
+        mapped = root.find("MappedFolders")
+        if mapped is not None:
+            root.remove(mapped)
+        folder_count = rng.choice([0, 1, 1, 2, 3])
+        if folder_count:
+            mapped = ET.SubElement(root, "MappedFolders")
+            for _ in range(folder_count):
+                folder = ET.SubElement(mapped, "MappedFolder")
+                ET.SubElement(folder, "HostFolder").text = (
+                    f"{rng.choice(FOLDER_ROOTS)}\\project-{rng.randint(1, 500)}")
+                ET.SubElement(folder, "ReadOnly").text = rng.choice(["true", "true", "false"])
+
+        name = f"{templates[i % len(templates)].stem}-{i:06d}"
+        ET.ElementTree(root).write(workspace / f"{name}.wsb", encoding="unicode")
+        names.append(name)
+
+    return names
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], errors: int, wall_seconds: float) -> Dict:
+    """Build the report entry for one scenario"""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 50) * 1000, 3),
+            "p90": round(percentile(ordered, 90) * 1000, 3),
+            "p99": round(percentile(ordered, 99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0.0
+        }
+    }
+
+
+def build_requests(scenario: str, count: int, names: List[str], rng: random.Random) -> List[tuple]:
+    """Build (method, path, body) tuples for a scenario"""
+    template_names = [path.stem for path in sorted(TEMPLATES_DIR.glob("*.wsb"))]
+    new_config = {"memory_mb": 4096, "networking": "Default",
+                  "mapped_folders": [{"path": "C:\\dev\\projects\\load", "readonly": True}]}
+
+    if scenario == "list":
+        return [("GET", "/api/configs?limit=100", None) for _ in range(count)]
+    if scenario == "list_filtered":
+        return [("GET", "/api/configs?limit=100&sort=memory&networking=Disable&has_rw=true", None)
+                for _ in range(count)]
+    if scenario == "get":
+        return [("GET", f"/api/config/{rng.choice(names)}", None) for _ in range(count)]
+    if scenario == "download":
+        return [("GET", f"/api/config/{rng.choice(names)}/download", None) for _ in range(count)]
+    if scenario == "create":
+        return [("POST", "/api/config", dict(new_config, name=f"loadtest-{i:06d}"))
+                for i in range(count)]
+    if scenario == "update":
+        return [("PUT", f"/api/config/loadtest-{i:06d}", dict(new_config, memory_mb=8192))
+                for i in range(count)]
+    if scenario == "template_apply":
+        return [("POST", f"/api/template/{rng.choice(template_names)}/apply",
+                 {"new_name": f"loadtest-tpl-{i:06d}", "overrides": {"memory_mb": 2048}})
+                for i in range(count)]
+    if scenario == "delete":
+        return [("DELETE", f"/api/config/loadtest-{i:06d}", None) for i in range(count)]
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def run_scenario(send: Callable[[str, str, Optional[Dict]], int], requests: List[tuple],
+                 workers: int) -> Dict:
+    """Run requests across workers and time each one"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(chunk):
+        local = []
+        local_errors = 0
+        for method, path, body in chunk:
+            start = time.perf_counter()
+            status = send(method, path, body)
+            local.append(time.perf_counter() - start)
+            if status >= 400:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    chunks = [requests[i::workers] for i in range(workers)]
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, chunks))
+    wall = time.perf_counter() - wall_start
+
+    return summarize(latencies, errors[0], wall)
+
+
+def inprocess_sender(app) -> Callable:
+    """Send requests through Flask test clients (one per thread)"""
+    local = threading.local()
+
+    def send(method, path, body):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        response = client.open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+
+    return send
+
+
+def socket_sender(host: str, port: int) -> Callable:
+    """Send requests over HTTP keep-alive connections (one per thread)"""
+    local = threading.local()
+
+    def send(method, path, body):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(host, port, timeout=30)
+        payload = json.dumps(body) if body is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            local.conn = None
+            return 599
+
+    return send
+
+
+def start_server(app):
+    """Start a threaded werkzeug server on a free port"""
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def reset_workspace(workspace: Path):
+    """Remove files written by a previous mode's write scenarios"""
+    for path in workspace.glob("loadtest-*"):
+        path.unlink()
+
+
+def run_loadtest(configs: int, requests: int, workers: int, modes: List[str],
+                 scenarios: List[str], seed: int = 42) -> Dict:
+    """Generate a workspace, run every scenario in every mode, return the report"""
+    temp_dir = Path(tempfile.mkdtemp(prefix="sandman-loadtest-"))
+    workspace = temp_dir / "wsb-files"
+    workspace.mkdir()
+
+    try:
+        gen_start = time.perf_counter()
+        names = generate_workspace(workspace, configs, seed)
+        gen_seconds = time.perf_counter() - gen_start
+
+        # The app reads its workspace at import time
+        os.environ["SANDMAN_WORKSPACE"] = str(workspace)
+        sys.path.insert(0, str(REPO_ROOT / "web"))
+        import app as web_app
+
+        web_app.app.logger.disabled = True
+        warm_start = time.perf_counter()
+        web_app.WORKSPACE_INDEX.refresh(force=True)
+        warm_seconds = time.perf_counter() - warm_start
+
+        report = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "configs": configs,
+                "requests_per_scenario": requests,
+                "workers": workers,
+                "seed": seed,
+                "generate_seconds": round(gen_seconds, 3),
+                "index_warmup_seconds": round(warm_seconds, 3)
+            },
+            "results": {}
+        }
+
+        for mode in modes:
+            rng = random.Random(seed)
+            reset_workspace(workspace)
+            web_app.WORKSPACE_INDEX.refresh(force=True)
+
+            server = None
+            if mode == "inprocess":
+                send = inprocess_sender(web_app.app)
+            elif mode == "socket":
+                server = start_server(web_app.app)
+                send = socket_sender("127.0.0.1", server.server_port)
+            else:
+                raise ValueError(f"Unknown mode: {mode}")
+
+            try:
+                report["results"][mode] = {}
+                for scenario in scenarios:
+                    batch = build_requests(scenario, requests, names, rng)
+                    result = run_scenario(send, batch, workers)
+                    report["results"][mode][scenario] = result
+                    print(f"  {mode:9} {scenario:15} {result['throughput_rps']:9.1f} req/s  "
+                          f"p50 {result['latency_ms']['p50']:8.2f} ms  "
+                          f"p99 {result['latency_ms']['p99']:8.2f} ms  "
+                          f"errors {result['errors']}")
+            finally:
+                if server:
+                    server.shutdown()
+
+        return report
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def compare_reports(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """List regressions: throughput below or p90 latency above baseline by > tolerance"""
+    regressions = []
+    for mode, scenarios in report["results"].items():
+        for scenario, result in scenarios.items():
+            base = baseline.get("results", {}).get(mode, {}).get(scenario)
+            if not base:
+                continue
+
+            if result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+                regressions.append(
+                    f"{mode}/{scenario}: throughput {result['throughput_rps']} req/s "
+                    f"< baseline {base['throughput_rps']} req/s")
+            if result["latency_ms"]["p90"] > base["latency_ms"]["p90"] * (1 + tolerance):
+                regressions.append(
+                    f"{mode}/{scenario}: p90 {result['latency_ms']['p90']} ms "
+                    f"> baseline {base['latency_ms']['p90']} ms")
+            if result["errors"] > base.get("errors", 0):
+                regressions.append(
+                    f"{mode}/{scenario}: {result['errors']} errors (baseline {base.get('errors', 0)})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the Sandman web API")
+    parser.add_argument("--configs", type=int, default=1000, help="synthetic configs to generate")
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent workers")
+    parser.add_argument("--modes", default="inprocess,socket", help="inprocess,socket")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated scenarios")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="compare against this baseline report")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative regression (default 0.25)")
+    parser.add_argument("--save-baseline", help="write the report as a new baseline")
+    args = parser.parse_args(argv)
+
+    print(f"Sandman load test: {args.configs} configs, {args.requests} requests/scenario, "
+          f"{args.workers} workers")
+    report = run_loadtest(args.configs, args.requests, args.workers,
+                          [m for m in args.modes.split(",") if m],
+                          [s for s in args.scenarios.split(",") if s], args.seed)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Report written to {path}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.tolerance)
+        if regressions:
+            print(f"✗ {len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print(f"✓ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
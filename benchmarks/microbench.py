@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Sandman Micro-Benchmarks
+
+Times the core hot paths (XML writing, parsing and validation, workspace
+listing, analytics, profiles and notification history) at several data
+sizes, in a temporary directory with no network and no real sandboxes.
+Results are written as JSON and compared against a committed baseline;
+any benchmark slower than the baseline by more than the tolerance fails
+the run.
+
+Usage:
+    python benchmarks/microbench.py [--scales 10,1000,100000] [--benchmarks a,b]
+                                    [--min-time 0.2] [--output report.json]
+                                    [--baseline benchmarks/baselines/microbench.json]
+                                    [--tolerance 0.5] [--save-baseline path]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.fixtures import config_names, generate_analytics, generate_profiles  # noqa: E402
+
+DEFAULT_BASELINE = REPO_ROOT / "benchmarks" / "baselines" / "microbench.json"
+DEFAULT_SCALES = [10, 1000, 100000]
+
+# A sample is timed over enough calls to take at least this long, so that
+# very fast operations are not dominated by timer resolution
+MIN_SAMPLE_SECONDS = 0.001
+
+WSB_TEMPLATE = """<Configuration>
+  <Networking>{networking}</Networking>
+  <MemoryInMB>{memory}</MemoryInMB>
+  <VGpu>Default</VGpu>
+  <ProtectedClient>Enable</ProtectedClient>
+{folders}</Configuration>
+"""
+
+
+class BenchContext:
+    """Temporary data shared by the benchmarks, generated once per scale"""
+
+    def __init__(self, root: Path, seed: int):
+        self.root = root
+        self.seed = seed
+        self._cache: Dict[tuple, object] = {}
+
+    def _cached(self, key: tuple, build: Callable):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def mapped_folders(self, count: int) -> List[Dict]:
+        """count mapped folders, all pointing at a directory that exists"""
+        return [{"path": str(self.root), "readonly": i % 3 != 0} for i in range(count)]
+
+    def wsb_file(self, folder_count: int) -> Path:
+        """A .wsb file with folder_count mapped folders"""
+        def build():
+            path = self.root / f"folders-{folder_count}.wsb"
+            folders = "".join(
+                f"    <MappedFolder><HostFolder>{f['path']}</HostFolder>"
+                f"<ReadOnly>{'true' if f['readonly'] else 'false'}</ReadOnly></MappedFolder>\n"
+                for f in self.mapped_folders(folder_count))
+            path.write_text(WSB_TEMPLATE.format(
+                networking="Default", memory=4096,
+                folders=f"  <MappedFolders>\n{folders}  </MappedFolders>\n"), encoding="utf-8")
+            return path
+        return self._cached(("wsb", folder_count), build)
+
+    def workspace(self, count: int) -> Path:
+        """A workspace directory with count small .wsb files"""
+        def build():
+            rng = random.Random(self.seed)
+            workspace = self.root / f"workspace-{count}"
+            workspace.mkdir()
+            for i in range(count):
+                (workspace / f"config-{i:06d}.wsb").write_text(WSB_TEMPLATE.format(
+                    networking=rng.choice(["Default", "Disable"]),
+                    memory=rng.choice([2048, 4096, 8192]), folders=""), encoding="utf-8")
+            return workspace
+        return self._cached(("workspace", count), build)
+
+    def analytics_file(self, launches: int) -> Path:
+        """An analytics.json with launches spread over the last 90 days"""
+        def build():
+            path = self.root / f"analytics-{launches}.json"
+            generate_analytics(path, launches, days=90, seed=self.seed)
+            return path
+        return self._cached(("analytics", launches), build)
+
+    def profiles_file(self, count: int) -> Path:
+        """A profiles.json with count profiles; their configs exist in the workspace"""
+        def build():
+            path = self.root / f"profiles-{count}.json"
+            generate_profiles(path, count, seed=self.seed, configs=500, tag_count=50)
+
+            from profiles.profiles import ProfileManager
+            for name in config_names(500):
+                config_path = ProfileManager._config_path(name)
+                config_path.parent.mkdir(parents=True, exist_ok=True)
+                config_path.write_text(WSB_TEMPLATE.format(
+                    networking="Default", memory=4096, folders=""), encoding="utf-8")
+            return path
+        return self._cached(("profiles", count), build)
+
+    def history_file(self, count: int) -> Path:
+        """A notifications-history.json with count notifications"""
+        def build():
+            now = datetime.now().isoformat()
+            data = {"notifications": [
+                {"timestamp": now, "type": "launch", "title": "Sandbox Launched",
+                 "message": f"Started config-{i}", "config_name": f"config-{i}"}
+                for i in range(count)],
+                "statistics": {"total_sent": count, "by_type": {"launch": count}}}
+            path = self.root / f"history-{count}.json"
+            with open(path, 'w') as f:
+                json.dump(data, f)
+            return path
+        return self._cached(("history", count), build)
+
+    def web_app(self):
+        """The web UI module, imported against a temporary workspace (None without Flask)"""
+        def build():
+            os.environ["SANDMAN_WORKSPACE"] = str(self.root / "web-workspace")
+            sys.path.insert(0, str(REPO_ROOT / "web"))
+            try:
+                import app
+            except ImportError:
+                return None
+            return app
+        return self._cached(("web",), build)
+
+    def wsb_manager(self, workspace: Optional[Path] = None):
+        from scripts.sandman import SandmanConfig, WsbManager
+        config = SandmanConfig(str(self.root / "config.json"))
+        config.config = {"workspace": str(workspace or self.root), "defaultMemoryMB": 4096}
+        manager = WsbManager(config)
+        manager.quiet = True
+        return manager
+
+
+# ----------------------------------------------------------------------
+# Benchmarks: each takes (context, scale) and returns the callable to time,
+# or None when it cannot run here. SCALE_MEANING documents what scale is.
+# ----------------------------------------------------------------------
+
+def bench_create_xml(ctx: BenchContext, scale: int):
+    manager = ctx.wsb_manager()
+    folders = ctx.mapped_folders(scale)
+    return lambda: manager.create_xml(memory_mb=4096, networking="Disable", mapped_folders=folders)
+
+
+def bench_validate_wsb(ctx: BenchContext, scale: int):
+    manager = ctx.wsb_manager()
+    path = ctx.wsb_file(scale)
+    return lambda: manager.validate_wsb(path)
+
+
+def bench_list_files(ctx: BenchContext, scale: int):
+    manager = ctx.wsb_manager(ctx.workspace(scale))
+    return manager.list_files
+
+
+def bench_parse_wsb_file(ctx: BenchContext, scale: int):
+    app = ctx.web_app()
+    if app is None:
+        return None
+    path = ctx.wsb_file(scale)
+    return lambda: app.parse_wsb_file(path)
+
+
+def bench_create_wsb_xml(ctx: BenchContext, scale: int):
+    app = ctx.web_app()
+    if app is None:
+        return None
+    folders = ctx.mapped_folders(scale)
+    return lambda: app.create_wsb_xml(memory_mb=4096, networking="Disable", mapped_folders=folders)
+
+
+def _tracker(ctx: BenchContext, scale: int):
+    from analytics.analytics import AnalyticsTracker
+    # Work on a copy so that writes do not change the shared fixture
+    path = ctx.root / f"analytics-work-{scale}.json"
+    shutil.copyfile(ctx.analytics_file(scale), path)
+    return AnalyticsTracker(str(path))
+
+
+def bench_track_launch(ctx: BenchContext, scale: int):
+    tracker = _tracker(ctx, scale)
+    return lambda: tracker.track_launch("config-001", template="development", memory_mb=4096)
+
+
+def bench_get_statistics(ctx: BenchContext, scale: int):
+    return _tracker(ctx, scale).get_statistics
+
+
+def bench_get_usage_by_date(ctx: BenchContext, scale: int):
+    tracker = _tracker(ctx, scale)
+    return lambda: tracker.get_usage_by_date(30)
+
+
+def _profile_manager(ctx: BenchContext, scale: int):
+    from profiles.profiles import ProfileManager
+    path = ctx.root / f"profiles-work-{scale}.json"
+    shutil.copyfile(ctx.profiles_file(scale), path)
+    return ProfileManager(str(path), launcher=lambda config_path: None)
+
+
+def bench_list_profiles(ctx: BenchContext, scale: int):
+    manager = _profile_manager(ctx, scale)
+    return lambda: manager.list_profiles(limit=20)
+
+
+def bench_launch_profile(ctx: BenchContext, scale: int):
+    manager = _profile_manager(ctx, scale)
+    names = sorted(manager.data["profiles"])
+    rng = random.Random(ctx.seed)
+    return lambda: manager.launch_profile(rng.choice(names))
+
+
+def bench_record_notification(ctx: BenchContext, scale: int):
+    from notifications.notifier import NotificationHistory
+    path = ctx.root / f"history-work-{scale}.json"
+    shutil.copyfile(ctx.history_file(scale), path)
+    history = NotificationHistory(str(path))
+    return lambda: history.record_notification("launch", "Sandbox Launched", "Started", "config-001")
+
+
+BENCHMARKS = {
+    "create_xml": bench_create_xml,
+    "validate_wsb": bench_validate_wsb,
+    "list_files": bench_list_files,
+    "parse_wsb_file": bench_parse_wsb_file,
+    "create_wsb_xml": bench_create_wsb_xml,
+    "track_launch": bench_track_launch,
+    "get_statistics": bench_get_statistics,
+    "get_usage_by_date": bench_get_usage_by_date,
+    "list_profiles": bench_list_profiles,
+    "launch_profile": bench_launch_profile,
+    "record_notification": bench_record_notification
+}
+
+SCALE_MEANING = {
+    "create_xml": "mapped folders",
+    "validate_wsb": "mapped folders",
+    "list_files": "files in workspace",
+    "parse_wsb_file": "mapped folders",
+    "create_wsb_xml": "mapped folders",
+    "track_launch": "stored launches",
+    "get_statistics": "stored launches",
+    "get_usage_by_date": "stored launches",
+    "list_profiles": "profiles",
+    "launch_profile": "profiles",
+    "record_notification": "stored notifications"
+}
+
+
+def measure(func: Callable, min_time: float, min_runs: int = 5, max_runs: int = 1000) -> Dict:
+    """Median time per call in microseconds.
+
+    Calls are batched so that each sample takes at least MIN_SAMPLE_SECONDS,
+    and samples are taken until both min_runs and min_time are reached.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_SAMPLE_SECONDS or number >= 100000:
+            break
+        number *= 10
+
+    samples = [elapsed / number]
+    total = elapsed
+    while (len(samples) < min_runs or total < min_time) and len(samples) < max_runs:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed / number)
+        total += elapsed
+
+    return {
+        "median_us": round(statistics.median(samples) * 1e6, 3),
+        "min_us": round(min(samples) * 1e6, 3),
+        "samples": len(samples),
+        "calls_per_sample": number
+    }
+
+
+def run(names: List[str], scales: List[int], min_time: float, seed: int) -> Dict:
+    """Run the selected benchmarks at every scale in a temporary directory"""
+    temp_dir = Path(tempfile.mkdtemp(prefix="sandman-microbench-"))
+    saved_env = {key: os.environ.get(key) for key in ("USERPROFILE", "SANDMAN_WORKSPACE")}
+    saved_cwd = os.getcwd()
+    # Profile configs and event journals resolve under %USERPROFILE%; keep
+    # them inside the temporary directory
+    os.environ["USERPROFILE"] = str(temp_dir)
+    os.chdir(temp_dir)
+
+    results: Dict[str, Dict] = {}
+    try:
+        ctx = BenchContext(temp_dir, seed)
+        for name in names:
+            results[name] = {}
+            for scale in scales:
+                func = BENCHMARKS[name](ctx, scale)
+                if func is None:
+                    print(f"- {name:<20} {scale:>7}  skipped (requires Flask)")
+                    continue
+                result = measure(func, min_time)
+                results[name][str(scale)] = result
+                print(f"  {name:<20} {scale:>7}  {result['median_us']:>14.2f} µs")
+    finally:
+        os.chdir(saved_cwd)
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scales": scales,
+        "scale_meaning": {name: SCALE_MEANING[name] for name in names},
+        "results": results
+    }
+
+
+def compare_reports(report: Dict, baseline: Dict, tolerance: float,
+                    min_delta_us: float) -> List[str]:
+    """List benchmarks slower than the baseline by more than tolerance.
+
+    Differences smaller than min_delta_us are ignored, so timer noise on
+    sub-microsecond operations does not count as a regression.
+    """
+    regressions = []
+    for name, scales in report["results"].items():
+        for scale, result in scales.items():
+            base = baseline.get("results", {}).get(name, {}).get(scale)
+            if not base:
+                continue
+            current, previous = result["median_us"], base["median_us"]
+            if current > previous * (1 + tolerance) and current - previous > min_delta_us:
+                regressions.append(f"{name} @ {scale}: {current:.2f} µs > baseline "
+                                   f"{previous:.2f} µs (+{(current / previous - 1):.0%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark Sandman's hot paths")
+    parser.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES),
+                        help="comma-separated data sizes (default 10,1000,100000)")
+    parser.add_argument("--benchmarks", default=",".join(BENCHMARKS),
+                        help="comma-separated benchmarks to run (default: all)")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="minimum seconds of samples per measurement")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE),
+                        help="baseline report to compare against")
+    parser.add_argument("--no-baseline", action="store_true", help="skip the baseline comparison")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed relative slowdown (default 0.5)")
+    parser.add_argument("--min-delta-us", type=float, default=1.0,
+                        help="ignore slowdowns smaller than this many microseconds")
+    parser.add_argument("--save-baseline", help="write the report as a new baseline")
+    args = parser.parse_args(argv)
+
+    names = [name for name in args.benchmarks.split(",") if name]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)} (choose from {', '.join(BENCHMARKS)})")
+    scales = [int(scale) for scale in args.scales.split(",") if scale]
+
+    print(f"Sandman micro-benchmarks: {len(names)} benchmarks at scales "
+          f"{', '.join(str(s) for s in scales)}")
+    report = run(names, scales, args.min_time, args.seed)
+
+    for path in filter(None, [args.output, args.save_baseline]):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Report written to {path}")
+
+    if args.no_baseline or args.save_baseline:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"- No baseline at {args.baseline}; nothing to compare")
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    regressions = compare_reports(report, baseline, args.tolerance, args.min_delta_us)
+    if regressions:
+        print(f"✗ {len(regressions)} regression(s) against {args.baseline}:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print(f"✓ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
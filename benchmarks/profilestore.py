@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Sandman Profile Store Benchmark
+
+Builds a synthetic profiles.json with many profiles in a temporary
+directory and times ProfileManager's indexed queries (list by tag, top-N,
+statistics, tags) and incremental updates against the full-scan approach
+they replaced.
+
+Usage:
+    python benchmarks/profilestore.py [--profiles N] [--tags N] [--repeat N]
+                                      [--seed N] [--output report.json]
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from profiles.profiles import ProfileManager  # noqa: E402
+
+
+def generate_profiles(path: Path, count: int, tag_count: int, seed: int = 42):
+    """Write a profiles.json with count profiles tagged from a tag pool"""
+    rng = random.Random(seed)
+    tags = [f"tag-{i:03d}" for i in range(tag_count)]
+    profiles = {}
+
+    for i in range(count):
+        name = f"profile-{i:06d}"
+        profiles[name] = {
+            "name": name,
+            "config_name": f"config-{i % 500:03d}",
+            "description": f"Synthetic profile {i}",
+            "hotkey": None,
+            "icon": "⚡",
+            # Skewed so a few tags are common and most are rare
+            "tags": sorted(set(rng.choices(tags, weights=range(tag_count, 0, -1),
+                                           k=rng.randint(0, 4)))),
+            "created": datetime.now().isoformat(),
+            "last_used": None,
+            "launch_count": int(rng.paretovariate(1.2)) - 1
+        }
+
+    with open(path, 'w') as f:
+        json.dump({"version": "1.0", "profiles": profiles, "default_profile": None}, f)
+
+
+# Full-scan versions of the queries, as ProfileManager did them before it
+# kept indexes; used as the comparison baseline
+
+def scan_list_profiles(data: Dict, tag: Optional[str] = None) -> List[Dict]:
+    profiles = []
+    for name, profile in data["profiles"].items():
+        if tag and tag not in profile.get("tags", []):
+            continue
+        profile_data = profile.copy()
+        profile_data["name"] = name
+        profiles.append(profile_data)
+    profiles.sort(key=lambda x: x.get("launch_count", 0), reverse=True)
+    return profiles
+
+
+def scan_all_tags(data: Dict) -> List[str]:
+    tags = set()
+    for profile in data["profiles"].values():
+        tags.update(profile.get("tags", []))
+    return sorted(tags)
+
+
+def scan_statistics(data: Dict) -> Dict:
+    total_launches = sum(p.get("launch_count", 0) for p in data["profiles"].values())
+    most_used = max(data["profiles"].items(), key=lambda x: x[1].get("launch_count", 0))
+    return {"total_launches": total_launches, "most_used": most_used[0],
+            "unique_tags": len(scan_all_tags(data))}
+
+
+def time_ms(func: Callable, repeat: int) -> float:
+    """Median time of func() in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def run(profile_count: int, tag_count: int, repeat: int, seed: int) -> Dict:
+    with tempfile.TemporaryDirectory(prefix="sandman-profiles-") as tmp:
+        path = Path(tmp) / "profiles.json"
+        generate_profiles(path, profile_count, tag_count, seed)
+
+        start = time.perf_counter()
+        pm = ProfileManager(str(path))
+        load_ms = (time.perf_counter() - start) * 1000
+
+    data = pm.data
+    common_tag = "tag-000"
+    rare_tag = f"tag-{tag_count - 1:03d}"
+    names = list(data["profiles"])
+    rng = random.Random(seed)
+
+    # Sanity check: the indexed queries agree with the full scans
+    assert pm.get_all_tags() == scan_all_tags(data)
+    assert pm.get_statistics()["total_launches"] == scan_statistics(data)["total_launches"]
+    assert ({p["name"] for p in pm.list_profiles(tag=rare_tag)} ==
+            {p["name"] for p in scan_list_profiles(data, rare_tag)})
+
+    queries = {
+        "list_all": (lambda: pm.list_profiles(), lambda: scan_list_profiles(data)),
+        "list_top10": (lambda: pm.list_profiles(limit=10), lambda: scan_list_profiles(data)[:10]),
+        "list_common_tag": (lambda: pm.list_profiles(tag=common_tag),
+                            lambda: scan_list_profiles(data, common_tag)),
+        "list_rare_tag": (lambda: pm.list_profiles(tag=rare_tag),
+                          lambda: scan_list_profiles(data, rare_tag)),
+        "list_tag_top10": (lambda: pm.list_profiles(tag=common_tag, limit=10),
+                           lambda: scan_list_profiles(data, common_tag)[:10]),
+        "statistics": (pm.get_statistics, lambda: scan_statistics(data)),
+        "all_tags": (pm.get_all_tags, lambda: scan_all_tags(data)),
+    }
+
+    results = {}
+    for name, (indexed, scan) in queries.items():
+        indexed_ms = time_ms(indexed, repeat)
+        scan_ms = time_ms(scan, repeat)
+        results[name] = {
+            "indexed_ms": round(indexed_ms, 4),
+            "scan_ms": round(scan_ms, 4),
+            "speedup": round(scan_ms / indexed_ms, 1) if indexed_ms else None
+        }
+
+    # Incremental maintenance cost per operation
+    def launches():
+        for name in rng.sample(names, 1000):
+            pm.record_launch(name)
+
+    def retags():
+        for name in rng.sample(names, 1000):
+            tags = data["profiles"][name]["tags"]
+            pm.index.remove_tags(name, tags)
+            pm.index.add_tags(name, list(reversed(tags)))
+
+    updates = {
+        "record_launch": time_ms(launches, repeat) / 1000,
+        "retag": time_ms(retags, repeat) / 1000
+    }
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "profiles": profile_count,
+        "tags": tag_count,
+        "load_ms": round(load_ms, 2),
+        "queries": results,
+        "update_ms_per_op": {k: round(v, 5) for k, v in updates.items()}
+    }
+
+
+def print_report(report: Dict):
+    print(f"Profiles: {report['profiles']}  Tags: {report['tags']}  "
+          f"Load + index: {report['load_ms']:.1f} ms")
+    print()
+    print(f"{'query':<18} {'indexed ms':>12} {'scan ms':>12} {'speedup':>9}")
+    for name, result in report["queries"].items():
+        print(f"{name:<18} {result['indexed_ms']:>12.4f} {result['scan_ms']:>12.3f} "
+              f"{result['speedup']:>8}x")
+    print()
+    for name, ms in report["update_ms_per_op"].items():
+        print(f"{name:<18} {ms * 1000:>9.2f} µs/op")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the profile store indexes")
+    parser.add_argument("--profiles", type=int, default=100000, help="synthetic profiles to generate")
+    parser.add_argument("--tags", type=int, default=200, help="size of the tag pool")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (median)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = run(args.profiles, args.tags, args.repeat, args.seed)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Sandman CLI Startup Benchmark
+
+Runs `scripts/sandman.py` subcommands in fresh interpreters against a
+temporary workspace and checks that each stays within a startup budget.
+The budget applies to the time spent on top of a bare `python -c pass`,
+so it measures Sandman's own imports and work rather than the interpreter.
+With --importtime, the slowest imports reported by `-X importtime` are
+listed for each command.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SANDMAN = REPO_ROOT / "scripts" / "sandman.py"
+
+DEFAULT_COMMANDS = [
+    "help",
+    "profiles list",
+    "analytics stats",
+    "notify list",
+    "vcs status"
+]
+
+
+def run_timed(args: List[str], env: Dict, cwd: str) -> float:
+    """Run a command once and return its wall time in milliseconds"""
+    start = time.perf_counter()
+    subprocess.run(args, env=env, cwd=cwd, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def median_time(args: List[str], env: Dict, cwd: str, runs: int) -> float:
+    """Median wall time over several runs, after one warm-up run"""
+    run_timed(args, env, cwd)
+    return statistics.median(run_timed(args, env, cwd) for _ in range(runs))
+
+
+def slowest_imports(command: List[str], env: Dict, cwd: str, top: int) -> List[Dict]:
+    """Get the imports with the highest cumulative time from -X importtime"""
+    result = subprocess.run([sys.executable, "-X", "importtime", str(SANDMAN)] + command,
+                            env=env, cwd=cwd, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, stdin=subprocess.DEVNULL,
+                            universal_newlines=True)
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        # Nested imports are indented; keep only top-level ones so that
+        # nothing is counted twice
+        module = module[1:]
+        if module.startswith(" "):
+            continue
+        imports.append({
+            "module": module,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        })
+
+    return sorted(imports, key=lambda e: e["cumulative_ms"], reverse=True)[:top]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure Sandman CLI startup time")
+    parser.add_argument("--commands", nargs="+", default=DEFAULT_COMMANDS,
+                        help="Subcommands to time, each quoted as one string")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per command")
+    parser.add_argument("--budget", type=float, default=75.0,
+                        help="Allowed milliseconds on top of bare interpreter startup")
+    parser.add_argument("--importtime", action="store_true",
+                        help="Show the slowest imports for each command")
+    parser.add_argument("--top", type=int, default=5, help="Imports to show with --importtime")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="sandman-startup-") as tmp:
+        # Point every subsystem at the temporary directory
+        env = dict(os.environ, USERPROFILE=tmp, HOME=tmp,
+                   SANDMAN_WORKSPACE=os.path.join(tmp, "SandboxConfigs"))
+
+        baseline = median_time([sys.executable, "-c", "pass"], env, tmp, args.runs)
+        print(f"Interpreter startup: {baseline:.1f} ms (budget: +{args.budget:.0f} ms)")
+        print()
+
+        results = []
+        failed = False
+        for command in args.commands:
+            command_args = command.split()
+            elapsed = median_time([sys.executable, str(SANDMAN)] + command_args,
+                                  env, tmp, args.runs)
+            overhead = elapsed - baseline
+            ok = overhead <= args.budget
+            failed = failed or not ok
+
+            result = {"command": command, "median_ms": round(elapsed, 2),
+                      "overhead_ms": round(overhead, 2), "within_budget": ok}
+            mark = "✓" if ok else "✗"
+            print(f"{mark} sandman {command:<20} {elapsed:7.1f} ms  (+{overhead:.1f} ms)")
+
+            if args.importtime:
+                result["slowest_imports"] = slowest_imports(command_args, env, tmp, args.top)
+                for entry in result["slowest_imports"]:
+                    print(f"      {entry['module']:<28} {entry['cumulative_ms']:6.1f} ms")
+
+            results.append(result)
+
+    if args.output:
+        report = {"python": sys.version.split()[0], "interpreter_ms": round(baseline, 2),
+                  "budget_ms": args.budget, "commands": results}
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Sandman Profiling
+
+On-demand profiling of one CLI command or web request: cProfile call
+statistics, tracemalloc allocation totals and wall-clock spans around the
+operations the metrics registry times (XML parsing, JSON persistence,
+subprocesses, web requests). cProfile and tracemalloc are imported only
+when a session starts and the span hook is removed when the last session
+stops, so there is no cost while profiling is off.
+
+Each session writes, under one base name:
+    <base>.pstats           cProfile stats (python -m pstats, snakeviz)
+    <base>.collapsed        call graph as collapsed stacks, in microseconds
+                            (flamegraph.pl, speedscope, inferno)
+    <base>.spans.collapsed  metric spans as collapsed stacks
+    <base>.json             summary: top functions, allocations and spans
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from metrics import registry
+
+
+DEFAULT_DIR_NAME = "sandman-profiling"
+TOP_ENTRIES = 25
+
+# Limits for turning the cProfile call graph into stacks, which can fan
+# out combinatorially in large programs
+MAX_STACK_DEPTH = 64
+MAX_STACKS = 20000
+MIN_STACK_SECONDS = 1e-6
+
+_state_lock = threading.Lock()
+
+
+def default_output_dir() -> Path:
+    """SANDMAN_PROFILE_DIR, or sandman-profiling in the temp directory"""
+    configured = os.environ.get("SANDMAN_PROFILE_DIR")
+    if configured:
+        return Path(configured)
+    import tempfile
+    return Path(tempfile.gettempdir()) / DEFAULT_DIR_NAME
+
+
+def _frame_name(text: str) -> str:
+    """Make a name safe for the collapsed-stack format (';' separates frames)"""
+    return text.replace(";", ":").replace("\n", " ")
+
+
+def _span_name(histogram, labels: Dict) -> str:
+    """Short span name for a histogram observation, e.g. xml(cli,parse)"""
+    name = histogram.name
+    if name.startswith("sandman_"):
+        name = name[len("sandman_"):]
+    if name.endswith("_seconds"):
+        name = name[:-len("_seconds")]
+    values = ",".join(str(labels.get(label, "")) for label in histogram.labelnames)
+    return _frame_name(f"{name}({values})" if values else name)
+
+
+def _function_name(func: Tuple[str, int, str]) -> str:
+    """Readable name for a cProfile function key (file, line, name)"""
+    filename, line, name = func
+    if filename == "~":
+        return _frame_name(name)
+    return _frame_name(f"{name} ({os.path.basename(filename)}:{line})")
+
+
+class _SpanListener:
+    """Routes metric timings to the profiling session of the current thread"""
+
+    def __init__(self):
+        self.sessions: Dict[int, "ProfileSession"] = {}
+        self.process_session: Optional["ProfileSession"] = None
+
+    def _session(self) -> Optional["ProfileSession"]:
+        return self.sessions.get(threading.get_ident(), self.process_session)
+
+    def push(self, histogram, labels: Dict):
+        session = self._session()
+        if session is not None:
+            session._push(_span_name(histogram, labels))
+
+    def pop(self, seconds: float):
+        session = self._session()
+        if session is not None:
+            session._pop(seconds)
+
+    def observe(self, histogram, labels: Dict, seconds: float):
+        session = self._session()
+        if session is not None:
+            session._leaf(_span_name(histogram, labels), seconds)
+
+    def empty(self) -> bool:
+        return not self.sessions and self.process_session is None
+
+
+_LISTENER = _SpanListener()
+
+
+class ProfileSession:
+    """Profile everything between start() and stop() on the calling thread.
+
+    With all_threads, spans from every thread are recorded (for CLI runs,
+    where index parsing happens in worker threads); cProfile always
+    profiles only the thread that started the session. tracemalloc is
+    process-wide, so only one session at a time records allocations.
+    """
+
+    def __init__(self, name: str, output_dir: Optional[Path] = None,
+                 memory: bool = True, all_threads: bool = False):
+        self.name = name
+        self.output_dir = Path(output_dir) if output_dir else default_output_dir()
+        self.memory = memory
+        self.all_threads = all_threads
+
+        self.spans: Dict[Tuple[str, ...], List] = {}
+        self._stacks: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._owns_tracemalloc = False
+        self._thread = None
+        self._started = None
+        self.started_at = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def start(self) -> "ProfileSession":
+        """Begin profiling"""
+        import cProfile
+
+        with _state_lock:
+            if self.memory:
+                import tracemalloc
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._owns_tracemalloc = True
+
+            self._thread = threading.get_ident()
+            if self.all_threads:
+                _LISTENER.process_session = self
+            else:
+                _LISTENER.sessions[self._thread] = self
+            registry.set_span_listener(_LISTENER)
+
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+        return self
+
+    def stop(self, write: bool = True) -> Dict[str, str]:
+        """Stop profiling and write the output files; returns their paths by kind"""
+        if self._profiler is None:
+            return {}
+        self._profiler.disable()
+        wall_seconds = time.perf_counter() - self._started
+
+        memory = None
+        with _state_lock:
+            if self._owns_tracemalloc:
+                import tracemalloc
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+                memory = self._memory_summary(snapshot, current, peak)
+
+            if _LISTENER.process_session is self:
+                _LISTENER.process_session = None
+            _LISTENER.sessions.pop(self._thread, None)
+            if _LISTENER.empty():
+                registry.set_span_listener(None)
+
+        profiler, self._profiler = self._profiler, None
+        if not write:
+            return {}
+        return self.write(profiler, wall_seconds, memory)
+
+    def _stack(self) -> List[str]:
+        ident = threading.get_ident()
+        stack = self._stacks.get(ident)
+        if stack is None:
+            stack = self._stacks[ident] = []
+        return stack
+
+    def _add(self, path: Tuple[str, ...], seconds: float):
+        with self._lock:
+            span = self.spans.get(path)
+            if span is None:
+                self.spans[path] = [1, seconds]
+            else:
+                span[0] += 1
+                span[1] += seconds
+
+    def _push(self, name: str):
+        self._stack().append(name)
+
+    def _pop(self, seconds: float):
+        stack = self._stack()
+        if stack:
+            self._add(tuple(stack), seconds)
+            stack.pop()
+
+    def _leaf(self, name: str, seconds: float):
+        self._add(tuple(self._stack()) + (name,), seconds)
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _memory_summary(snapshot, current: int, peak: int) -> Dict:
+        top = []
+        for stat in snapshot.statistics("lineno")[:TOP_ENTRIES]:
+            frame = stat.traceback[0]
+            top.append({"location": f"{frame.filename}:{frame.lineno}",
+                        "size_bytes": stat.size, "count": stat.count})
+        return {"current_bytes": current, "peak_bytes": peak, "top_allocations": top}
+
+    def span_summary(self) -> List[Dict]:
+        """Spans with total and self time (total minus child spans), slowest first"""
+        child_seconds: Dict[Tuple[str, ...], float] = {}
+        for path, (_, seconds) in self.spans.items():
+            if len(path) > 1:
+                child_seconds[path[:-1]] = child_seconds.get(path[:-1], 0.0) + seconds
+
+        summary = []
+        for path, (count, seconds) in self.spans.items():
+            self_seconds = max(seconds - child_seconds.get(path, 0.0), 0.0)
+            summary.append({"path": ";".join(path), "count": count,
+                            "total_ms": round(seconds * 1000, 3),
+                            "self_ms": round(self_seconds * 1000, 3)})
+        return sorted(summary, key=lambda span: span["total_ms"], reverse=True)
+
+    @staticmethod
+    def collapse_stats(stats: Dict) -> List[Tuple[str, int]]:
+        """Turn cProfile call-graph stats into (stack, microseconds) pairs.
+
+        cProfile records caller -> callee edges, not full stacks, so each
+        callee's time is split across its callers in proportion to the
+        cumulative time of each edge. Recursion is cut at the first repeat.
+        """
+        callees: Dict[Tuple, List[Tuple[Tuple, float]]] = {}
+        roots = []
+        for func, (_, _, _, _, callers) in stats.items():
+            known = [caller for caller in callers if caller in stats]
+            if not known:
+                roots.append(func)
+            for caller in known:
+                callees.setdefault(caller, []).append((func, callers[caller][3]))
+
+        stacks: Dict[str, float] = {}
+
+        def walk(func, path: List[str], on_path: set, seconds: float):
+            if len(stacks) >= MAX_STACKS:
+                return
+            _, _, tottime, cumtime, _ = stats[func]
+            scale = seconds / cumtime if cumtime else 0.0
+            key = ";".join(path)
+            stacks[key] = stacks.get(key, 0.0) + tottime * scale
+
+            if len(path) >= MAX_STACK_DEPTH:
+                return
+            for callee, edge_cumtime in callees.get(func, []):
+                share = edge_cumtime * scale
+                if callee in on_path or share < MIN_STACK_SECONDS:
+                    continue
+                on_path.add(callee)
+                walk(callee, path + [_function_name(callee)], on_path, share)
+                on_path.discard(callee)
+
+        for root in roots:
+            walk(root, [_function_name(root)], {root}, stats[root][3])
+
+        return [(stack, int(seconds * 1_000_000)) for stack, seconds in stacks.items()
+                if int(seconds * 1_000_000) > 0]
+
+    def write(self, profiler, wall_seconds: float, memory: Optional[Dict]) -> Dict[str, str]:
+        """Write the pstats, collapsed stacks and JSON summary"""
+        import pstats
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        safe_name = re.sub(r"[^\w.-]+", "_", self.name).strip("_") or "session"
+        base = self.output_dir / f"{safe_name}-{self.started_at.strftime('%Y%m%d-%H%M%S-%f')}"
+        files = {
+            "pstats": f"{base}.pstats",
+            "collapsed": f"{base}.collapsed",
+            "spans": f"{base}.spans.collapsed",
+            "summary": f"{base}.json"
+        }
+
+        profiler.dump_stats(files["pstats"])
+        stats = pstats.Stats(profiler).stats
+
+        with open(files["collapsed"], 'w', encoding='utf-8') as f:
+            for stack, micros in self.collapse_stats(stats):
+                f.write(f"{stack} {micros}\n")
+
+        spans = self.span_summary()
+        with open(files["spans"], 'w', encoding='utf-8') as f:
+            for span in spans:
+                micros = int(span["self_ms"] * 1000)
+                if micros > 0:
+                    f.write(f"{span['path']} {micros}\n")
+
+        top_functions = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+        summary = {
+            "name": self.name,
+            "started": self.started_at.isoformat(),
+            "wall_ms": round(wall_seconds * 1000, 3),
+            "files": files,
+            "top_functions": [
+                {"function": _function_name(func), "calls": calls,
+                 "tottime_ms": round(tottime * 1000, 3), "cumtime_ms": round(cumtime * 1000, 3)}
+                for func, (_, calls, tottime, cumtime, _) in top_functions[:TOP_ENTRIES]
+            ],
+            "memory": memory,
+            "spans": spans
+        }
+        with open(files["summary"], 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        return files
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Sandman Metrics
+
+Process-wide registry of counters, gauges and fixed-bucket histograms.
+Instrumented code records into the shared REGISTRY; the web UI serves it at
+/metrics in the Prometheus text format and `sandman.py metrics` dumps it
+after running a command. Recording takes one striped lock and no allocation
+once a label set has been seen, so it is cheap enough for hot paths.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+# Latency buckets in seconds, from 100 µs to 10 s
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Locks shared by all metrics; a label set always maps to the same lock
+LOCK_STRIPES = 16
+
+# Receives histogram observations as spans while a profiling session is
+# active (see metrics/profiling.py); None otherwise, which costs one check
+_span_listener = None
+
+
+def set_span_listener(listener):
+    """Install (or remove, with None) the span listener"""
+    global _span_listener
+    _span_listener = listener
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value (integers without a trailing .0)"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Timer:
+    """Context manager that observes its elapsed time into a histogram"""
+
+    __slots__ = ("histogram", "labels", "start", "elapsed")
+
+    def __init__(self, histogram: "Histogram", labels: Dict):
+        self.histogram = histogram
+        self.labels = labels
+        self.elapsed = None
+
+    def __enter__(self):
+        if _span_listener is not None:
+            _span_listener.push(self.histogram, self.labels)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        self.histogram._record(self.histogram._key(self.labels), self.elapsed)
+        if _span_listener is not None:
+            _span_listener.pop(self.elapsed)
+        return False
+
+
+class Metric:
+    """Base class: one metric family with a value per label set"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str],
+                 locks: List[threading.Lock]):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._locks = locks
+        # Held to add or drop label sets, so readers can take a consistent
+        # snapshot; updates to existing label sets only take their stripe
+        self._keys_lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        """Turn keyword labels into the tuple key for this family"""
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {', '.join(self.labelnames) or '(none)'}")
+        try:
+            return tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError:
+            raise ValueError(f"{self.name} takes labels {', '.join(self.labelnames)}")
+
+    def _lock(self, key: Tuple[str, ...]) -> threading.Lock:
+        return self._locks[hash((self.name, key)) % len(self._locks)]
+
+    def _add(self, key: Tuple[str, ...], value) -> object:
+        """Add a label set (the caller holds its stripe lock)"""
+        with self._keys_lock:
+            return self._values.setdefault(key, value)
+
+    def _increment(self, key: Tuple[str, ...], amount: float):
+        with self._lock(key):
+            values = self._values
+            if key in values:
+                values[key] += amount
+            else:
+                self._add(key, amount)
+
+    def items(self) -> List[Tuple[Dict[str, str], object]]:
+        """Get (labels, value) pairs, sorted by label values"""
+        with self._keys_lock:
+            snapshot = list(self._values.items())
+        result = []
+        for key, value in sorted(snapshot, key=lambda item: item[0]):
+            if isinstance(value, list):
+                with self._lock(key):
+                    value = [list(value[0]), value[1], value[2]]
+            result.append((dict(zip(self.labelnames, key)), value))
+        return result
+
+    def clear(self):
+        """Drop all recorded values"""
+        with self._keys_lock:
+            # A new dict, so an update racing with clear() lands in the old one
+            self._values = {}
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """Add amount (must not be negative)"""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._increment(self._key(labels), amount)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock(key):
+            values = self._values
+            if key in values:
+                values[key] = value
+            else:
+                self._add(key, value)
+
+    def inc(self, amount: float = 1, **labels):
+        self._increment(self._key(labels), amount)
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed upper bounds.
+
+    Each label set keeps [bucket counts, sum, count]; bucket counts are
+    stored per bucket and made cumulative only when exported.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str],
+                 locks: List[threading.Lock], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames, locks)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        self._record(self._key(labels), value)
+        if _span_listener is not None:
+            _span_listener.observe(self, labels, value)
+
+    def _record(self, key: Tuple[str, ...], value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock(key):
+            state = self._values.get(key)
+            if state is None:
+                state = self._add(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels) -> _Timer:
+        """Time a block: `with histogram.time(op="parse"): ...`"""
+        return _Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def cumulative(self, counts: List[int]) -> List[Tuple[float, int]]:
+        """Pair each upper bound (ending with +Inf) with its cumulative count"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, counts: List[int], q: float) -> Optional[float]:
+        """Estimate a quantile as the upper bound of the bucket it falls in"""
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        for bound, cumulative in self.cumulative(counts):
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """Named metric families sharing a set of striped locks"""
+
+    def __init__(self, stripes: int = LOCK_STRIPES):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, help_text: str, labelnames: Sequence[str], **kwargs):
+        """Get or create a metric family; re-registering returns the existing one"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is not None:
+                if type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                    raise ValueError(f"Metric {name} is already registered as a different type")
+                return metric
+            metric = cls(name, help_text, labelnames, self._locks, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def metrics(self) -> List[Metric]:
+        """All registered families, sorted by name"""
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def reset(self):
+        """Clear every recorded value, keeping the registered families"""
+        for metric in self.metrics():
+            metric.clear()
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+
+            for labels, value in metric.items():
+                pairs = [f'{k}="{_escape(v)}"' for k, v in labels.items()]
+                if metric.kind != "histogram":
+                    label_text = "{" + ",".join(pairs) + "}" if pairs else ""
+                    lines.append(f"{metric.name}{label_text} {_format_value(value)}")
+                    continue
+
+                counts, total, count = value
+                for bound, cumulative in metric.cumulative(counts):
+                    le = pairs + [f'le="{_format_value(bound)}"']
+                    lines.append(f"{metric.name}_bucket{{{','.join(le)}}} {cumulative}")
+                label_text = "{" + ",".join(pairs) + "}" if pairs else ""
+                lines.append(f"{metric.name}_sum{label_text} {_format_value(total)}")
+                lines.append(f"{metric.name}_count{label_text} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        """Get all metrics as a JSON-serializable dict.
+
+        Histograms are reported as count, sum, mean and p50/p95/p99
+        estimates (bucket upper bounds) instead of raw buckets.
+        """
+        result = {}
+        for metric in self.metrics():
+            samples = []
+            for labels, value in metric.items():
+                if metric.kind != "histogram":
+                    samples.append({"labels": labels, "value": value})
+                    continue
+
+                counts, total, count = value
+                sample = {"labels": labels, "count": count, "sum": total,
+                          "mean": total / count if count else None}
+                for q in (0.5, 0.95, 0.99):
+                    estimate = metric.quantile(counts, q)
+                    sample[f"p{int(q * 100)}"] = None if estimate == float("inf") else estimate
+                samples.append(sample)
+
+            result[metric.name] = {"type": metric.kind, "help": metric.help, "samples": samples}
+        return result
+
+    def render_text(self) -> str:
+        """Render recorded metrics as a short human-readable report"""
+        lines = []
+        for name, family in self.snapshot().items():
+            if not family["samples"]:
+                continue
+            lines.append(name)
+            for sample in family["samples"]:
+                labels = " ".join(f"{k}={v}" for k, v in sample["labels"].items()) or "-"
+                if family["type"] == "histogram":
+                    mean = sample["mean"] * 1000 if sample["mean"] is not None else 0
+                    p95 = sample["p95"]
+                    p95_text = f"≤{p95 * 1000:.2f} ms" if p95 is not None else "> max bucket"
+                    lines.append(f"  {labels:<40} n={sample['count']:<6} "
+                                 f"mean={mean:.3f} ms  p95 {p95_text}")
+                else:
+                    lines.append(f"  {labels:<40} {_format_value(sample['value'])}")
+        return "\n".join(lines) if lines else "No metrics recorded"
+
+
+# The registry shared by every Sandman component in this process
+REGISTRY = MetricsRegistry()
+
+# Metrics recorded by more than one component
+
+XML_SECONDS = REGISTRY.histogram(
+    "sandman_xml_seconds", "Time to parse or validate a .wsb file", ["component", "op"])
+
+SUBPROCESS_SECONDS = REGISTRY.histogram(
+    "sandman_subprocess_seconds", "Time to spawn or run an external process", ["command", "op"])
+
+JSON_IO_SECONDS = REGISTRY.histogram(
+    "sandman_json_io_seconds", "Time to load or save a JSON data file", ["store", "op"])
+
+JSON_IO_BYTES = REGISTRY.counter(
+    "sandman_json_io_bytes_total", "Bytes read or written by JSON data files", ["store", "op"])
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "sandman_cache_requests_total", "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"])
+
+ERRORS = REGISTRY.counter(
+    "sandman_errors_total", "Errors that were handled instead of raised", ["component", "kind"])
+
+
+def record_json_io(store: str, op: str, file, started: float):
+    """Record a JSON load or save of an open file that began at `started`.
+
+    Call it inside the `with open(...)` block, after json.load/json.dump;
+    the byte count is the file's size at that point.
+    """
+    if op == "save":
+        file.flush()
+    JSON_IO_BYTES.inc(os.fstat(file.fileno()).st_size, store=store, op=op)
+    JSON_IO_SECONDS.observe(time.perf_counter() - started, store=store, op=op)
+
+
+def count_cache(cache: str, hits: int = 0, misses: int = 0):
+    """Record cache hits and misses"""
+    if hits:
+        CACHE_REQUESTS.inc(hits, cache=cache, result="hit")
+    if misses:
+        CACHE_REQUESTS.inc(misses, cache=cache, result="miss")
@@ -6,13 +6,20 @@ Send desktop notifications for sandbox events using Windows toast notifications.
 """
 
 import os
+import sys
 import subprocess
 import json
+import time
 from pathlib import Path
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from datetime import datetime
 from enum import Enum
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from metrics.registry import ERRORS, SUBPROCESS_SECONDS, record_json_io
+
 
 class NotificationType(Enum):
     """Types of notifications"""
@@ -39,10 +46,13 @@ class SandmanNotifier:
         """Load notification configuration"""
         if self.config_file.exists():
             try:
+                started = time.perf_counter()
                 with open(self.config_file, 'r') as f:
-                    return json.load(f)
+                    config = json.load(f)
+                    record_json_io("notifications_config", "load", f, started)
+                return config
             except (json.JSONDecodeError, IOError):
-                pass
+                ERRORS.inc(component="notify", kind="load")
 
         # Default configuration
         return {
@@ -57,8 +67,10 @@ class SandmanNotifier:
     def _save_config(self):
         """Save notification configuration"""
         self.config_file.parent.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
         with open(self.config_file, 'w') as f:
             json.dump(self.config, f, indent=2)
+            record_json_io("notifications_config", "save", f, started)
 
     def is_enabled(self) -> bool:
         """Check if notifications are enabled"""
@@ -121,16 +133,19 @@ $toast = [Windows.UI.Notifications.ToastNotification]::new($xml)
 """
 
         try:
-            result = subprocess.run(
-                ["powershell", "-NoProfile", "-Command", ps_script],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
+            with SUBPROCESS_SECONDS.time(command="powershell", op="toast"):
+                result = subprocess.run(
+                    ["powershell", "-NoProfile", "-Command", ps_script],
+                    capture_output=True,
+                    text=True,
+                    timeout=5
+                )
             return True, "Notification sent"
         except subprocess.TimeoutExpired:
+            ERRORS.inc(component="notify", kind="timeout")
             return False, "Notification timed out"
         except Exception as e:
+            ERRORS.inc(component="notify", kind="toast")
             # Fallback: Try using BurntToast module or msg command
             return self._send_fallback_notification(title, message)
 
@@ -139,15 +154,17 @@ $toast = [Windows.UI.Notifications.ToastNotification]::new($xml)
         try:
             # Use msg command as last resort (only works on some Windows versions)
             full_message = f"{title}\n\n{message}"
-            subprocess.run(
-                ["msg", "*", full_message],
-                check=False,
-                capture_output=True,
-                timeout=2
-            )
+            with SUBPROCESS_SECONDS.time(command="msg", op="fallback"):
+                subprocess.run(
+                    ["msg", "*", full_message],
+                    check=False,
+                    capture_output=True,
+                    timeout=2
+                )
             return True, "Notification sent (fallback)"
         except:
             # If all methods fail, silently continue
+            ERRORS.inc(component="notify", kind="fallback")
             return False, "Could not send notification"
 
     def notify_launch(self, config_name: str, profile_name: Optional[str] = None):
@@ -245,10 +262,13 @@ class NotificationHistory:
         """Load notification history"""
         if self.history_file.exists():
             try:
+                started = time.perf_counter()
                 with open(self.history_file, 'r') as f:
-                    return json.load(f)
+                    data = json.load(f)
+                    record_json_io("notifications_history", "load", f, started)
+                return data
             except (json.JSONDecodeError, IOError):
-                pass
+                ERRORS.inc(component="notify", kind="history_load")
 
         return {
             "notifications": [],
@@ -272,8 +292,10 @@ class NotificationHistory:
         if len(self.data["notifications"]) > 1000:
             self.data["notifications"] = self.data["notifications"][-1000:]
 
+        started = time.perf_counter()
         with open(self.history_file, 'w') as f:
             json.dump(self.data, f, indent=2)
+            record_json_io("notifications_history", "save", f, started)
 
     def record_notification(self, notification_type: str, title: str,
                           message: str, config_name: Optional[str] = None):
@@ -303,17 +325,18 @@ class NotificationHistory:
 
 
 # CLI Interface
-if __name__ == "__main__":
-    import sys
-
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point (also used by `sandman notify`)"""
+    argv = sys.argv[1:] if argv is None else argv
     notifier = SandmanNotifier()
 
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
+    if argv:
+        command = argv[0].lower()
 
         if command == "test":
             success, message = notifier.test_notification()
             print(f"{'✓' if success else '✗'} {message}")
+            return 0 if success else 1
 
         elif command == "enable":
             notifier.enable_notifications(True)
@@ -331,27 +354,27 @@ if __name__ == "__main__":
             notifier.set_sound(False)
             print("✓ Notification sounds disabled")
 
-        elif command == "launch" and len(sys.argv) >= 3:
-            config_name = sys.argv[2]
-            profile_name = sys.argv[3] if len(sys.argv) > 3 else None
+        elif command == "launch" and len(argv) >= 2:
+            config_name = argv[1]
+            profile_name = argv[2] if len(argv) > 2 else None
             notifier.notify_launch(config_name, profile_name)
             print(f"✓ Launch notification sent for '{config_name}'")
 
-        elif command == "error" and len(sys.argv) >= 3:
-            error_msg = sys.argv[2]
-            config_name = sys.argv[3] if len(sys.argv) > 3 else None
+        elif command == "error" and len(argv) >= 2:
+            error_msg = argv[1]
+            config_name = argv[2] if len(argv) > 2 else None
             notifier.notify_error(error_msg, config_name)
             print("✓ Error notification sent")
 
-        elif command == "complete" and len(sys.argv) >= 3:
-            config_name = sys.argv[2]
-            duration = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        elif command == "complete" and len(argv) >= 2:
+            config_name = argv[1]
+            duration = int(argv[2]) if len(argv) > 2 else None
             notifier.notify_completion(config_name, duration)
             print("✓ Completion notification sent")
 
-        elif command == "custom" and len(sys.argv) >= 4:
-            title = sys.argv[2]
-            message = sys.argv[3]
+        elif command == "custom" and len(argv) >= 3:
+            title = argv[1]
+            message = argv[2]
             notifier.notify_custom(title, message)
             print("✓ Custom notification sent")
 
@@ -374,6 +397,7 @@ if __name__ == "__main__":
             print("  python notifier.py complete <config> [duration]  - Completion notification")
             print("  python notifier.py custom <title> <message>      - Custom notification")
             print("  python notifier.py config                        - Show configuration")
+            return 2
     else:
         config = notifier.get_config()
         status = "Enabled" if config["enabled"] else "Disabled"
@@ -381,3 +405,9 @@ if __name__ == "__main__":
         print(f"📬 Notifications: {status}")
         print(f"🔊 Sound: {sound}")
         print("\nRun 'python notifier.py test' to test notifications")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,47 +6,488 @@ Create and manage one-click preset environments for common scenarios.
 """
 
 import json
+import math
 import os
-import subprocess
+import re
+import sys
+import time
+from bisect import bisect_left, insort
+from heapq import nlargest, nsmallest
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 from datetime import datetime
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from metrics.registry import ERRORS, SUBPROCESS_SECONDS, record_json_io
+
+
+class ProfileIndex:
+    """Incrementally maintained lookups over the profiles.
+
+    Keeps a tag -> names inverted index, profiles bucketed by launch count
+    with the distinct counts kept sorted, and the total launch count, so
+    listing by tag, top-N and statistics never scan every profile.
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, Dict]] = None):
+        self.by_tag: Dict[str, Set[str]] = {}
+        # Launch count -> names (dicts keep the order profiles entered the bucket)
+        self.by_count: Dict[int, Dict[str, None]] = {}
+        self.counts: List[int] = []
+        self.total_launches = 0
+
+        for name, profile in (profiles or {}).items():
+            self.add(name, profile)
+
+    def add(self, name: str, profile: Dict):
+        self.add_tags(name, profile.get("tags") or [])
+        self._add_count(name, profile.get("launch_count", 0))
+
+    def remove(self, name: str, profile: Dict):
+        self.remove_tags(name, profile.get("tags") or [])
+        self._remove_count(name, profile.get("launch_count", 0))
+
+    def add_tags(self, name: str, tags: Iterable[str]):
+        for tag in set(tags):
+            self.by_tag.setdefault(tag, set()).add(name)
+
+    def remove_tags(self, name: str, tags: Iterable[str]):
+        for tag in set(tags):
+            names = self.by_tag.get(tag)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del self.by_tag[tag]
+
+    def set_launch_count(self, name: str, old: int, new: int):
+        self._remove_count(name, old)
+        self._add_count(name, new)
+
+    def _add_count(self, name: str, count: int):
+        bucket = self.by_count.get(count)
+        if bucket is None:
+            bucket = self.by_count[count] = {}
+            insort(self.counts, count)
+        bucket[name] = None
+        self.total_launches += count
+
+    def _remove_count(self, name: str, count: int):
+        bucket = self.by_count.get(count)
+        if bucket is None or name not in bucket:
+            return
+        del bucket[name]
+        if not bucket:
+            del self.by_count[count]
+            del self.counts[bisect_left(self.counts, count)]
+        self.total_launches -= count
+
+    def most_used(self) -> Iterable[str]:
+        """Yield profile names, most launched first"""
+        for count in reversed(self.counts):
+            yield from self.by_count[count]
+
+
+# Launches lose half their weight in the quick-launch ranking every 14 days
+FRECENCY_HALF_LIFE = 14 * 24 * 3600
+
+_TOKEN_SPLIT = re.compile(r"[^\w+]+")
+
+
+def bump_frecency(key: Optional[float], now: Optional[float] = None) -> float:
+    """Add one launch at time now to a frecency key.
+
+    The key is log2(score) + t / FRECENCY_HALF_LIFE, where score is the
+    decayed launch count at time t. Decay multiplies every score by the
+    same factor, so keys can be compared directly without recomputing them
+    as time passes; only the launched profile's key changes.
+    """
+    now = time.time() if now is None else now
+    offset = now / FRECENCY_HALF_LIFE
+    if key is None:
+        return offset
+
+    # log2(2 ** decayed + 1), computed without overflowing for large scores
+    decayed = key - offset
+    if decayed > 0:
+        return offset + decayed + math.log2(1 + 2 ** -decayed)
+    return offset + math.log2(1 + 2 ** decayed)
+
+
+def frecency_score(key: Optional[float], now: Optional[float] = None) -> float:
+    """Decayed launch count for a frecency key at time now"""
+    if key is None:
+        return 0.0
+    now = time.time() if now is None else now
+    return 2 ** (key - now / FRECENCY_HALF_LIFE)
+
+
+def seed_frecency(profile: Dict) -> Optional[float]:
+    """Frecency key for a profile from before frecency was tracked"""
+    count = profile.get("launch_count", 0)
+    if count <= 0 or not profile.get("last_used"):
+        return None
+    try:
+        last_used = datetime.fromisoformat(profile["last_used"]).timestamp()
+    except ValueError:
+        return None
+    return math.log2(count) + last_used / FRECENCY_HALF_LIFE
+
+
+def _tokens(profile: Dict) -> Set[str]:
+    """Searchable tokens of a profile: name, description, tags and hotkey"""
+    name = profile["name"].lower()
+    tokens = {name}
+    tokens.update(_TOKEN_SPLIT.split(name))
+    tokens.update(_TOKEN_SPLIT.split((profile.get("description") or "").lower()))
+    for tag in profile.get("tags") or []:
+        tokens.add(tag.lower())
+        tokens.update(_TOKEN_SPLIT.split(tag.lower()))
+    if profile.get("hotkey"):
+        tokens.add(profile["hotkey"].lower().replace(" ", ""))
+    tokens.discard("")
+    return tokens
+
+
+class QuickLaunchIndex:
+    """Prefix tries over profiles for keystroke-by-keystroke lookups.
+
+    Every trie node holds the names of the profiles whose name (or one of
+    whose tokens) starts with that prefix, so a query term is one walk down
+    a trie. Profiles are also kept sorted by frecency, so the best matches
+    of a large result set are found without sorting it.
+    """
+
+    # Result sets larger than this are ranked by walking the sorted profiles
+    SCAN_THRESHOLD = 256
+
+    def __init__(self, profiles: Optional[Dict[str, Dict]] = None):
+        # Trie node: [children, names]
+        self.names_root = [{}, set()]
+        self.tokens_root = [{}, set()]
+        self.profiles: Dict[str, Dict] = {}
+        self._tokens: Dict[str, Set[str]] = {}
+        self._lower: Dict[str, str] = {}
+        # Profiles sorted by _rank_key (best first), and each profile's key
+        self._order: List[Tuple] = []
+        self._keys: Dict[str, Tuple] = {}
+
+        for name, profile in (profiles or {}).items():
+            self.profiles[name] = profile
+            self._index(name, profile)
+            self._keys[name] = self._rank_key(name)
+        self._order = sorted(self._keys.values())
+
+    @staticmethod
+    def _insert(root: List, token: str, name: str):
+        node = root
+        for char in token:
+            child = node[0].get(char)
+            if child is None:
+                child = node[0][char] = [{}, set()]
+            child[1].add(name)
+            node = child
+
+    @staticmethod
+    def _delete(root: List, token: str, name: str):
+        node = root
+        for char in token:
+            node = node[0].get(char)
+            if node is None:
+                return
+            node[1].discard(name)
+
+    @staticmethod
+    def _prefix(root: List, term: str) -> Set[str]:
+        node = root
+        for char in term:
+            node = node[0].get(char)
+            if node is None:
+                return set()
+        return node[1]
+
+    def _index(self, name: str, profile: Dict):
+        lowered = name.lower()
+        self._lower[lowered] = name
+        self._insert(self.names_root, lowered, name)
+        tokens = _tokens(profile)
+        self._tokens[name] = tokens
+        for token in tokens:
+            self._insert(self.tokens_root, token, name)
+
+    def _rank_key(self, name: str) -> Tuple:
+        profile = self.profiles[name]
+        key = profile.get("frecency")
+        return (-key if key is not None else math.inf, -profile.get("launch_count", 0), name)
+
+    def add(self, name: str, profile: Dict):
+        self.remove(name)
+        self.profiles[name] = profile
+        self._index(name, profile)
+        self._keys[name] = self._rank_key(name)
+        insort(self._order, self._keys[name])
+
+    def remove(self, name: str):
+        if name not in self.profiles:
+            return
+        del self._order[bisect_left(self._order, self._keys.pop(name))]
+        self._lower.pop(name.lower(), None)
+        self._delete(self.names_root, name.lower(), name)
+        for token in self._tokens.pop(name, ()):
+            self._delete(self.tokens_root, token, name)
+        del self.profiles[name]
+
+    def update(self, name: str, profile: Dict):
+        self.add(name, profile)
+
+    def reorder(self, name: str):
+        """Move a profile to its new place after its frecency changed"""
+        old = self._keys.get(name)
+        if old is None:
+            return
+        del self._order[bisect_left(self._order, old)]
+        self._keys[name] = self._rank_key(name)
+        insort(self._order, self._keys[name])
+
+    def _best(self, names: Set[str], limit: int, exclude: Set[str]) -> List[str]:
+        """The limit best-ranked names of a set"""
+        if limit <= 0 or not names:
+            return []
+        if len(names) <= self.SCAN_THRESHOLD:
+            return [key[-1] for key in nsmallest(
+                limit, (self._keys[name] for name in names if name not in exclude))]
+
+        best = []
+        for key in self._order:
+            if key[-1] in names and key[-1] not in exclude:
+                best.append(key[-1])
+                if len(best) == limit:
+                    break
+        return best
+
+    @staticmethod
+    def _is_subsequence(query: str, text: str) -> bool:
+        position = 0
+        for char in query:
+            position = text.find(char, position) + 1
+            if not position:
+                return False
+        return True
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, str]]:
+        """Find profiles matching query; returns (name, match type) pairs.
+
+        Matches are ranked exact name, then name prefix, then profiles where
+        every whitespace-separated term prefixes a token (name part,
+        description word, tag or hotkey), each by frecency. Only if nothing
+        matches, names starting with the query's first character and
+        containing its characters in order ("ddev" -> "daily-dev") are
+        returned as fuzzy matches. An empty query returns the top profiles.
+        """
+        query = query.strip().lower()
+        if not query:
+            return [(key[-1], "recent") for key in self._order[:limit]]
+
+        results = []
+        seen = set()
+
+        def take(names: List[str], match: str):
+            for name in names:
+                results.append((name, match))
+                seen.add(name)
+
+        exact = self._lower.get(query)
+        if exact is not None:
+            take([exact], "exact")
+
+        take(self._best(self._prefix(self.names_root, query), limit - len(results), seen), "prefix")
+
+        if len(results) < limit:
+            matches = sorted((self._prefix(self.tokens_root, term) for term in query.split()),
+                             key=len)
+            tokens = matches[0] if len(matches) == 1 else matches[0].intersection(*matches[1:])
+            take(self._best(tokens, limit - len(results), seen), "token")
+
+        if not results:
+            # Walk in rank order so the scan stops at the first limit matches
+            compact = query.replace(" ", "")
+            candidates = self._prefix(self.names_root, compact[0])
+            fuzzy = []
+            for key in self._order if len(candidates) > self.SCAN_THRESHOLD else sorted(
+                    self._keys[name] for name in candidates):
+                name = key[-1]
+                if name in candidates and self._is_subsequence(compact, name.lower()):
+                    fuzzy.append(name)
+                    if len(fuzzy) == limit:
+                        break
+            take(fuzzy, "fuzzy")
+
+        return results
+
+
+# Bulk profile archives (JSON lines, optionally gzipped)
+ARCHIVE_FORMAT = "sandman-profiles"
+ARCHIVE_VERSION = 1
+IMPORT_POLICIES = ["skip", "overwrite", "rename"]
+
+
+# Creates or refreshes shortcuts described by a JSON payload on stdin:
+# {"shortcuts": [{"path", "target", "arguments", "description"}, ...]}.
+# Writes {"results": [{"path", "status", "error"}, ...]} to stdout.
+SHORTCUT_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+[Console]::InputEncoding = New-Object System.Text.UTF8Encoding $false
+[Console]::OutputEncoding = New-Object System.Text.UTF8Encoding $false
+$payload = [Console]::In.ReadToEnd() | ConvertFrom-Json
+$shell = New-Object -ComObject WScript.Shell
+$resolved = @{}
+$results = @()
+foreach ($item in $payload.shortcuts) {
+    try {
+        if (-not $resolved.ContainsKey($item.target)) {
+            $command = Get-Command $item.target -ErrorAction SilentlyContinue
+            $resolved[$item.target] = if ($command) { $command.Source } else { $item.target }
+        }
+        $target = $resolved[$item.target]
+        $exists = Test-Path -LiteralPath $item.path
+        $shortcut = $shell.CreateShortcut($item.path)
+        if ($exists -and $shortcut.TargetPath -ieq $target -and
+                $shortcut.Arguments -ceq $item.arguments -and
+                $shortcut.Description -ceq $item.description) {
+            $status = 'unchanged'
+        } else {
+            $shortcut.TargetPath = $target
+            $shortcut.Arguments = $item.arguments
+            $shortcut.Description = $item.description
+            $shortcut.Save()
+            $status = if ($exists) { 'updated' } else { 'created' }
+        }
+        $results += @{ path = $item.path; status = $status }
+    } catch {
+        $results += @{ path = $item.path; status = 'failed'; error = $_.Exception.Message }
+    }
+}
+@{ results = $results } | ConvertTo-Json -Compress -Depth 3
+"""
+
+
+def run_powershell(script: str, stdin: str) -> str:
+    """Run a PowerShell script with text on stdin and return its stdout (default shell invoker)"""
+    import base64
+    import subprocess
+
+    # -EncodedCommand avoids any quoting of the script on the command line
+    encoded = base64.b64encode(script.encode("utf-16-le")).decode("ascii")
+    with SUBPROCESS_SECONDS.time(command="powershell", op="script"):
+        result = subprocess.run(
+            ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass",
+             "-EncodedCommand", encoded],
+            input=stdin.encode("utf-8"),
+            capture_output=True,
+            check=True
+        )
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def spawn_sandbox(config_path: Path):
+    """Start Windows Sandbox with a configuration file (default launcher)"""
+    import subprocess
+    with SUBPROCESS_SECONDS.time(command="sandbox", op="spawn"):
+        subprocess.Popen(["WindowsSandbox.exe", str(config_path)], shell=True)
+
 
 class ProfileManager:
     """Manage quick launch profiles"""
 
-    def __init__(self, profiles_file: Optional[str] = None):
-        """Initialize profile manager"""
+    # Sandboxes started at once by a group launch, unless the group says otherwise
+    DEFAULT_GROUP_CONCURRENCY = 4
+
+    def __init__(self, profiles_file: Optional[str] = None,
+                 launcher: Optional[Callable[[Path], None]] = None,
+                 shell_invoker: Optional[Callable[[str, str], str]] = None):
+        """Initialize profile manager.
+
+        launcher starts a sandbox for a .wsb path; it defaults to running
+        WindowsSandbox.exe and can be replaced for testing or remote hosts.
+        shell_invoker(script, stdin) runs a PowerShell script and returns
+        its stdout; it defaults to run_powershell.
+        """
+        self.launcher = launcher or spawn_sandbox
+        self.shell_invoker = shell_invoker or run_powershell
         if profiles_file:
             self.profiles_file = Path(profiles_file)
         else:
             workspace = os.path.expandvars("%USERPROFILE%\\Documents\\wsb-files")
             self.profiles_file = Path(workspace) / "profiles.json"
 
+        self._loaded_mtime_ns = None
+        self._quick = None
+        self.data = self._load_data()
+        self.index = ProfileIndex(self.data["profiles"])
+
+    def refresh(self) -> bool:
+        """Reload profiles if the file changed on disk; returns True if reloaded"""
+        try:
+            mtime_ns = self.profiles_file.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns == self._loaded_mtime_ns:
+            return False
+
         self.data = self._load_data()
+        self.index = ProfileIndex(self.data["profiles"])
+        self._quick = None
+        return True
+
+    @property
+    def quick_index(self) -> QuickLaunchIndex:
+        """Quick-launch search index, built on first use"""
+        if self._quick is None:
+            self._quick = QuickLaunchIndex(self.data["profiles"])
+        return self._quick
 
     def _load_data(self) -> Dict:
         """Load profiles data from file"""
         if self.profiles_file.exists():
             try:
+                self._loaded_mtime_ns = self.profiles_file.stat().st_mtime_ns
+                started = time.perf_counter()
                 with open(self.profiles_file, 'r') as f:
-                    return json.load(f)
+                    data = json.load(f)
+                    record_json_io("profiles", "load", f, started)
+                # Profiles carry their own name so they can be returned as-is
+                for name, profile in data.get("profiles", {}).items():
+                    profile["name"] = name
+                    if "frecency" not in profile:
+                        profile["frecency"] = seed_frecency(profile)
+                data.setdefault("groups", {})
+                return data
             except (json.JSONDecodeError, IOError):
-                pass
+                ERRORS.inc(component="profiles", kind="load")
 
         # Initialize new profiles structure
         return {
             "version": "1.0",
             "profiles": {},
+            "groups": {},
             "default_profile": None
         }
 
     def _save_data(self):
-        """Save profiles data to file"""
+        """Save profiles data to file.
+
+        The data is written to a temporary file that then replaces
+        profiles.json, so readers never see a partially written file.
+        """
         self.profiles_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.profiles_file, 'w') as f:
+        temp_file = self.profiles_file.with_name(self.profiles_file.name + ".tmp")
+        started = time.perf_counter()
+        with open(temp_file, 'w') as f:
             json.dump(self.data, f, indent=2)
+            record_json_io("profiles", "save", f, started)
+        os.replace(temp_file, self.profiles_file)
+        self._loaded_mtime_ns = self.profiles_file.stat().st_mtime_ns
 
     def create_profile(self, name: str, config_name: str, description: str = "",
                       hotkey: Optional[str] = None, icon: Optional[str] = None,
@@ -62,6 +503,7 @@ class ProfileManager:
             return False, f"Configuration '{config_name}' not found"
 
         profile = {
+            "name": name,
             "config_name": config_name,
             "description": description or f"Quick launch for {config_name}",
             "hotkey": hotkey,
@@ -69,35 +511,48 @@ class ProfileManager:
             "tags": tags or [],
             "created": datetime.now().isoformat(),
             "last_used": None,
-            "launch_count": 0
+            "launch_count": 0,
+            "frecency": None
         }
 
         self.data["profiles"][name] = profile
+        self.index.add(name, profile)
+        if self._quick is not None:
+            self._quick.add(name, profile)
         self._save_data()
 
         return True, f"Profile '{name}' created successfully"
 
     def get_profile(self, name: str) -> Optional[Dict]:
         """Get a specific profile"""
-        profile = self.data["profiles"].get(name)
-        if profile:
-            profile["name"] = name
-        return profile
-
-    def list_profiles(self, tag: Optional[str] = None) -> List[Dict]:
-        """List all profiles, optionally filtered by tag"""
-        profiles = []
-        for name, profile in self.data["profiles"].items():
-            if tag and tag not in profile.get("tags", []):
-                continue
+        return self.data["profiles"].get(name)
 
-            profile_data = profile.copy()
-            profile_data["name"] = name
-            profiles.append(profile_data)
+    def list_profiles(self, tag: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """List profiles, most used first, optionally filtered by tag.
 
-        # Sort by launch count (most used first)
-        profiles.sort(key=lambda x: x.get("launch_count", 0), reverse=True)
-        return profiles
+        The stored profile dicts are returned (not copies); do not modify
+        them directly, use update_profile() so the indexes stay correct.
+        """
+        profiles = self.data["profiles"]
+
+        if tag:
+            names = self.index.by_tag.get(tag, ())
+            launches = lambda n: profiles[n].get("launch_count", 0)
+            if limit is not None and limit < len(names):
+                ordered = nlargest(limit, names, key=launches)
+            else:
+                ordered = sorted(names, key=launches, reverse=True)
+            return [profiles[name] for name in ordered]
+
+        if limit is None:
+            return [profiles[name] for name in self.index.most_used()]
+
+        result = []
+        for name in self.index.most_used():
+            if len(result) >= limit:
+                break
+            result.append(profiles[name])
+        return result
 
     def update_profile(self, name: str, **kwargs) -> Tuple[bool, str]:
         """Update profile properties"""
@@ -110,8 +565,13 @@ class ProfileManager:
         allowed_fields = ["description", "hotkey", "icon", "tags", "config_name"]
         for key, value in kwargs.items():
             if key in allowed_fields and value is not None:
+                if key == "tags":
+                    self.index.remove_tags(name, profile.get("tags") or [])
+                    self.index.add_tags(name, value)
                 profile[key] = value
 
+        if self._quick is not None:
+            self._quick.update(name, profile)
         self._save_data()
         return True, f"Profile '{name}' updated successfully"
 
@@ -120,7 +580,9 @@ class ProfileManager:
         if name not in self.data["profiles"]:
             return False, f"Profile '{name}' not found"
 
-        del self.data["profiles"][name]
+        self.index.remove(name, self.data["profiles"].pop(name))
+        if self._quick is not None:
+            self._quick.remove(name)
 
         # Clear default if this was it
         if self.data["default_profile"] == name:
@@ -136,30 +598,231 @@ class ProfileManager:
 
         profile = self.data["profiles"][name]
         config_name = profile["config_name"]
-
-        # Build path to config
-        workspace = os.path.expandvars("%USERPROFILE%\\Documents\\wsb-files")
-        config_path = Path(workspace) / f"{config_name}.wsb"
+        config_path = self._config_path(config_name)
 
         if not config_path.exists():
             return False, f"Configuration '{config_name}' not found at {config_path}"
 
         # Launch Windows Sandbox
+        from workspace.events import record_event
         try:
-            subprocess.Popen(
-                ["WindowsSandbox.exe", str(config_path)],
-                shell=True
-            )
-
-            # Update usage statistics
-            profile["last_used"] = datetime.now().isoformat()
-            profile["launch_count"] = profile.get("launch_count", 0) + 1
+            self.launcher(config_path)
+
+            self.record_launch(name)
             self._save_data()
 
+            record_event(config_path.parent, "launch", {
+                "name": config_name, "profile": name, "source": "profile", "success": True
+            })
+
             return True, f"Launched profile '{name}' with configuration '{config_name}'"
         except Exception as e:
             return False, f"Failed to launch sandbox: {e}"
 
+    @staticmethod
+    def _config_path(config_name: str) -> Path:
+        """Path of a configuration in the workspace"""
+        workspace = os.path.expandvars("%USERPROFILE%\\Documents\\wsb-files")
+        return Path(workspace) / f"{config_name}.wsb"
+
+    # ------------------------------------------------------------------
+    # Launch groups
+    # ------------------------------------------------------------------
+
+    def create_group(self, name: str, profiles: Optional[List[str]] = None,
+                     tags: Optional[List[str]] = None, description: str = "",
+                     concurrency: Optional[int] = None) -> Tuple[bool, str]:
+        """Create a launch group from profile names and/or tags.
+
+        Tag members are resolved when the group is launched, so a group
+        for tag "regression" always covers the current regression profiles.
+        """
+        if name in self.data["groups"]:
+            return False, f"Group '{name}' already exists"
+        if not profiles and not tags:
+            return False, "A group needs at least one profile or tag"
+
+        missing = [p for p in profiles or [] if p not in self.data["profiles"]]
+        if missing:
+            return False, f"Profiles not found: {', '.join(missing)}"
+
+        self.data["groups"][name] = {
+            "name": name,
+            "description": description,
+            "profiles": list(profiles or []),
+            "tags": list(tags or []),
+            "concurrency": concurrency,
+            "created": datetime.now().isoformat(),
+            "last_launched": None
+        }
+        self._save_data()
+        return True, f"Group '{name}' created successfully"
+
+    def delete_group(self, name: str) -> Tuple[bool, str]:
+        """Delete a launch group (its profiles are kept)"""
+        if self.data["groups"].pop(name, None) is None:
+            return False, f"Group '{name}' not found"
+        self._save_data()
+        return True, f"Group '{name}' deleted successfully"
+
+    def list_groups(self) -> List[Dict]:
+        """List launch groups"""
+        return [self.data["groups"][name] for name in sorted(self.data["groups"])]
+
+    def resolve_group(self, name: str) -> Optional[List[str]]:
+        """Get a group's member profile names (explicit members first)"""
+        group = self.data["groups"].get(name)
+        if group is None:
+            return None
+
+        members = dict.fromkeys(p for p in group.get("profiles", []) if p in self.data["profiles"])
+        for tag in group.get("tags", []):
+            members.update(dict.fromkeys(sorted(self.index.by_tag.get(tag, ()))))
+        return list(members)
+
+    def preflight(self, names: List[str]) -> Dict[str, Optional[str]]:
+        """Check that profiles can be launched; returns name -> error (None if ok).
+
+        Each distinct configuration is parsed and validated once, and each
+        distinct mapped host folder is probed once, however many profiles
+        share them.
+        """
+        from scripts.sandman import SandmanConfig, WsbManager
+        manager = WsbManager(SandmanConfig())
+
+        config_errors: Dict[str, Optional[str]] = {}
+        folder_exists: Dict[str, bool] = {}
+
+        def check_config(config_name: str) -> Optional[str]:
+            path = self._config_path(config_name)
+            if not path.exists():
+                return f"Configuration '{config_name}' not found at {path}"
+
+            config = manager.parse_wsb(path)
+            if "error" in config:
+                return f"Configuration '{config_name}' is invalid: {config['error']}"
+
+            errors = manager.validate_config(config)
+            for folder in config["mapped_folders"]:
+                host = folder["path"]
+                if host not in folder_exists:
+                    folder_exists[host] = os.path.isdir(host)
+                if not folder_exists[host]:
+                    errors.append(f"HostFolder does not exist: {host}")
+
+            if errors:
+                return f"Configuration '{config_name}' is invalid: {'; '.join(errors)}"
+            return None
+
+        results = {}
+        for name in names:
+            profile = self.data["profiles"].get(name)
+            if profile is None:
+                results[name] = f"Profile '{name}' not found"
+                continue
+
+            config_name = profile["config_name"]
+            if config_name not in config_errors:
+                config_errors[config_name] = check_config(config_name)
+            results[name] = config_errors[config_name]
+        return results
+
+    def launch_profiles(self, names: List[str], max_concurrent: Optional[int] = None,
+                        dry_run: bool = False, save: bool = True) -> List[Dict]:
+        """Launch many profiles with one preflight and one save.
+
+        Profiles that pass the preflight are started concurrently, at most
+        max_concurrent at a time. Usage statistics of every launched profile
+        are written to profiles.json once at the end (unless save is False,
+        for callers that save themselves). Returns one result
+        dict per profile: name, config_name, success and message.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from workspace.events import record_event
+
+        names = list(dict.fromkeys(names))
+        errors = self.preflight(names)
+        results = {name: {"name": name,
+                          "config_name": self.data["profiles"].get(name, {}).get("config_name"),
+                          "success": False, "message": error}
+                   for name, error in errors.items() if error}
+
+        ready = [name for name in names if name not in results]
+        if dry_run:
+            for name in ready:
+                results[name] = {"name": name, "config_name": self.data["profiles"][name]["config_name"],
+                                 "success": True, "message": "Preflight passed (dry run)"}
+            return [results[name] for name in names]
+
+        def launch(name: str) -> Tuple[bool, str]:
+            try:
+                self.launcher(self._config_path(self.data["profiles"][name]["config_name"]))
+                return True, f"Launched profile '{name}'"
+            except Exception as e:
+                return False, f"Failed to launch sandbox: {e}"
+
+        workers = max(1, min(max_concurrent or self.DEFAULT_GROUP_CONCURRENCY, len(ready) or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(launch, ready))
+
+        workspace = self._config_path("").parent
+        for name, (success, message) in zip(ready, outcomes):
+            config_name = self.data["profiles"][name]["config_name"]
+            results[name] = {"name": name, "config_name": config_name,
+                             "success": success, "message": message}
+            if success:
+                self.record_launch(name)
+            record_event(workspace, "launch", {
+                "name": config_name, "profile": name, "source": "group", "success": success
+            })
+
+        if save and any(success for success, _ in outcomes):
+            self._save_data()
+
+        return [results[name] for name in names]
+
+    def launch_group(self, name: str, max_concurrent: Optional[int] = None,
+                     dry_run: bool = False) -> Tuple[bool, List[Dict]]:
+        """Launch every profile in a group; returns (all succeeded, results)"""
+        members = self.resolve_group(name)
+        if members is None:
+            return False, [{"name": None, "success": False, "message": f"Group '{name}' not found"}]
+        if not members:
+            return False, [{"name": None, "success": False, "message": f"Group '{name}' has no profiles"}]
+
+        group = self.data["groups"][name]
+        results = self.launch_profiles(members, max_concurrent or group.get("concurrency"),
+                                       dry_run, save=False)
+        if not dry_run and any(result["success"] for result in results):
+            group["last_launched"] = datetime.now().isoformat()
+            self._save_data()
+
+        return all(result["success"] for result in results), results
+
+    def record_launch(self, name: str):
+        """Update a profile's usage statistics after it was launched"""
+        profile = self.data["profiles"][name]
+        count = profile.get("launch_count", 0)
+        now = time.time()
+        profile["last_used"] = datetime.fromtimestamp(now).isoformat()
+        profile["launch_count"] = count + 1
+        profile["frecency"] = bump_frecency(profile.get("frecency"), now)
+        self.index.set_launch_count(name, count, count + 1)
+        if self._quick is not None:
+            self._quick.reorder(name)
+
+    def quick_launch(self, query: str, limit: int = 10) -> List[Dict]:
+        """Find profiles for a partial query, best match first.
+
+        Returns dicts with the profile, the match type (exact, prefix,
+        token, fuzzy, or recent for an empty query) and the current
+        frecency score.
+        """
+        now = time.time()
+        return [{"profile": self.data["profiles"][name], "match": match,
+                 "frecency": round(frecency_score(self.data["profiles"][name].get("frecency"), now), 3)}
+                for name, match in self.quick_index.search(query, limit)]
+
     def set_default_profile(self, name: str) -> Tuple[bool, str]:
         """Set a profile as the default"""
         if name not in self.data["profiles"]:
@@ -190,32 +853,22 @@ class ProfileManager:
 
     def get_all_tags(self) -> List[str]:
         """Get all unique tags"""
-        tags = set()
-        for profile in self.data["profiles"].values():
-            tags.update(profile.get("tags", []))
-        return sorted(list(tags))
+        return sorted(self.index.by_tag)
+
+    def get_tag_counts(self) -> Dict[str, int]:
+        """Get the number of profiles carrying each tag"""
+        return {tag: len(names) for tag, names in self.index.by_tag.items()}
 
     def get_statistics(self) -> Dict:
         """Get profile usage statistics"""
-        total_profiles = len(self.data["profiles"])
-        total_launches = sum(
-            p.get("launch_count", 0) for p in self.data["profiles"].values()
-        )
-
-        most_used = None
-        if self.data["profiles"]:
-            most_used_name = max(
-                self.data["profiles"].items(),
-                key=lambda x: x[1].get("launch_count", 0)
-            )[0]
-            most_used = self.get_profile(most_used_name)
+        most_used = self.list_profiles(limit=1)
 
         return {
-            "total_profiles": total_profiles,
-            "total_launches": total_launches,
-            "most_used_profile": most_used,
+            "total_profiles": len(self.data["profiles"]),
+            "total_launches": self.index.total_launches,
+            "most_used_profile": most_used[0] if most_used else None,
             "default_profile": self.data.get("default_profile"),
-            "unique_tags": len(self.get_all_tags())
+            "unique_tags": len(self.index.by_tag)
         }
 
     def export_profile(self, name: str, output_path: str) -> Tuple[bool, str]:
@@ -243,8 +896,7 @@ class ProfileManager:
             # Use provided name or original name
             profile_name = name or profile_data.get("name", Path(input_path).stem)
 
-            # Remove name from profile data if present
-            profile_data.pop("name", None)
+            profile_data["name"] = profile_name
 
             # Verify required fields
             if "config_name" not in profile_data:
@@ -254,69 +906,469 @@ class ProfileManager:
             if profile_name in self.data["profiles"]:
                 return False, f"Profile '{profile_name}' already exists"
 
+            profile_data.setdefault("frecency", seed_frecency(profile_data))
             self.data["profiles"][profile_name] = profile_data
+            self.index.add(profile_name, profile_data)
+            if self._quick is not None:
+                self._quick.add(profile_name, profile_data)
             self._save_data()
 
             return True, f"Profile '{profile_name}' imported successfully"
         except (IOError, json.JSONDecodeError) as e:
             return False, f"Failed to import profile: {e}"
 
+    # ------------------------------------------------------------------
+    # Bulk archives
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _open_archive(path: Path, mode: str, compress: Optional[bool] = None):
+        """Open a JSON-lines archive, gzipped if the file (or compress) says so"""
+        import gzip
+
+        if mode == 'r':
+            with open(path, 'rb') as f:
+                compress = f.read(2) == b"\x1f\x8b"
+        elif compress is None:
+            compress = path.suffix == ".gz"
+
+        if compress:
+            return gzip.open(path, mode + 't', encoding='utf-8')
+        return open(path, mode, encoding='utf-8')
+
+    def export_profiles(self, output_path: str, names: Optional[List[str]] = None,
+                        tag: Optional[str] = None, include_configs: bool = False,
+                        compress: Optional[bool] = None) -> Tuple[bool, str]:
+        """Export many profiles to one JSON-lines archive.
+
+        The archive holds a header record, optionally one "config" record
+        per referenced .wsb file, one "profile" record per profile and a
+        footer with the record counts. It is gzipped when output_path ends
+        in .gz or compress is True. Records are written as they are read,
+        so memory use does not grow with the number of profiles.
+        """
+        if names is None:
+            names = [p["name"] for p in self.list_profiles(tag=tag)] if tag else list(self.data["profiles"])
+        missing = [name for name in names if name not in self.data["profiles"]]
+        if missing:
+            return False, f"Profiles not found: {', '.join(missing)}"
+
+        output_file = Path(output_path)
+        counts = {"profiles": 0, "configs": 0}
+        try:
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            with self._open_archive(output_file, 'w', compress) as f:
+                f.write(json.dumps({"type": "header", "format": ARCHIVE_FORMAT,
+                                    "version": ARCHIVE_VERSION,
+                                    "created": datetime.now().isoformat(),
+                                    "profiles": len(names)}) + "\n")
+
+                if include_configs:
+                    for config_name in dict.fromkeys(self.data["profiles"][n]["config_name"] for n in names):
+                        config_path = self._config_path(config_name)
+                        if not config_path.exists():
+                            continue
+                        with open(config_path, 'r', encoding='utf-8') as config_file:
+                            content = config_file.read()
+                        f.write(json.dumps({"type": "config", "name": config_name,
+                                            "content": content}) + "\n")
+                        counts["configs"] += 1
+
+                for name in names:
+                    f.write(json.dumps({"type": "profile", "profile": self.data["profiles"][name]}) + "\n")
+                    counts["profiles"] += 1
+
+                f.write(json.dumps(dict(counts, type="footer")) + "\n")
+        except IOError as e:
+            return False, f"Failed to export profiles: {e}"
+
+        configs = f" and {counts['configs']} configurations" if include_configs else ""
+        return True, f"Exported {counts['profiles']} profiles{configs} to {output_path}"
+
+    @staticmethod
+    def _check_profile_record(profile) -> Optional[str]:
+        """Validate a profile record from an archive; returns an error or None"""
+        from workspace.index import valid_config_name
+        if not isinstance(profile, dict):
+            return "profile record is not an object"
+        name = profile.get("name")
+        if not isinstance(name, str) or not name.strip():
+            return "missing 'name'"
+        if not isinstance(profile.get("config_name"), str) or not profile["config_name"]:
+            return f"'{name}': missing 'config_name'"
+        if not valid_config_name(profile["config_name"]):
+            return f"'{name}': invalid 'config_name': '{profile['config_name']}'"
+        tags = profile.get("tags", [])
+        if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+            return f"'{name}': 'tags' must be a list of strings"
+        if not isinstance(profile.get("launch_count", 0), int) or profile.get("launch_count", 0) < 0:
+            return f"'{name}': 'launch_count' must be a non-negative integer"
+        return None
+
+    @staticmethod
+    def _free_name(name: str, taken) -> str:
+        """First of name-2, name-3, ... that is not taken"""
+        suffix = 2
+        while f"{name}-{suffix}" in taken:
+            suffix += 1
+        return f"{name}-{suffix}"
+
+    def import_profiles(self, input_path: str, policy: str = "skip",
+                        import_configs: bool = True, dry_run: bool = False) -> Tuple[bool, Dict]:
+        """Import a profile archive written by export_profiles().
+
+        Records are validated as they are streamed in; invalid records are
+        reported and skipped. policy decides what happens when a profile
+        (or a bundled configuration with different content) already exists:
+        "skip" keeps the existing one, "overwrite" replaces it and "rename"
+        imports it as name-2, name-3, ... Nothing is written unless the
+        archive reads to its footer and the record counts match it. The
+        configurations are then staged as temporary files, profiles.json is
+        written once, atomically, and only then are the configurations
+        moved into place. Returns (success, summary).
+        """
+        import xml.etree.ElementTree as ET
+
+        if policy not in IMPORT_POLICIES:
+            return False, {"error": f"Invalid policy: {policy} (allowed: {', '.join(IMPORT_POLICIES)})"}
+
+        summary = {"imported": 0, "overwritten": 0, "renamed": 0, "skipped": 0,
+                   "configs_written": 0, "configs_skipped": 0, "invalid": [], "missing_configs": []}
+        profiles = dict(self.data["profiles"])
+        config_names: Dict[str, str] = {}   # archive config name -> workspace name
+        staged_configs: Dict[str, str] = {}  # workspace name -> content
+        header = None
+        footer = None
+        seen = {"profiles": 0, "configs": 0}
+
+        try:
+            with self._open_archive(Path(input_path), 'r') as f:
+                for line_number, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        record = None
+                        summary["invalid"].append(f"line {line_number}: {e}")
+
+                    record_type = record.get("type") if isinstance(record, dict) else None
+                    if header is None:
+                        if record_type != "header" or record.get("format") != ARCHIVE_FORMAT:
+                            summary["invalid"] = []
+                            return False, dict(summary, error="Not a Sandman profile archive")
+                        version = record.get("version", 0)
+                        if not isinstance(version, int) or isinstance(version, bool) or version > ARCHIVE_VERSION:
+                            return False, dict(summary, error=f"Unsupported archive version: {version!r}")
+                        header = record
+                        continue
+                    if record is None:
+                        continue
+
+                    if footer is not None:
+                        summary["invalid"].append(f"line {line_number}: record after footer")
+                    elif record_type == "footer":
+                        footer = record
+                    elif record_type == "config":
+                        seen["configs"] += 1
+                        self._stage_config(record, policy, import_configs, config_names,
+                                           staged_configs, summary, line_number, ET)
+                    elif record_type == "profile":
+                        seen["profiles"] += 1
+                        self._stage_profile(record.get("profile"), policy, profiles,
+                                            config_names, staged_configs, summary, line_number)
+                    else:
+                        summary["invalid"].append(f"line {line_number}: unknown record type {record_type!r}")
+        except (IOError, EOFError, UnicodeDecodeError) as e:
+            return False, dict(summary, error=f"Failed to read archive: {e}")
+
+        if footer is None:
+            return False, dict(summary, error="Archive is truncated (no footer record)")
+        mismatched = [kind for kind, count in seen.items() if footer.get(kind, 0) != count]
+        if mismatched:
+            return False, dict(summary, error="Archive does not match its footer: " + ", ".join(
+                f"{seen[kind]} {kind}, footer says {footer.get(kind, 0)!r}" for kind in mismatched))
+
+        if dry_run:
+            return True, summary
+
+        temp_paths = []
+        try:
+            for config_name, content in staged_configs.items():
+                config_path = self._config_path(config_name)
+                config_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = config_path.with_name(config_path.name + ".tmp")
+                temp_paths.append((temp_path, config_path))
+                with open(temp_path, 'w', encoding='utf-8') as config_file:
+                    config_file.write(content)
+
+            previous = self.data["profiles"]
+            self.data["profiles"] = profiles
+            try:
+                self._save_data()
+            except IOError:
+                self.data["profiles"] = previous
+                raise
+        except IOError as e:
+            for temp_path, _ in temp_paths:
+                try:
+                    temp_path.unlink()
+                except OSError:
+                    pass
+            return False, dict(summary, error=f"Failed to write imported profiles: {e}")
+
+        self.index = ProfileIndex(self.data["profiles"])
+        self._quick = None
+
+        try:
+            for temp_path, config_path in temp_paths:
+                os.replace(temp_path, config_path)
+        except OSError as e:
+            return False, dict(summary, error=f"Imported profiles, but failed to move configurations into place: {e}")
+        return True, summary
+
+    def _stage_config(self, record: Dict, policy: str, import_configs: bool,
+                      config_names: Dict[str, str], staged: Dict[str, str],
+                      summary: Dict, line_number: int, ET):
+        """Validate a bundled configuration and decide where it goes"""
+        from workspace.index import valid_config_name
+        name = record.get("name")
+        content = record.get("content")
+        if not isinstance(name, str) or not name or not isinstance(content, str):
+            summary["invalid"].append(f"line {line_number}: config record needs 'name' and 'content'")
+            return
+        if not valid_config_name(name):
+            summary["invalid"].append(f"line {line_number}: invalid config name '{name}'")
+            return
+        try:
+            if ET.fromstring(content).tag != "Configuration":
+                raise ET.ParseError("root element is not <Configuration>")
+        except ET.ParseError as e:
+            summary["invalid"].append(f"line {line_number}: config '{name}': {e}")
+            return
+
+        config_names[name] = name
+        if not import_configs:
+            return
+
+        path = self._config_path(name)
+        if not path.exists() and name not in staged:
+            staged[name] = content
+            summary["configs_written"] += 1
+            return
+
+        existing = staged.get(name)
+        if existing is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                existing = f.read()
+        if existing == content or policy == "skip":
+            summary["configs_skipped"] += 1
+        elif policy == "overwrite":
+            staged[name] = content
+            summary["configs_written"] += 1
+        else:
+            new_name = self._free_name(name, {n for n in staged} | {
+                n for n in (p.stem for p in path.parent.glob(f"{name}-*.wsb"))})
+            config_names[name] = new_name
+            staged[new_name] = content
+            summary["configs_written"] += 1
+
+    def _stage_profile(self, profile, policy: str, profiles: Dict[str, Dict],
+                       config_names: Dict[str, str], staged_configs: Dict[str, str],
+                       summary: Dict, line_number: int):
+        """Validate a profile record and stage it under the conflict policy"""
+        error = self._check_profile_record(profile)
+        if error:
+            summary["invalid"].append(f"line {line_number}: {error}")
+            return
+
+        profile = dict(profile)
+        name = profile["name"]
+        profile["config_name"] = config_names.get(profile["config_name"], profile["config_name"])
+        if (profile["config_name"] not in staged_configs
+                and profile["config_name"] not in summary["missing_configs"]
+                and not self._config_path(profile["config_name"]).exists()):
+            summary["missing_configs"].append(profile["config_name"])
+
+        if name in profiles:
+            if policy == "skip":
+                summary["skipped"] += 1
+                return
+            if policy == "rename":
+                name = self._free_name(name, profiles)
+                summary["renamed"] += 1
+            else:
+                summary["overwritten"] += 1
+        else:
+            summary["imported"] += 1
+
+        profile["name"] = name
+        profile.setdefault("frecency", seed_frecency(profile))
+        profiles[name] = profile
+
+    def _shortcut_path(self, profile_name: str, desktop_dir: Optional[str] = None) -> str:
+        """Default .lnk path for a profile's desktop shortcut"""
+        desktop_dir = desktop_dir or os.path.join(os.path.expandvars("%USERPROFILE%"), "Desktop")
+        safe_name = re.sub(r'[\\/:*?"<>|]', "_", profile_name)
+        return os.path.join(desktop_dir, f"Sandman - {safe_name}.lnk")
+
+    def create_desktop_shortcuts(self, names: Optional[List[str]] = None, tag: Optional[str] = None,
+                                 desktop_dir: Optional[str] = None,
+                                 paths: Optional[Dict[str, str]] = None) -> Tuple[bool, Dict]:
+        """Create or refresh desktop shortcuts for many profiles in one shell session.
+
+        Shortcut data is passed to a fixed PowerShell script as JSON on
+        stdin, never interpolated into the script. Existing shortcuts are
+        only rewritten if their target, arguments or description changed.
+        paths optionally maps profile names to explicit .lnk paths.
+        Returns (success, summary) with created/updated/unchanged counts,
+        failures and per-shortcut results.
+        """
+        if names is None:
+            names = [p["name"] for p in self.list_profiles(tag=tag)] if tag else list(self.data["profiles"])
+
+        summary = {"created": 0, "updated": 0, "unchanged": 0, "failed": [], "results": []}
+        shortcuts = []
+        for name in names:
+            profile = self.data["profiles"].get(name)
+            if profile is None:
+                summary["failed"].append({"profile": name, "error": f"Profile '{name}' not found"})
+                continue
+            shortcuts.append({
+                "profile": name,
+                "path": (paths or {}).get(name) or self._shortcut_path(name, desktop_dir),
+                "target": "WindowsSandbox.exe",
+                "arguments": f'"{self._config_path(profile["config_name"])}"',
+                "description": profile.get("description") or ""
+            })
+
+        if shortcuts:
+            try:
+                output = self.shell_invoker(SHORTCUT_SCRIPT, json.dumps({"shortcuts": shortcuts}))
+                results = json.loads(output)["results"]
+            except Exception as e:
+                error = getattr(e, "stderr", None) or e
+                if isinstance(error, bytes):
+                    error = error.decode("utf-8", errors="replace").strip()
+                summary["failed"].extend({"profile": s["profile"], "error": f"Shell session failed: {error}"}
+                                         for s in shortcuts)
+                return False, summary
+
+            # A single result may come back as an object rather than a list
+            if isinstance(results, dict):
+                results = [results]
+            by_path = {result.get("path"): result for result in results}
+            for shortcut in shortcuts:
+                result = by_path.get(shortcut["path"], {"status": "failed", "error": "No result returned"})
+                status = result.get("status")
+                entry = {"profile": shortcut["profile"], "path": shortcut["path"], "status": status}
+                if status in ("created", "updated", "unchanged"):
+                    summary[status] += 1
+                else:
+                    entry["error"] = result.get("error") or "Unknown error"
+                    summary["failed"].append({"profile": shortcut["profile"], "error": entry["error"]})
+                summary["results"].append(entry)
+
+        return not summary["failed"], summary
+
     def create_desktop_shortcut(self, profile_name: str, desktop_path: Optional[str] = None) -> Tuple[bool, str]:
         """Create a desktop shortcut for a profile"""
         if profile_name not in self.data["profiles"]:
             return False, f"Profile '{profile_name}' not found"
 
-        if not desktop_path:
-            desktop_path = os.path.join(
-                os.path.expandvars("%USERPROFILE%"),
-                "Desktop",
-                f"Sandman - {profile_name}.lnk"
-            )
-
-        profile = self.data["profiles"][profile_name]
-        config_name = profile["config_name"]
-        workspace = os.path.expandvars("%USERPROFILE%\\Documents\\wsb-files")
-        config_path = Path(workspace) / f"{config_name}.wsb"
-
-        # Create PowerShell script to create shortcut
-        ps_script = f'''
-$WshShell = New-Object -ComObject WScript.Shell
-$Shortcut = $WshShell.CreateShortcut("{desktop_path}")
-$Shortcut.TargetPath = "WindowsSandbox.exe"
-$Shortcut.Arguments = '"{config_path}"'
-$Shortcut.Description = "{profile['description']}"
-$Shortcut.Save()
-'''
+        success, summary = self.create_desktop_shortcuts(
+            [profile_name], paths={profile_name: desktop_path} if desktop_path else None)
+        if not success:
+            return False, f"Failed to create shortcut: {summary['failed'][0]['error']}"
 
-        try:
-            subprocess.run(
-                ["powershell", "-Command", ps_script],
-                check=True,
-                capture_output=True
-            )
-            return True, f"Desktop shortcut created: {desktop_path}"
-        except subprocess.CalledProcessError as e:
-            return False, f"Failed to create shortcut: {e}"
+        result = summary["results"][0]
+        return True, f"Desktop shortcut {result['status']}: {result['path']}"
 
 
 # CLI Interface
-if __name__ == "__main__":
-    import sys
-
+def _option(args: List[str], flag: str) -> Optional[str]:
+    """Get the value following a --flag in an argument list"""
+    if flag in args and args.index(flag) + 1 < len(args):
+        return args[args.index(flag) + 1]
+    return None
+
+
+def _group_command(pm: ProfileManager, args: List[str]) -> int:
+    """Handle `profiles.py group <list|create|delete|launch> ...`"""
+    action = args[0].lower() if args else "list"
+
+    if action == "list":
+        groups = pm.list_groups()
+        if not groups:
+            print("No launch groups found")
+        for group in groups:
+            members = pm.resolve_group(group["name"])
+            print(f"👥 {group['name']} ({len(members)} profiles)")
+            if group.get("description"):
+                print(f"  {group['description']}")
+            if group.get("profiles"):
+                print(f"  Profiles: {', '.join(group['profiles'])}")
+            if group.get("tags"):
+                print(f"  Tags: {', '.join(group['tags'])}")
+            print()
+        return 0
+
+    if action == "create" and len(args) >= 2:
+        profiles = _option(args, "--profiles")
+        tags = _option(args, "--tags")
+        concurrency = _option(args, "--concurrency")
+        success, message = pm.create_group(
+            args[1],
+            profiles=profiles.split(",") if profiles else None,
+            tags=tags.split(",") if tags else None,
+            description=_option(args, "--description") or "",
+            concurrency=int(concurrency) if concurrency else None)
+        print(f"{'✓' if success else '✗'} {message}")
+        return 0 if success else 1
+
+    if action == "delete" and len(args) >= 2:
+        success, message = pm.delete_group(args[1])
+        print(f"{'✓' if success else '✗'} {message}")
+        return 0 if success else 1
+
+    if action == "launch" and len(args) >= 2:
+        max_concurrent = _option(args, "--max")
+        success, results = pm.launch_group(args[1],
+                                           max_concurrent=int(max_concurrent) if max_concurrent else None,
+                                           dry_run="--dry-run" in args)
+        for result in results:
+            label = f"{result['name']}: " if result["name"] else ""
+            print(f"{'✓' if result['success'] else '✗'} {label}{result['message']}")
+        launched = sum(1 for result in results if result["success"])
+        print(f"\n{launched}/{len(results)} profiles {'passed preflight' if '--dry-run' in args else 'launched'}")
+        return 0 if success else 1
+
+    print("Usage:")
+    print("  python profiles.py group list")
+    print("  python profiles.py group create <name> [--profiles a,b] [--tags t1,t2] [--concurrency N] [--description text]")
+    print("  python profiles.py group delete <name>")
+    print("  python profiles.py group launch <name> [--max N] [--dry-run]")
+    return 2
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point (also used by `sandman profiles`)"""
+    argv = sys.argv[1:] if argv is None else argv
     pm = ProfileManager()
 
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
+    if argv:
+        command = argv[0].lower()
 
-        if command == "create" and len(sys.argv) >= 4:
-            name = sys.argv[2]
-            config_name = sys.argv[3]
-            description = sys.argv[4] if len(sys.argv) > 4 else ""
+        if command == "create" and len(argv) >= 3:
+            name = argv[1]
+            config_name = argv[2]
+            description = argv[3] if len(argv) > 3 else ""
             success, message = pm.create_profile(name, config_name, description)
             print(f"{'✓' if success else '✗'} {message}")
+            return 0 if success else 1
 
         elif command == "list":
-            tag = sys.argv[2] if len(sys.argv) > 2 else None
+            tag = argv[1] if len(argv) > 1 else None
             profiles = pm.list_profiles(tag=tag)
             if not profiles:
                 print("No profiles found")
@@ -335,20 +1387,66 @@ if __name__ == "__main__":
                         print(f"  Tags: {', '.join(profile['tags'])}")
                     print()
 
-        elif command == "launch" and len(sys.argv) >= 3:
-            name = sys.argv[2]
+        elif command == "launch" and len(argv) >= 2:
+            name = argv[1]
             success, message = pm.launch_profile(name)
             print(f"{'✓' if success else '✗'} {message}")
-
-        elif command == "delete" and len(sys.argv) >= 3:
-            name = sys.argv[2]
+            return 0 if success else 1
+
+        elif command == "pick":
+            launch = "--launch" in argv[1:]
+            query = " ".join(arg for arg in argv[1:] if arg != "--launch")
+            results = pm.quick_launch(query, limit=1 if launch else 10)
+            if not results:
+                print(f"✗ No profiles match '{query}'")
+                return 1
+            if launch:
+                success, message = pm.launch_profile(results[0]["profile"]["name"])
+                print(f"{'✓' if success else '✗'} {message}")
+                return 0 if success else 1
+            for result in results:
+                profile = result["profile"]
+                print(f"{profile.get('icon', '⚡')} {profile['name']:<30} "
+                      f"{result['match']:<7} frecency {result['frecency']:<8} → {profile['config_name']}")
+
+        elif command == "export" and len(argv) >= 2:
+            success, message = pm.export_profiles(argv[1], tag=_option(argv, "--tag"),
+                                                  include_configs="--with-configs" in argv)
+            print(f"{'✓' if success else '✗'} {message}")
+            return 0 if success else 1
+
+        elif command == "import" and len(argv) >= 2:
+            dry_run = "--dry-run" in argv
+            success, summary = pm.import_profiles(argv[1], policy=_option(argv, "--policy") or "skip",
+                                                  import_configs="--no-configs" not in argv,
+                                                  dry_run=dry_run)
+            if not success:
+                print(f"✗ {summary['error']}")
+            else:
+                print(f"✓ {'Checked' if dry_run else 'Imported'} {argv[1]}: "
+                      f"{summary['imported']} new, {summary['overwritten']} overwritten, "
+                      f"{summary['renamed']} renamed, {summary['skipped']} skipped; "
+                      f"{summary['configs_written']} configurations written")
+            for problem in summary["invalid"]:
+                print(f"  ✗ {problem}")
+            if summary["missing_configs"]:
+                print(f"  ⚠ Configurations not found: {', '.join(summary['missing_configs'])}")
+            return 0 if success else 1
+
+        elif command == "group":
+            return _group_command(pm, argv[1:])
+
+        elif command == "delete" and len(argv) >= 2:
+            name = argv[1]
             success, message = pm.delete_profile(name)
             print(f"{'✓' if success else '✗'} {message}")
+            return 0 if success else 1
 
-        elif command == "default" and len(sys.argv) >= 3:
-            name = sys.argv[2]
+        elif command == "default" and len(argv) >= 2:
+            name = argv[1]
             success, message = pm.set_default_profile(name)
             print(f"{'✓' if success else '✗'} {message}")
+            return 0 if success else 1
 
         elif command == "stats":
             stats = pm.get_statistics()
@@ -363,20 +1461,40 @@ if __name__ == "__main__":
                 print(f"\nMost Used Profile:  {profile['name']}")
                 print(f"  Launches:         {profile['launch_count']}")
 
-        elif command == "shortcut" and len(sys.argv) >= 3:
-            name = sys.argv[2]
+        elif command == "shortcut" and len(argv) >= 2:
+            name = argv[1]
             success, message = pm.create_desktop_shortcut(name)
             print(f"{'✓' if success else '✗'} {message}")
+            return 0 if success else 1
+
+        elif command == "shortcuts":
+            options = {"--tag", "--dir"}
+            names = [arg for i, arg in enumerate(argv[1:], 1)
+                     if arg not in options and argv[i - 1] not in options]
+            success, summary = pm.create_desktop_shortcuts(names or None, tag=_option(argv, "--tag"),
+                                                           desktop_dir=_option(argv, "--dir"))
+            for failure in summary["failed"]:
+                print(f"✗ {failure['profile']}: {failure['error']}")
+            print(f"{'✓' if success else '✗'} Shortcuts: {summary['created']} created, "
+                  f"{summary['updated']} updated, {summary['unchanged']} unchanged, "
+                  f"{len(summary['failed'])} failed")
+            return 0 if success else 1
 
         else:
             print("Usage:")
             print("  python profiles.py create <name> <config> [description]  - Create profile")
             print("  python profiles.py list [tag]                            - List profiles")
             print("  python profiles.py launch <name>                         - Launch profile")
+            print("  python profiles.py pick <query> [--launch]               - Find (and launch) by partial name")
             print("  python profiles.py delete <name>                         - Delete profile")
             print("  python profiles.py default <name>                        - Set default")
             print("  python profiles.py stats                                 - Show statistics")
             print("  python profiles.py shortcut <name>                       - Create desktop shortcut")
+            print("  python profiles.py shortcuts [names...] [--tag t] [--dir path] - Create/refresh shortcuts")
+            print("  python profiles.py group <list|create|delete|launch> ... - Manage launch groups")
+            print("  python profiles.py export <archive> [--tag t] [--with-configs]              - Export profiles")
+            print("  python profiles.py import <archive> [--policy skip|overwrite|rename] [--dry-run] [--no-configs]")
+            return 2
     else:
         profiles = pm.list_profiles()
         if not profiles:
@@ -386,3 +1504,9 @@ if __name__ == "__main__":
             print(f"✓ {len(profiles)} quick launch profiles")
             for profile in profiles[:5]:
                 print(f"  {profile.get('icon', '⚡')} {profile['name']} → {profile['config_name']}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
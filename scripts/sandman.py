@@ -5,19 +5,20 @@ Version 1.0.0
 
 Manages Windows Sandbox .wsb configuration files
 Works on Windows with Python 3.6+
+
+Run without arguments for the interactive menu, or with a subcommand
+(see `sandman.py help`). Heavy modules (XML, subprocess, the subsystems)
+are imported only by the commands that need them, to keep startup fast.
 """
 
 import os
 import sys
-import json
-import shutil
-import subprocess
-import xml.etree.ElementTree as ET
-import xml.dom.minidom as minidom
 from pathlib import Path
-from datetime import datetime
 from typing import Optional, Dict, List
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
 # Configuration defaults
 DEFAULT_CONFIG = {
     "workspace": os.path.join(os.environ.get("USERPROFILE", ""), "Documents", "wsb-files"),
@@ -62,11 +63,23 @@ class SandmanConfig:
 
     def __init__(self, config_path: str = "config.json"):
         self.config_path = config_path
-        self.config = self.load()
+        self._config = None
+
+    @property
+    def config(self) -> Dict:
+        """Configuration, loaded from disk on first access"""
+        if self._config is None:
+            self._config = self.load()
+        return self._config
+
+    @config.setter
+    def config(self, value: Dict):
+        self._config = value
 
     def load(self) -> Dict:
         """Load configuration from JSON file"""
         if os.path.exists(self.config_path):
+            import json
             try:
                 with open(self.config_path, 'r') as f:
                     user_config = json.load(f)
@@ -96,22 +109,148 @@ class SandmanConfig:
 class WsbManager:
     """Windows Sandbox .wsb file manager"""
 
+    # .wsb element -> configuration key, and defaults for missing elements
+    ELEMENT_FIELDS = {
+        "Networking": "networking",
+        "VGpu": "vgpu",
+        "MemoryInMB": "memory_mb",
+        "AudioInput": "audio_input",
+        "VideoInput": "video_input",
+        "PrinterRedirection": "printer_redirection",
+        "ClipboardRedirection": "clipboard_redirection",
+        "ProtectedClient": "protected_client"
+    }
+    FIELD_DEFAULTS = {
+        "memory_mb": 4096,
+        "networking": "Default",
+        "vgpu": "Default",
+        "audio_input": "Default",
+        "video_input": "Default",
+        "printer_redirection": "Enable",
+        "clipboard_redirection": "Enable",
+        "protected_client": "Enable"
+    }
+
     def __init__(self, config: SandmanConfig):
         self.config = config
         self.workspace = Path(config.get("workspace"))
-        self.ensure_workspace()
+        self.quiet = False
+        self._index = None
 
     def ensure_workspace(self):
-        """Create workspace directory if it doesn't exist"""
+        """Create workspace directory if it doesn't exist (called before writes)"""
         self.workspace.mkdir(parents=True, exist_ok=True)
         (self.workspace / "backups").mkdir(exist_ok=True)
 
+    def resolve(self, target: str) -> Path:
+        """Resolve a configuration name or .wsb path to a file path"""
+        path = Path(target)
+        if path.suffix.lower() == ".wsb" and (path.exists() or len(path.parts) > 1):
+            return path
+        return self.workspace / f"{target}.wsb"
+
     def list_files(self) -> List[Path]:
         """List all .wsb files in workspace"""
         return sorted(self.workspace.glob("*.wsb"), key=lambda p: p.stat().st_mtime, reverse=True)
 
+    @property
+    def index(self):
+        """Workspace index used to cache parsed configurations"""
+        if self._index is None:
+            from workspace.index import WorkspaceIndex
+            self._index = WorkspaceIndex(self.workspace, parser=self.parse_wsb)
+        return self._index
+
+    def parse_wsb(self, path: Path) -> Dict:
+        """Parse a .wsb file into a configuration dict in a single pass"""
+        import xml.etree.ElementTree as ET
+        from metrics.registry import ERRORS, XML_SECONDS
+        try:
+            with XML_SECONDS.time(component="cli", op="parse"):
+                root = ET.parse(path).getroot()
+
+            config = {"name": Path(path).stem}
+            config.update(self.FIELD_DEFAULTS)
+            config["mapped_folders"] = []
+
+            for elem in root:
+                key = self.ELEMENT_FIELDS.get(elem.tag)
+                if key == "memory_mb":
+                    config[key] = int(elem.text)
+                elif key:
+                    config[key] = elem.text
+                elif elem.tag == "MappedFolders":
+                    for folder in elem:
+                        if folder.tag != "MappedFolder":
+                            continue
+                        host_folder = None
+                        read_only = None
+                        for child in folder:
+                            if child.tag == "HostFolder":
+                                host_folder = child.text
+                            elif child.tag == "ReadOnly":
+                                read_only = child.text
+
+                        if host_folder is not None:
+                            config["mapped_folders"].append({
+                                "path": host_folder,
+                                "readonly": read_only.lower() == "true" if read_only is not None else True
+                            })
+
+            return config
+        except Exception as e:
+            ERRORS.inc(component="cli", kind="parse")
+            return {"name": Path(path).stem, "error": str(e)}
+
+    def get_configs(self, names: Optional[List[str]] = None,
+                    filters: Optional[Dict] = None) -> List[Dict]:
+        """Get many parsed configurations at once.
+
+        Pass names to fetch specific configurations, or filters (networking,
+        memory_min, memory_max, has_rw) to select from the whole workspace.
+        Files that changed since they were last parsed are parsed concurrently;
+        missing names come back as {"name": ..., "error": ...}.
+        """
+        if names is None:
+            names = self.index.select(filters=filters)
+
+        entries = self.index.load_many(names)
+        configs = []
+        for name in names:
+            entry = entries.get(name)
+            if entry is None:
+                configs.append({"name": name, "error": "Configuration not found"})
+            else:
+                configs.append(entry["config"])
+        return configs
+
+    def validate_config(self, config: Dict) -> List[str]:
+        """Check a configuration dict before it is written; returns errors"""
+        errors = []
+
+        try:
+            memory = int(config.get("memory_mb", self.config.get("defaultMemoryMB", 4096)))
+            if memory < MIN_MEMORY_MB or memory > MAX_MEMORY_MB:
+                errors.append(f"Memory out of range ({MIN_MEMORY_MB}-{MAX_MEMORY_MB}): {memory}")
+        except (TypeError, ValueError):
+            errors.append(f"Invalid memory value: {config.get('memory_mb')}")
+
+        for element, key in self.ELEMENT_FIELDS.items():
+            allowed = ALLOWED_VALUES.get(element)
+            if allowed and key in config and config[key] not in allowed:
+                errors.append(f"Invalid {element} value: '{config[key]}' (allowed: {', '.join(allowed)})")
+
+        for folder in config.get("mapped_folders", []):
+            if not folder.get("path"):
+                errors.append("Mapped folder path is required")
+
+        return errors
+
     def create_xml(self, **kwargs) -> str:
         """Create Windows Sandbox XML configuration"""
+        import xml.etree.ElementTree as ET
+        import xml.dom.minidom as minidom
+
         root = ET.Element("Configuration")
 
         # Add basic elements
@@ -148,20 +287,38 @@ class WsbManager:
         reparsed = minidom.parseString(rough_string)
         return reparsed.toprettyxml(indent="  ")
 
-    def save_wsb(self, path: Path, xml_content: str, backup: bool = True):
-        """Save .wsb file with optional backup"""
-        if backup and path.exists():
+    def save_wsb(self, path: Path, xml_content: str, backup: bool = True) -> bool:
+        """Save .wsb file with optional backup.
+
+        Nothing is written (and no backup taken) when the file already holds
+        an equivalent configuration. Returns True if the file was written.
+        """
+        from workspace.canonical import write_wsb
+        self.ensure_workspace()
+        backup_path = None
+        if backup:
             backup_path = path.with_suffix(path.suffix + self.config.get("backupSuffix", ".bak"))
-            shutil.copy2(path, backup_path)
 
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
+        written = write_wsb(path, xml_content, backup_path=backup_path)
 
-        print(Colors.colorize(f"✓ Saved: {path}", Colors.GREEN))
+        if not self.quiet:
+            if written:
+                print(Colors.colorize(f"✓ Saved: {path}", Colors.GREEN))
+            else:
+                print(Colors.colorize(f"✓ Unchanged: {path}", Colors.GREEN))
+        return written
 
-    def validate_wsb(self, path: Path) -> tuple:
-        """Validate .wsb file and return (is_valid, errors)"""
+    def validate_wsb(self, path: Path, publish: bool = False) -> tuple:
+        """Validate .wsb file and return (is_valid, errors).
+
+        With publish=True the result is also recorded as a "validation"
+        event in the workspace journal for the web UI.
+        """
+        import time
+        import xml.etree.ElementTree as ET
+        from metrics.registry import XML_SECONDS
         errors = []
+        started = time.perf_counter()
 
         try:
             tree = ET.parse(path)
@@ -203,26 +360,50 @@ class WsbManager:
         except ET.ParseError as e:
             errors.append(f"XML parsing error: {e}")
 
+        XML_SECONDS.observe(time.perf_counter() - started, component="cli", op="validate")
+        if publish:
+            self.record_event("validation", {"name": path.stem, "valid": not errors, "errors": errors})
         return (len(errors) == 0, errors)
 
+    def record_event(self, event_type: str, data: Dict):
+        """Publish an event to the workspace journal for the web UI"""
+        from workspace.events import record_event
+        record_event(self.workspace, event_type, data)
+
     def launch_sandbox(self, path: Path):
         """Launch Windows Sandbox with configuration file"""
         # Validate first
-        is_valid, errors = self.validate_wsb(path)
+        is_valid, errors = self.validate_wsb(path, publish=True)
 
         if not is_valid:
-            print(Colors.colorize("✗ Cannot launch: Validation failed", Colors.RED))
-            for error in errors:
-                print(Colors.colorize(f"  - {error}", Colors.RED))
+            if not self.quiet:
+                print(Colors.colorize("✗ Cannot launch: Validation failed", Colors.RED))
+                for error in errors:
+                    print(Colors.colorize(f"  - {error}", Colors.RED))
             return False
 
+        success, error = self.start_sandbox(path)
+        if not self.quiet:
+            if success:
+                print(Colors.colorize("✓ Windows Sandbox launched", Colors.GREEN))
+            else:
+                print(Colors.colorize(f"✗ Failed to launch: {error}", Colors.RED))
+        return success
+
+    def start_sandbox(self, path: Path) -> tuple:
+        """Start Windows Sandbox without validating; returns (success, error)"""
+        import subprocess
+        from metrics.registry import ERRORS, SUBPROCESS_SECONDS
         try:
-            subprocess.Popen([str(path)], shell=True)
-            print(Colors.colorize("✓ Windows Sandbox launched", Colors.GREEN))
-            return True
+            with SUBPROCESS_SECONDS.time(command="sandbox", op="spawn"):
+                subprocess.Popen([str(path)], shell=True)
+            self.record_event("launch", {"name": path.stem, "source": "cli", "success": True})
+            return (True, None)
         except Exception as e:
-            print(Colors.colorize(f"✗ Failed to launch: {e}", Colors.RED))
-            return False
+            ERRORS.inc(component="cli", kind="launch")
+            self.record_event("launch", {"name": path.stem, "source": "cli", "success": False,
+                                         "error": str(e)})
+            return (False, str(e))
 
 
 class SandmanUI:
@@ -233,7 +414,22 @@ class SandmanUI:
         self.manager = WsbManager(self.config)
 
     def clear_screen(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        # ANSI clear + cursor home; avoids spawning a shell for cls/clear
+        if sys.stdout.isatty():
+            print("\033[2J\033[H", end="", flush=True)
+
+    def open_in_editor(self, path: Path):
+        """Open a file in the configured editor"""
+        import subprocess
+        from metrics.registry import SUBPROCESS_SECONDS
+        with SUBPROCESS_SECONDS.time(command="editor", op="spawn"):
+            subprocess.Popen([self.config.get("editor", "notepad.exe"), str(path)])
+
+    @staticmethod
+    def format_mtime(path: Path, fmt: str = "%Y-%m-%d %H:%M") -> str:
+        """Format a file's modification time"""
+        from datetime import datetime
+        return datetime.fromtimestamp(path.stat().st_mtime).strftime(fmt)
 
     def prompt(self, message: str, default: str = "") -> str:
         """Prompt user for input"""
@@ -257,7 +453,7 @@ class SandmanUI:
 
         print()
         for i, file in enumerate(files, 1):
-            mtime = datetime.fromtimestamp(file.stat().st_mtime).strftime("%Y-%m-%d %H:%M")
+            mtime = self.format_mtime(file)
             print(f"  [{i}] {file.name}  (Modified: {mtime})")
 
         print()
@@ -319,7 +515,7 @@ class SandmanUI:
         self.manager.save_wsb(output_path, xml_content)
 
         if self.confirm("Open in editor?"):
-            subprocess.Popen([self.config.get("editor", "notepad.exe"), str(output_path)])
+            self.open_in_editor(output_path)
 
     def action_list(self):
         """List all .wsb files"""
@@ -333,7 +529,7 @@ class SandmanUI:
             return
 
         for i, file in enumerate(files, 1):
-            mtime = datetime.fromtimestamp(file.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+            mtime = self.format_mtime(file, "%Y-%m-%d %H:%M:%S")
             size = file.stat().st_size
             print(f"  [{i}] {file.name}")
             print(f"      Modified: {mtime}, Size: {size} bytes")
@@ -344,7 +540,7 @@ class SandmanUI:
         file_path = self.select_file("Edit file")
 
         if file_path:
-            subprocess.Popen([self.config.get("editor", "notepad.exe"), str(file_path)])
+            self.open_in_editor(file_path)
             print(Colors.colorize("✓ Opened in editor", Colors.GREEN))
 
     def action_validate(self):
@@ -358,12 +554,13 @@ class SandmanUI:
         print()
         print(Colors.colorize(f"=== Validating {file_path.name} ===", Colors.CYAN))
 
-        is_valid, errors = self.manager.validate_wsb(file_path)
+        is_valid, errors = self.manager.validate_wsb(file_path, publish=True)
 
         if is_valid:
             print(Colors.colorize("✓ VALID - Configuration is ready to use", Colors.GREEN))
 
             # Show summary
+            import xml.etree.ElementTree as ET
             try:
                 tree = ET.parse(file_path)
                 root = tree.getroot()
@@ -438,14 +635,525 @@ class SandmanUI:
             input("\nPress Enter to continue...")
 
 
-def main():
+# Exit codes of the non-interactive commands
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+EXIT_NOT_FOUND = 3
+
+
+class CommandOutput:
+    """Report command results as text, one JSON document or JSON lines"""
+
+    def __init__(self, command: str, fmt: str = "text", text_summary: bool = True):
+        self.command = command
+        self.format = fmt
+        self.text_summary = text_summary
+        self.results = []
+        self.counts = {"ok": 0, "failed": 0, "not_found": 0}
+
+    def emit(self, result: Dict, lines: Optional[List[str]] = None):
+        """Record one result; text and jsonl modes write it immediately"""
+        status = result.get("status", "ok")
+        if status == "ok":
+            self.counts["ok"] += 1
+        elif status == "not_found":
+            self.counts["not_found"] += 1
+        else:
+            self.counts["failed"] += 1
+
+        if self.format == "json":
+            self.results.append(result)
+        elif self.format == "jsonl":
+            import json
+            print(json.dumps(result), flush=True)
+        else:
+            for line in lines or []:
+                print(line)
+
+    def finish(self) -> int:
+        """Write the summary and return the exit code"""
+        summary = dict(self.counts, total=sum(self.counts.values()))
+        if self.format == "json":
+            import json
+            print(json.dumps({"command": self.command, "results": self.results,
+                              "summary": summary}, indent=2))
+        elif self.format == "jsonl":
+            import json
+            print(json.dumps({"summary": summary}))
+        elif self.text_summary and summary["total"] > 1:
+            print(f"\n{summary['ok']} ok, {summary['failed']} failed, "
+                  f"{summary['not_found']} not found")
+
+        if self.counts["not_found"]:
+            return EXIT_NOT_FOUND
+        if self.counts["failed"]:
+            return EXIT_FAILURE
+        return EXIT_OK
+
+
+class SandmanCLI:
+    """Non-interactive commands for scripts and automation.
+
+    Every command accepts many targets in one invocation (or "-" to read
+    them from stdin, one per line) and reports with --json or --jsonl.
+    """
+
+    COMMANDS = ["create", "list", "validate", "inspect", "launch"]
+
+    # Command-line flags for the .wsb settings accepted by create
+    SETTING_FLAGS = {
+        "networking": "--networking",
+        "vgpu": "--vgpu",
+        "audio_input": "--audio-input",
+        "video_input": "--video-input",
+        "printer_redirection": "--printer",
+        "clipboard_redirection": "--clipboard",
+        "protected_client": "--protected-client"
+    }
+
+    def __init__(self):
+        self.config = SandmanConfig()
+        self.manager = WsbManager(self.config)
+        self.manager.quiet = True
+
+    def build_parser(self):
+        """Build the argument parser for all commands"""
+        import argparse
+
+        output = argparse.ArgumentParser(add_help=False)
+        formats = output.add_mutually_exclusive_group()
+        formats.add_argument("--json", dest="format", action="store_const", const="json",
+                             help="Print one JSON document")
+        formats.add_argument("--jsonl", dest="format", action="store_const", const="jsonl",
+                             help="Print one JSON object per line")
+        output.set_defaults(format="text")
+
+        parser = argparse.ArgumentParser(prog="sandman.py")
+        commands = parser.add_subparsers(dest="command")
+
+        create = commands.add_parser("create", parents=[output],
+                                     help="Create .wsb files from flags or a manifest")
+        create.add_argument("name", nargs="?", help="Configuration name (no extension)")
+        create.add_argument("--manifest",
+                            help="JSON array, object or JSON lines of configurations ('-' for stdin)")
+        create.add_argument("--memory", type=int, dest="memory_mb", help="Memory in MB")
+        for key, flag in self.SETTING_FLAGS.items():
+            element = next(e for e, k in WsbManager.ELEMENT_FIELDS.items() if k == key)
+            create.add_argument(flag, dest=key, choices=ALLOWED_VALUES[element])
+        create.add_argument("--map", action="append", default=[], metavar="PATH",
+                            help="Map a host folder read-only (repeatable)")
+        create.add_argument("--map-rw", action="append", default=[], metavar="PATH",
+                            help="Map a host folder read-write (repeatable)")
+        create.add_argument("--force", action="store_true", help="Overwrite existing files")
+        create.add_argument("--no-backup", action="store_true",
+                            help="Do not back up files that are overwritten")
+
+        listing = commands.add_parser("list", parents=[output], help="List .wsb files")
+        listing.add_argument("--networking", choices=ALLOWED_VALUES["Networking"])
+        listing.add_argument("--memory-min", type=int)
+        listing.add_argument("--memory-max", type=int)
+        listing.add_argument("--has-rw", dest="has_rw", action="store_const", const=True,
+                             help="Only configurations with read-write mappings")
+        listing.add_argument("--no-rw", dest="has_rw", action="store_const", const=False,
+                             help="Only configurations without read-write mappings")
+        listing.add_argument("--sort", default="mtime", choices=["name", "mtime", "size", "memory"])
+        listing.add_argument("--order", choices=["asc", "desc"])
+        listing.add_argument("--limit", type=int)
+
+        for name, help_text in [("validate", "Validate .wsb files"),
+                                ("inspect", "Show parsed configurations"),
+                                ("launch", "Validate and launch Windows Sandbox")]:
+            command = commands.add_parser(name, parents=[output], help=help_text)
+            command.add_argument("targets", nargs="*",
+                                 help="Names or .wsb paths ('-' reads them from stdin)")
+            if name != "launch":
+                command.add_argument("--all", action="store_true",
+                                     help="Every configuration in the workspace")
+            else:
+                command.add_argument("--dry-run", action="store_true",
+                                     help="Validate only, do not launch")
+
+        return parser
+
+    def run(self, argv: List[str]) -> int:
+        """Parse arguments and run a command; returns the exit code"""
+        parser = self.build_parser()
+        args = parser.parse_args(argv)
+
+        if args.command is None:
+            parser.print_usage()
+            return EXIT_USAGE
+
+        output = CommandOutput(args.command, args.format,
+                               text_summary=args.command != "list")
+        try:
+            handler = getattr(self, f"cmd_{args.command}")
+            handler(args, output)
+        except ValueError as e:
+            print(Colors.colorize(f"✗ {e}", Colors.RED), file=sys.stderr)
+            return EXIT_USAGE
+        return output.finish()
+
+    @staticmethod
+    def read_stdin_lines() -> List[str]:
+        """Read non-empty, non-comment lines from stdin"""
+        return [line.strip() for line in sys.stdin
+                if line.strip() and not line.lstrip().startswith("#")]
+
+    def collect_targets(self, args) -> List[str]:
+        """Expand positional targets, "-" (stdin) and --all"""
+        targets = []
+        for target in args.targets:
+            if target == "-":
+                targets.extend(self.read_stdin_lines())
+            else:
+                targets.append(target)
+
+        if getattr(args, "all", False):
+            targets.extend(self.manager.index.select(sort="name"))
+
+        if not targets:
+            raise ValueError("No targets given (pass names, '-' for stdin, or --all)")
+        return targets
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+
+    def load_manifest(self, source: str) -> List[Dict]:
+        """Load configurations from a JSON array/object or JSON lines"""
+        import json
+
+        if source == "-":
+            text = sys.stdin.read()
+        else:
+            with open(source, 'r', encoding='utf-8') as f:
+                text = f.read()
+
+        text = text.strip()
+        if not text:
+            return []
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                data = [json.loads(line) for line in text.splitlines() if line.strip()]
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid manifest: {e}")
+
+        entries = data if isinstance(data, list) else [data]
+        if not all(isinstance(entry, dict) for entry in entries):
+            raise ValueError("Invalid manifest: every entry must be an object")
+        for number, entry in enumerate(entries, 1):
+            folders = entry.get("mapped_folders")
+            if folders is not None and (not isinstance(folders, list) or not all(
+                    isinstance(folder, dict) and isinstance(folder.get("path", ""), str)
+                    for folder in folders)):
+                raise ValueError(f"Invalid manifest: entry {number}: mapped_folders must be "
+                                 f"a list of {{path, readonly}} objects")
+        return entries
+
+    def cmd_create(self, args, output: CommandOutput):
+        if args.manifest:
+            entries = self.load_manifest(args.manifest)
+        elif args.name:
+            entry = {"name": args.name}
+            for key in ["memory_mb"] + list(self.SETTING_FLAGS):
+                if getattr(args, key) is not None:
+                    entry[key] = getattr(args, key)
+            entry["mapped_folders"] = ([{"path": p, "readonly": True} for p in args.map] +
+                                       [{"path": p, "readonly": False} for p in args.map_rw])
+            entries = [entry]
+        else:
+            raise ValueError("Give a configuration name or --manifest")
+
+        for entry in entries:
+            name = str(entry.get("name") or "").strip()
+            result = {"target": name, "status": "ok"}
+
+            config = {
+                "memory_mb": self.config.get("defaultMemoryMB", 4096),
+                "networking": self.config.get("defaultNetworking", "Default")
+            }
+            config.update({k: v for k, v in entry.items() if k != "name" and v is not None})
+            errors = self.manager.validate_config(config)
+            if not name or any(c in name for c in '\\/:*?"<>|'):
+                errors.insert(0, f"Invalid configuration name: '{name}'")
+
+            path = self.manager.workspace / f"{name}.wsb"
+            if not errors and path.exists() and not args.force:
+                errors.append("File exists (use --force to overwrite)")
+
+            if not errors:
+                try:
+                    config["memory_mb"] = int(config["memory_mb"])
+                    result["changed"] = self.manager.save_wsb(
+                        path, self.manager.create_xml(**config), backup=not args.no_backup)
+                    result["path"] = str(path)
+                except OSError as e:
+                    errors.append(str(e))
+
+            if errors:
+                result.update({"status": "failed", "errors": errors})
+                lines = [Colors.colorize(f"✗ {name or '(unnamed)'}", Colors.RED)]
+                lines += [Colors.colorize(f"  - {error}", Colors.RED) for error in errors]
+            elif not result["changed"]:
+                lines = [Colors.colorize(f"✓ Unchanged: {path}", Colors.GREEN)]
+            else:
+                lines = [Colors.colorize(f"✓ Created: {path}", Colors.GREEN)]
+            output.emit(result, lines)
+
+    def cmd_list(self, args, output: CommandOutput):
+        filters = {"networking": args.networking, "memory_min": args.memory_min,
+                   "memory_max": args.memory_max, "has_rw": args.has_rw}
+        names = self.manager.index.select(filters=filters, sort=args.sort, order=args.order)
+        if args.limit is not None:
+            names = names[:max(0, args.limit)]
+
+        for name in names:
+            entry = self.manager.index.peek(name)
+            result = {key: entry[key] for key in
+                      ["name", "filename", "size", "modified", "memory_mb", "networking", "has_rw"]}
+            result["status"] = "ok"
+            output.emit(result, [
+                f"  {entry['filename']}",
+                f"      Modified: {entry['modified'][:19].replace('T', ' ')}, "
+                f"Size: {entry['size']} bytes, Memory: {entry['memory_mb']} MB"
+            ])
+
+    def cmd_validate(self, args, output: CommandOutput):
+        for target in self.collect_targets(args):
+            path = self.manager.resolve(target)
+            if not path.exists():
+                output.emit({"target": target, "status": "not_found"},
+                            [Colors.colorize(f"✗ {target}: not found", Colors.YELLOW)])
+                continue
+
+            is_valid, errors = self.manager.validate_wsb(path)
+            result = {"target": target, "path": str(path),
+                      "status": "ok" if is_valid else "invalid", "errors": errors}
+            if is_valid:
+                lines = [Colors.colorize(f"✓ {target}: valid", Colors.GREEN)]
+            else:
+                lines = [Colors.colorize(f"✗ {target}: invalid", Colors.RED)]
+                lines += [Colors.colorize(f"  - {error}", Colors.RED) for error in errors]
+            output.emit(result, lines)
+
+    def cmd_inspect(self, args, output: CommandOutput):
+        targets = self.collect_targets(args)
+        paths = {target: self.manager.resolve(target) for target in targets}
+
+        from workspace.index import valid_config_name
+
+        # Workspace files go through the index so they are parsed concurrently
+        names = [path.stem for path in paths.values()
+                 if path.parent == self.manager.workspace and valid_config_name(path.stem)]
+        configs = {config["name"]: config for config in self.manager.get_configs(names)}
+
+        for target, path in paths.items():
+            if path.parent == self.manager.workspace and not valid_config_name(path.stem):
+                output.emit({"target": target, "status": "failed",
+                             "errors": [f"Invalid configuration name: '{path.stem}'"]},
+                            [Colors.colorize(f"✗ {target}: invalid configuration name", Colors.RED)])
+                continue
+            if not path.exists():
+                output.emit({"target": target, "status": "not_found"},
+                            [Colors.colorize(f"✗ {target}: not found", Colors.YELLOW)])
+                continue
+
+            if path.parent == self.manager.workspace:
+                config = configs[path.stem]
+            else:
+                config = self.manager.parse_wsb(path)
+
+            if "error" in config:
+                output.emit({"target": target, "status": "failed", "errors": [config["error"]]},
+                            [Colors.colorize(f"✗ {target}: {config['error']}", Colors.RED)])
+                continue
+
+            lines = [Colors.colorize(f"=== {target} ===", Colors.CYAN)]
+            lines += [f"  {key}: {value}" for key, value in config.items()
+                      if key not in ("name", "mapped_folders")]
+            lines += [f"  Mapped: {folder['path']} (ReadOnly={str(folder['readonly']).lower()})"
+                      for folder in config["mapped_folders"]]
+            output.emit({"target": target, "status": "ok", "config": config}, lines)
+
+    def cmd_launch(self, args, output: CommandOutput):
+        for target in self.collect_targets(args):
+            path = self.manager.resolve(target)
+            if not path.exists():
+                output.emit({"target": target, "status": "not_found"},
+                            [Colors.colorize(f"✗ {target}: not found", Colors.YELLOW)])
+                continue
+
+            is_valid, errors = self.manager.validate_wsb(path, publish=True)
+            if not is_valid:
+                output.emit({"target": target, "status": "invalid", "errors": errors},
+                            [Colors.colorize(f"✗ {target}: cannot launch, validation failed",
+                                             Colors.RED)] +
+                            [Colors.colorize(f"  - {error}", Colors.RED) for error in errors])
+                continue
+
+            if args.dry_run:
+                output.emit({"target": target, "status": "ok", "launched": False},
+                            [Colors.colorize(f"✓ {target}: valid (dry run)", Colors.GREEN)])
+                continue
+
+            success, error = self.manager.start_sandbox(path)
+            if success:
+                output.emit({"target": target, "status": "ok", "launched": True},
+                            [Colors.colorize(f"✓ {target}: Windows Sandbox launched", Colors.GREEN)])
+            else:
+                output.emit({"target": target, "status": "failed", "launched": False,
+                             "errors": [error]},
+                            [Colors.colorize(f"✗ {target}: failed to launch: {error}", Colors.RED)])
+
+
+# Subcommands served by the subsystem modules, imported only when used
+SUBSYSTEMS = {
+    "profiles": "profiles.profiles",
+    "analytics": "analytics.analytics",
+    "notify": "notifications.notifier",
+    "vcs": "versioncontrol.config_git",
+    "dedupe": "workspace.dedupe",
+    "overlay": "workspace.overlay",
+    "pack": "workspace.pack",
+    "fleet": "analytics.fleet"
+}
+
+
+def print_usage():
+    """Print command-line usage"""
+    print("Usage: sandman.py [command] [args...]")
+    print()
+    print("Commands:")
+    print("  menu                 Interactive menu (default)")
+    print("  create [name]        Create .wsb files (flags or --manifest)")
+    print("  list                 List .wsb files")
+    print("  validate <targets>   Validate .wsb files")
+    print("  inspect <targets>    Show parsed configurations")
+    print("  launch <targets>     Validate and launch Windows Sandbox")
+    print("  profiles <command>   Manage launch profiles")
+    print("  analytics <command>  Usage analytics")
+    print("  notify <command>     Notifications")
+    print("  vcs <command>        Configuration version control")
+    print("  dedupe               Find duplicate and near-duplicate configurations")
+    print("  overlay <command>    Template + overrides configurations")
+    print("  pack <command>       Single-file workspace packs")
+    print("  fleet <hosts...>     Fleet-wide analytics from many hosts")
+    print("  metrics [command]    Run a command, then dump its metrics")
+    print("  help                 Show this help")
+    print()
+    print("create, list, validate, inspect and launch accept --json or --jsonl.")
+    print("Exit codes: 0 ok, 1 failure, 2 usage error, 3 target not found.")
+    print()
+    print("Add --profile (or --profile=DIR) to any command to write cProfile,")
+    print("allocation and span reports for that run.")
+
+
+def run_subsystem(command: str, argv: List[str]) -> int:
+    """Import a subsystem module and run its main() with the remaining args"""
+    import importlib
+
+    module = importlib.import_module(SUBSYSTEMS[command])
+    return module.main(argv)
+
+
+def run_metrics(argv: List[str]) -> int:
+    """Run a command in this process, then dump the metrics it recorded.
+
+    The dump goes to stderr when a command was run, so the command's own
+    output (e.g. --json) stays parseable; --output writes it to a file.
+    """
+    import argparse
+    from metrics.registry import REGISTRY
+
+    parser = argparse.ArgumentParser(prog="sandman.py metrics",
+                                     description="Run a command and dump the metrics it recorded")
+    parser.add_argument("--format", choices=["text", "json", "prometheus"], default="text",
+                        help="dump format (default: text)")
+    parser.add_argument("--output", help="write the dump to this file")
+    parser.add_argument("command", nargs=argparse.REMAINDER, help="command and arguments to run")
+    args = parser.parse_args(argv)
+
+    if args.command and args.command[0] == "metrics":
+        print(Colors.colorize("✗ metrics cannot run itself", Colors.RED))
+        return EXIT_USAGE
+
+    code = main(args.command) if args.command else EXIT_OK
+
+    if args.format == "json":
+        import json
+        dump = json.dumps(REGISTRY.snapshot(), indent=2)
+    elif args.format == "prometheus":
+        dump = REGISTRY.render_prometheus()
+    else:
+        dump = REGISTRY.render_text()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(dump)
+    else:
+        print(dump, file=sys.stderr if args.command else sys.stdout)
+    return code
+
+
+def run_profiled(argv: List[str], output_dir: Optional[str]) -> int:
+    """Run a command under a profiling session and report where it was written"""
+    from metrics.profiling import ProfileSession
+
+    words = [arg for arg in argv[:2] if not arg.startswith("-")]
+    session = ProfileSession("-".join(["cli"] + (words or ["menu"])), output_dir,
+                             all_threads=True)
+    session.start()
+    try:
+        code = main(argv)
+    finally:
+        files = session.stop()
+
+    print(Colors.colorize(f"✓ Profile written: {files['summary']}", Colors.GREEN), file=sys.stderr)
+    print(f"  pstats: {files['pstats']}", file=sys.stderr)
+    print(f"  flamegraph: {files['collapsed']}", file=sys.stderr)
+    return code
+
+
+def main(argv: Optional[List[str]] = None) -> int:
     """Entry point"""
-    if sys.platform != "win32":
-        print("Warning: This tool is designed for Windows. Some features may not work.")
+    argv = sys.argv[1:] if argv is None else argv
+
+    profile_flags = [arg for arg in argv if arg == "--profile" or arg.startswith("--profile=")]
+    if profile_flags:
+        output_dir = profile_flags[-1].partition("=")[2] or None
+        return run_profiled([arg for arg in argv if arg not in profile_flags], output_dir)
+
+    command = argv[0] if argv else "menu"
+
+    if command == "menu":
+        if sys.platform != "win32":
+            print("Warning: This tool is designed for Windows. Some features may not work.")
+
+        ui = SandmanUI()
+        ui.main_menu()
+        return 0
+
+    if command in ("help", "-h", "--help"):
+        print_usage()
+        return 0
+
+    if command in SandmanCLI.COMMANDS:
+        return SandmanCLI().run(argv)
+
+    if command in SUBSYSTEMS:
+        return run_subsystem(command, argv[1:])
+
+    if command == "metrics":
+        return run_metrics(argv[1:])
 
-    ui = SandmanUI()
-    ui.main_menu()
+    print(Colors.colorize(f"Unknown command: {command}", Colors.RED))
+    print_usage()
+    return 2
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
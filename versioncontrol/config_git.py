@@ -6,11 +6,18 @@ Git integration for tracking configuration changes, viewing history, and reverti
 """
 
 import os
+import sys
 import subprocess
 import json
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from metrics.registry import ERRORS, SUBPROCESS_SECONDS, record_json_io
 
 
 class ConfigVersionControl:
@@ -30,18 +37,21 @@ class ConfigVersionControl:
     def _run_git_command(self, *args, capture_output=True) -> Tuple[bool, str]:
         """Run a git command in the workspace"""
         try:
-            result = subprocess.run(
-                ["git", "-C", str(self.workspace)] + list(args),
-                capture_output=capture_output,
-                text=True,
-                check=False
-            )
+            with SUBPROCESS_SECONDS.time(command="git", op=args[0] if args else ""):
+                result = subprocess.run(
+                    ["git", "-C", str(self.workspace)] + list(args),
+                    capture_output=capture_output,
+                    text=True,
+                    check=False
+                )
             success = result.returncode == 0
             output = result.stdout if success else result.stderr
             return success, output.strip()
         except FileNotFoundError:
+            ERRORS.inc(component="vcs", kind="git_missing")
             return False, "Git is not installed or not in PATH"
         except Exception as e:
+            ERRORS.inc(component="vcs", kind="git")
             return False, str(e)
 
     def is_initialized(self) -> bool:
@@ -89,26 +99,73 @@ analytics.json
             "version": "1.0",
             "auto_commit": False
         }
+        started = time.perf_counter()
         with open(self.vcs_config, 'w') as f:
             json.dump(vcs_data, f, indent=2)
+            record_json_io("vcs", "save", f, started)
 
         return True, "Git repository initialized successfully"
 
     def get_vcs_config(self) -> Dict:
         """Get VCS configuration"""
         if self.vcs_config.exists():
+            started = time.perf_counter()
             with open(self.vcs_config, 'r') as f:
-                return json.load(f)
+                config = json.load(f)
+                record_json_io("vcs", "load", f, started)
+            return config
         return {"auto_commit": False}
 
+    def _save_vcs_config(self, config: Dict):
+        """Save VCS configuration"""
+        started = time.perf_counter()
+        with open(self.vcs_config, 'w') as f:
+            json.dump(config, f, indent=2)
+            record_json_io("vcs", "save", f, started)
+
     def set_auto_commit(self, enabled: bool) -> Tuple[bool, str]:
         """Enable or disable auto-commit"""
         config = self.get_vcs_config()
         config["auto_commit"] = enabled
-        with open(self.vcs_config, 'w') as f:
-            json.dump(config, f, indent=2)
+        self._save_vcs_config(config)
         return True, f"Auto-commit {'enabled' if enabled else 'disabled'}"
 
+    def _head_commit(self) -> Optional[str]:
+        """Commit id of HEAD, read from the .git directory without running git"""
+        try:
+            head = (self.git_dir / "HEAD").read_text().strip()
+            if not head.startswith("ref: "):
+                return head or None
+            ref = head[5:]
+            ref_file = self.git_dir / ref
+            if ref_file.exists():
+                return ref_file.read_text().strip() or None
+            packed_refs = self.git_dir / "packed-refs"
+            if packed_refs.exists():
+                for line in packed_refs.read_text().splitlines():
+                    if line.endswith(" " + ref):
+                        return line.split(" ", 1)[0]
+        except OSError:
+            pass
+        return None
+
+    def _record_committed_hash(self, config_name: str, content_hash: Optional[str]):
+        """Remember the canonical hash of a configuration as committed at HEAD.
+
+        Hashes are only trusted while HEAD stays the same: any other commit,
+        checkout or revert may have changed the file, so they are dropped.
+        """
+        head = self._head_commit()
+        if not content_hash or not head:
+            return
+        config = self.get_vcs_config()
+        committed = config.get("committed")
+        if not committed or committed.get("head") != head:
+            committed = {"head": head, "hashes": {}}
+        committed["hashes"][config_name] = content_hash
+        config["committed"] = committed
+        self._save_vcs_config(config)
+
     def commit_config(self, config_name: str, message: Optional[str] = None) -> Tuple[bool, str]:
         """Commit changes to a configuration"""
         if not self.is_initialized():
@@ -118,6 +175,15 @@ analytics.json
         if not config_file.exists():
             return False, f"Configuration '{config_name}' not found"
 
+        # A file equivalent to the one committed at HEAD needs no git processes
+        from workspace.canonical import file_hash
+        content_hash = file_hash(config_file)
+        head = self._head_commit()
+        committed = self.get_vcs_config().get("committed") or {}
+        if (content_hash and head and committed.get("head") == head
+                and committed.get("hashes", {}).get(config_name) == content_hash):
+            return True, "No changes to commit"
+
         # Stage the file
         success, output = self._run_git_command("add", config_file.name)
         if not success:
@@ -126,6 +192,7 @@ analytics.json
         # Check if there are changes to commit
         success, status = self._run_git_command("status", "--porcelain")
         if not status:
+            self._record_committed_hash(config_name, content_hash)
             return True, "No changes to commit"
 
         # Create commit message
@@ -139,6 +206,7 @@ analytics.json
         if not success:
             return False, f"Failed to commit: {output}"
 
+        self._record_committed_hash(config_name, content_hash)
         return True, f"Configuration '{config_name}' committed successfully"
 
     def commit_all(self, message: Optional[str] = None) -> Tuple[bool, str]:
@@ -221,6 +289,116 @@ analytics.json
 
         return True, output if output else "No differences"
 
+    def read_configs_at(self, commit_hash: str = "HEAD",
+                        names: Optional[List[str]] = None) -> Tuple[bool, Union[Dict[str, bytes], str]]:
+        """Read the .wsb files in a commit (all of them, or only names).
+
+        Uses one `git ls-tree` and one `git cat-file --batch`, however many
+        files there are. Returns (True, {name: content}) or (False, error).
+        """
+        if not self.is_initialized():
+            return False, "Git repository not initialized"
+
+        args = ["ls-tree", "-z", commit_hash, "--"]
+        if names is not None:
+            args += [f"{name}.wsb" for name in names]
+        success, listing = self._run_git_command(*args)
+        if not success:
+            return False, listing
+
+        blobs = []
+        for record in listing.split("\0"):
+            if not record:
+                continue
+            info, _, path = record.partition("\t")
+            _, kind, blob = info.split()
+            if kind == "blob" and path.endswith(".wsb") and "/" not in path:
+                blobs.append((path[:-4], blob))
+        if not blobs:
+            return True, {}
+
+        try:
+            with SUBPROCESS_SECONDS.time(command="git", op="cat-file"):
+                result = subprocess.run(
+                    ["git", "-C", str(self.workspace), "cat-file", "--batch"],
+                    input="".join(f"{blob}\n" for _, blob in blobs).encode("ascii"),
+                    capture_output=True,
+                    check=False
+                )
+        except FileNotFoundError:
+            ERRORS.inc(component="vcs", kind="git_missing")
+            return False, "Git is not installed or not in PATH"
+        if result.returncode != 0:
+            return False, result.stderr.decode(errors="replace").strip()
+
+        # Output is "<blob> blob <size>\n<content>\n" per requested object, in order
+        contents = {}
+        output = result.stdout
+        offset = 0
+        for name, _ in blobs:
+            header_end = output.index(b"\n", offset)
+            size = int(output[offset:header_end].split()[2])
+            contents[name] = output[header_end + 1:header_end + 1 + size]
+            offset = header_end + 1 + size + 1
+        return True, contents
+
+    def get_semantic_diff(self, config_name: str, commit_hash: Optional[str] = None,
+                          to_commit: Optional[str] = None) -> Tuple[bool, Union[List[Dict], str]]:
+        """Structural diff of a configuration between a commit (default HEAD)
+        and the working copy, or another commit.
+
+        Returns (True, changes) where changes are the typed operations from
+        versioncontrol/semantic_diff.py, or (False, error).
+        """
+        from versioncontrol.semantic_diff import diff_text
+
+        success, old = self.read_configs_at(commit_hash or "HEAD", [config_name])
+        if not success:
+            return False, old
+
+        if to_commit:
+            success, new = self.read_configs_at(to_commit, [config_name])
+            if not success:
+                return False, new
+        else:
+            config_file = self.workspace / f"{config_name}.wsb"
+            new = {config_name: config_file.read_bytes()} if config_file.exists() else {}
+
+        if config_name not in old and config_name not in new:
+            return False, f"Configuration '{config_name}' not found"
+        if config_name not in old:
+            return True, [{"op": "config_added"}]
+        if config_name not in new:
+            return True, [{"op": "config_removed"}]
+        return True, diff_text(old[config_name], new[config_name])
+
+    def get_workspace_diff(self, baseline: str = "HEAD", to_commit: Optional[str] = None,
+                           max_workers: Optional[int] = None) -> Tuple[bool, Union[Dict[str, List[Dict]], str]]:
+        """Structural diff of every configuration against a baseline.
+
+        baseline is a commit or a directory of .wsb files; the other side is
+        the working copy, or to_commit. Large workspaces are compared in
+        parallel worker processes. Returns (True, {name: changes}) for the
+        configurations that differ, or (False, error).
+        """
+        from versioncontrol.semantic_diff import diff_trees, read_directory
+
+        if os.path.isdir(baseline):
+            old = read_directory(baseline)
+        else:
+            success, old = self.read_configs_at(baseline)
+            if not success:
+                return False, old
+
+        if to_commit:
+            success, new = self.read_configs_at(to_commit)
+            if not success:
+                return False, new
+        else:
+            new = read_directory(self.workspace)
+
+        return True, diff_trees(old, new, max_workers=max_workers)
+
     def revert_config(self, config_name: str, commit_hash: str) -> Tuple[bool, str]:
         """Revert a configuration to a specific commit"""
         if not self.is_initialized():
@@ -356,17 +534,18 @@ analytics.json
 
 
 # CLI Interface
-if __name__ == "__main__":
-    import sys
-
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point (also used by `sandman vcs`)"""
+    argv = sys.argv[1:] if argv is None else argv
     vcs = ConfigVersionControl()
 
-    if len(sys.argv) > 1:
-        command = sys.argv[1].lower()
+    if argv:
+        command = argv[0].lower()
 
         if command == "init":
             success, message = vcs.initialize()
             print(f"{'✓' if success else '✗'} {message}")
+            return 0 if success else 1
 
         elif command == "status":
             status = vcs.get_status()
@@ -387,20 +566,22 @@ if __name__ == "__main__":
                     for file in status['untracked']:
                         print(f"  - {file}")
 
-        elif command == "commit" and len(sys.argv) >= 3:
-            config_name = sys.argv[2]
-            message = sys.argv[3] if len(sys.argv) > 3 else None
+        elif command == "commit" and len(argv) >= 2:
+            config_name = argv[1]
+            message = argv[2] if len(argv) > 2 else None
             success, output = vcs.commit_config(config_name, message)
             print(f"{'✓' if success else '✗'} {output}")
+            return 0 if success else 1
 
         elif command == "commit-all":
-            message = sys.argv[2] if len(sys.argv) > 2 else None
+            message = argv[1] if len(argv) > 1 else None
             success, output = vcs.commit_all(message)
             print(f"{'✓' if success else '✗'} {output}")
+            return 0 if success else 1
 
-        elif command == "history" and len(sys.argv) >= 2:
-            config_name = sys.argv[2] if len(sys.argv) > 2 else None
-            limit = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+        elif command == "history":
+            config_name = argv[1] if len(argv) > 1 else None
+            limit = int(argv[2]) if len(argv) > 2 else 20
             commits = vcs.get_history(config_name, limit)
 
             if not commits:
@@ -413,20 +594,49 @@ if __name__ == "__main__":
                     print(f"  {commit['message']}")
                     print()
 
-        elif command == "revert" and len(sys.argv) >= 4:
-            config_name = sys.argv[2]
-            commit_hash = sys.argv[3]
+        elif command == "revert" and len(argv) >= 3:
+            config_name = argv[1]
+            commit_hash = argv[2]
             success, output = vcs.revert_config(config_name, commit_hash)
             print(f"{'✓' if success else '✗'} {output}")
+            return 0 if success else 1
 
-        elif command == "diff" and len(sys.argv) >= 3:
-            config_name = sys.argv[2]
-            commit_hash = sys.argv[3] if len(sys.argv) > 3 else None
+        elif command == "diff" and len(argv) >= 2:
+            config_name = argv[1]
+            commit_hash = argv[2] if len(argv) > 2 else None
             success, output = vcs.get_diff(config_name, commit_hash)
             if success:
                 print(output)
             else:
                 print(f"✗ {output}")
+                return 1
+
+        elif command == "semdiff" and len(argv) >= 2:
+            from versioncontrol.semantic_diff import format_ops
+            commit_hash = argv[2] if len(argv) > 2 else None
+            to_commit = argv[3] if len(argv) > 3 else None
+            success, changes = vcs.get_semantic_diff(argv[1], commit_hash, to_commit)
+            if not success:
+                print(f"✗ {changes}")
+                return 1
+            print("\n".join(format_ops(changes)) if changes else "No semantic differences")
+
+        elif command == "semdiff-files" and len(argv) >= 3:
+            from versioncontrol.semantic_diff import diff_files, format_ops
+            changes = diff_files(argv[1], argv[2])
+            print("\n".join(format_ops(changes)) if changes else "No semantic differences")
+            if any(change["op"] == "error" for change in changes):
+                return 1
+
+        elif command == "semdiff-all":
+            from versioncontrol.semantic_diff import format_tree_diff
+            baseline = argv[1] if len(argv) > 1 else "HEAD"
+            to_commit = argv[2] if len(argv) > 2 else None
+            success, changes = vcs.get_workspace_diff(baseline, to_commit)
+            if not success:
+                print(f"✗ {changes}")
+                return 1
+            print(format_tree_diff(changes))
 
         else:
             print("Usage:")
@@ -436,7 +646,14 @@ if __name__ == "__main__":
             print("  python config_git.py commit-all [message]      - Commit all changes")
             print("  python config_git.py history [name] [limit]    - View commit history")
             print("  python config_git.py diff <name> [commit]      - Show differences")
+            print("  python config_git.py semdiff <name> [commit] [to-commit]")
+            print("                                                 - Show setting and folder changes")
+            print("  python config_git.py semdiff-files <a.wsb> <b.wsb>")
+            print("                                                 - Compare two configuration files")
+            print("  python config_git.py semdiff-all [commit|dir] [to-commit]")
+            print("                                                 - Compare the workspace to a baseline")
             print("  python config_git.py revert <name> <commit>    - Revert to a commit")
+            return 2
     else:
         status = vcs.get_status()
         if not status["initialized"]:
@@ -448,3 +665,9 @@ if __name__ == "__main__":
                 print(f"  Modified: {len(status['modified'])} files")
             if status['untracked']:
                 print(f"  Untracked: {len(status['untracked'])} files")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
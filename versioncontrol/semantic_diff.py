@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Sandman Semantic Diff
+
+Structural comparison of .wsb configurations. Files are parsed into the
+normalized model from workspace/model.py and compared setting by setting,
+with mapped folders matched by HostFolder, so reformatting, comments and
+reordering never show up as changes. Each change is a typed operation:
+
+    setting_changed        a single-value setting (MemoryInMB, Networking...)
+    folder_added           a MappedFolder that only exists in the new file
+    folder_removed         a MappedFolder that only exists in the old file
+    folder_access_changed  a folder switched between read-only and read-write
+    folder_target_changed  a folder's SandboxFolder changed
+    logon_command_changed  the LogonCommand changed
+    element_changed        any other element was added, removed or changed
+    config_added           (workspace diffs) the file is new
+    config_removed         (workspace diffs) the file was deleted
+    error                  a file could not be parsed
+
+Comparing two models is linear in the number of settings and folders.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from workspace.model import SETTINGS, load_model, parse_model
+
+
+# Below this many changed files, starting worker processes costs more than
+# it saves
+PARALLEL_THRESHOLD = 2000
+
+
+def _access(readonly: bool) -> str:
+    return "read-only" if readonly else "read-write"
+
+
+def _folder_op(op: str, folder: Dict) -> Dict:
+    return {"op": op, "host_folder": folder["path"], "sandbox_folder": folder["sandbox_folder"],
+            "access": _access(folder["readonly"])}
+
+
+def diff_models(old: Dict, new: Dict) -> List[Dict]:
+    """Compare two configuration models and return the changes from old to new"""
+    ops = []
+
+    for element, key, _ in SETTINGS:
+        if old["settings"][key] != new["settings"][key]:
+            ops.append({"op": "setting_changed", "element": element, "field": key,
+                        "old": old["settings"][key], "new": new["settings"][key]})
+
+    old_folders, new_folders = old["folders"], new["folders"]
+    for key, folder in new_folders.items():
+        previous = old_folders.get(key)
+        if previous is None:
+            ops.append(_folder_op("folder_added", folder))
+            continue
+        if previous["readonly"] != folder["readonly"]:
+            ops.append({"op": "folder_access_changed", "host_folder": folder["path"],
+                        "old": _access(previous["readonly"]), "new": _access(folder["readonly"])})
+        if previous["sandbox_folder"] != folder["sandbox_folder"]:
+            ops.append({"op": "folder_target_changed", "host_folder": folder["path"],
+                        "old": previous["sandbox_folder"], "new": folder["sandbox_folder"]})
+    for key, folder in old_folders.items():
+        if key not in new_folders:
+            ops.append(_folder_op("folder_removed", folder))
+
+    if old["logon_command"] != new["logon_command"]:
+        ops.append({"op": "logon_command_changed",
+                    "old": old["logon_command"], "new": new["logon_command"]})
+
+    for element in sorted(set(old["other"]) | set(new["other"])):
+        before, after = old["other"].get(element), new["other"].get(element)
+        if before != after:
+            ops.append({"op": "element_changed", "element": element, "old": before, "new": after})
+
+    return ops
+
+
+def diff_text(old: Union[bytes, str], new: Union[bytes, str]) -> List[Dict]:
+    """Compare two .wsb documents; identical text is not parsed at all"""
+    if old == new:
+        return []
+    try:
+        old_model = parse_model(old)
+        new_model = parse_model(new)
+    except ValueError as e:
+        return [{"op": "error", "message": str(e)}]
+    return diff_models(old_model, new_model)
+
+
+def diff_files(old_path: Union[Path, str], new_path: Union[Path, str]) -> List[Dict]:
+    """Compare two .wsb files"""
+    try:
+        return diff_models(load_model(old_path), load_model(new_path))
+    except (ValueError, OSError) as e:
+        return [{"op": "error", "message": str(e)}]
+
+
+def _diff_entry(item) -> List[Dict]:
+    old, new = item
+    if old is None:
+        return [{"op": "config_added"}]
+    if new is None:
+        return [{"op": "config_removed"}]
+    return diff_text(old, new)
+
+
+def diff_trees(old: Dict[str, bytes], new: Dict[str, bytes],
+               max_workers: Optional[int] = None) -> Dict[str, List[Dict]]:
+    """Compare two sets of .wsb documents (name -> content).
+
+    Byte-identical files are skipped without parsing. Parsing is CPU-bound,
+    so large sets of changed files are split across worker processes
+    (max_workers, default: one per CPU). Returns name -> changes for the
+    configurations that differ.
+    """
+    names = sorted(name for name in set(old) | set(new) if old.get(name) != new.get(name))
+    items = [(old.get(name), new.get(name)) for name in names]
+    workers = min(max_workers or os.cpu_count() or 1, 61)
+
+    if len(items) >= PARALLEL_THRESHOLD and workers > 1:
+        # Imported here: it is slow to import and most CLI calls never need it
+        from concurrent.futures import ProcessPoolExecutor
+        chunksize = max(1, len(items) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_diff_entry, items, chunksize=chunksize))
+    else:
+        results = [_diff_entry(item) for item in items]
+
+    return {name: ops for name, ops in zip(names, results) if ops}
+
+
+def read_directory(directory: Union[Path, str]) -> Dict[str, bytes]:
+    """Read every .wsb file in a directory (name -> content)"""
+    contents = {}
+    try:
+        scan = list(os.scandir(directory))
+    except FileNotFoundError:
+        return contents
+
+    for entry in scan:
+        if entry.name.endswith(".wsb") and entry.is_file():
+            with open(entry.path, 'rb') as f:
+                contents[entry.name[:-4]] = f.read()
+    return contents
+
+
+def _value(value) -> str:
+    return "(none)" if value is None else str(value)
+
+
+def format_ops(ops: List[Dict], indent: str = "") -> List[str]:
+    """Render changes as readable lines"""
+    lines = []
+    for op in ops:
+        kind = op["op"]
+        if kind == "setting_changed":
+            line = f"~ {op['element']}: {_value(op['old'])} → {_value(op['new'])}"
+        elif kind in ("folder_added", "folder_removed"):
+            target = f" → {op['sandbox_folder']}" if op["sandbox_folder"] else ""
+            sign = "+" if kind == "folder_added" else "-"
+            line = f"{sign} MappedFolder {op['host_folder']}{target} ({op['access']})"
+        elif kind == "folder_access_changed":
+            line = f"~ MappedFolder {op['host_folder']}: {op['old']} → {op['new']}"
+        elif kind == "folder_target_changed":
+            line = (f"~ MappedFolder {op['host_folder']}: SandboxFolder "
+                    f"{_value(op['old'])} → {_value(op['new'])}")
+        elif kind == "logon_command_changed":
+            line = f"~ LogonCommand: {_value(op['old'])} → {_value(op['new'])}"
+        elif kind == "element_changed":
+            if op["old"] is None:
+                line = f"+ {op['element']}: {op['new']}"
+            elif op["new"] is None:
+                line = f"- {op['element']}: {op['old']}"
+            else:
+                line = f"~ {op['element']}: {op['old']} → {op['new']}"
+        elif kind == "config_added":
+            line = "+ new configuration"
+        elif kind == "config_removed":
+            line = "- configuration deleted"
+        else:
+            line = f"✗ {op.get('message', kind)}"
+        lines.append(indent + line)
+    return lines
+
+
+def format_tree_diff(changes: Dict[str, List[Dict]]) -> str:
+    """Render a workspace diff, one block per changed configuration"""
+    if not changes:
+        return "No semantic differences"
+    lines = []
+    for name, ops in changes.items():
+        lines.append(f"{name}.wsb")
+        lines.extend(format_ops(ops, indent="  "))
+    lines.append(f"\n{len(changes)} configuration(s) changed")
+    return "\n".join(lines)
@@ -5,27 +5,46 @@ Run with: python web/app.py
 Access at: http://localhost:5000
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, g, render_template, request, jsonify, send_file, stream_with_context
 import os
 import sys
 import json
+import threading
+import time
 import xml.etree.ElementTree as ET
 import xml.dom.minidom as minidom
 from pathlib import Path
-from datetime import datetime
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+from workspace.index import WorkspaceIndex, valid_config_name
+from workspace.events import EventBus, WorkspaceWatcher, format_sse
+from workspace.catalog import TemplateCatalog
+from workspace.canonical import write_wsb
+from workspace.model import render_xml
+from workspace.dedupe import analyze, convert_cluster, load_models
+from workspace.overlay import OverlayResolver
+from profiles.profiles import ProfileManager
+from metrics.registry import REGISTRY, ERRORS, XML_SECONDS, count_cache
+
 app = Flask(__name__)
 
 # Configuration
-WORKSPACE = Path(os.environ.get("USERPROFILE", ""), "Documents", "wsb-files")
+# SANDMAN_WORKSPACE overrides the default (used by the load-test harness)
+WORKSPACE = Path(os.environ.get("SANDMAN_WORKSPACE") or
+                 Path(os.environ.get("USERPROFILE", ""), "Documents", "wsb-files"))
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
 
 # Ensure workspace exists
 WORKSPACE.mkdir(parents=True, exist_ok=True)
 
+# Per-request profiling (X-Sandman-Profile header or ?profile=1) is only
+# available when SANDMAN_ADMIN_TOKEN is set and the request carries it
+ADMIN_TOKEN = os.environ.get("SANDMAN_ADMIN_TOKEN")
+PROFILE_HEADER = "X-Sandman-Profile"
+ADMIN_TOKEN_HEADER = "X-Sandman-Admin-Token"
+
 # Allowed values
 ALLOWED_VALUES = {
     "Networking": ["Default", "Disable"],
@@ -39,6 +58,19 @@ ALLOWED_VALUES = {
 
 MIN_MEMORY_MB = 256
 MAX_MEMORY_MB = 131072
+BULK_GET_LIMIT = 10000
+
+# Configuration keys and the .wsb elements they are stored in
+FIELD_ELEMENTS = {
+    "networking": "Networking",
+    "vgpu": "VGpu",
+    "memory_mb": "MemoryInMB",
+    "audio_input": "AudioInput",
+    "video_input": "VideoInput",
+    "printer_redirection": "PrinterRedirection",
+    "clipboard_redirection": "ClipboardRedirection",
+    "protected_client": "ProtectedClient",
+}
 
 
 def create_wsb_xml(**kwargs):
@@ -80,43 +112,220 @@ def create_wsb_xml(**kwargs):
     return reparsed.toprettyxml(indent="  ")
 
 
+# Element -> configuration key lookup for single-pass parsing
+ELEMENT_FIELDS = {element: key for key, element in FIELD_ELEMENTS.items()}
+
+# Values used when an element is missing from a .wsb file
+FIELD_DEFAULTS = {
+    "memory_mb": 4096,
+    "networking": "Default",
+    "vgpu": "Default",
+    "audio_input": "Default",
+    "video_input": "Default",
+    "printer_redirection": "Enable",
+    "clipboard_redirection": "Enable",
+    "protected_client": "Enable",
+}
+
+
 def parse_wsb_file(file_path):
-    """Parse .wsb file and return configuration as dict"""
+    """Parse .wsb file and return configuration as dict (single pass over the XML)"""
     try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-
-        config = {
-            "name": Path(file_path).stem,
-            "memory_mb": int(root.find("MemoryInMB").text) if root.find("MemoryInMB") is not None else 4096,
-            "networking": root.find("Networking").text if root.find("Networking") is not None else "Default",
-            "vgpu": root.find("VGpu").text if root.find("VGpu") is not None else "Default",
-            "audio_input": root.find("AudioInput").text if root.find("AudioInput") is not None else "Default",
-            "video_input": root.find("VideoInput").text if root.find("VideoInput") is not None else "Default",
-            "printer_redirection": root.find("PrinterRedirection").text if root.find("PrinterRedirection") is not None else "Enable",
-            "clipboard_redirection": root.find("ClipboardRedirection").text if root.find("ClipboardRedirection") is not None else "Enable",
-            "protected_client": root.find("ProtectedClient").text if root.find("ProtectedClient") is not None else "Enable",
-            "mapped_folders": []
-        }
-
-        # Parse mapped folders
-        mapped_folders_elem = root.find("MappedFolders")
-        if mapped_folders_elem is not None:
-            for folder in mapped_folders_elem.findall("MappedFolder"):
-                host_folder = folder.find("HostFolder")
-                read_only = folder.find("ReadOnly")
-
-                if host_folder is not None:
-                    config["mapped_folders"].append({
-                        "path": host_folder.text,
-                        "readonly": read_only.text.lower() == "true" if read_only is not None else True
-                    })
+        with XML_SECONDS.time(component="web", op="parse"):
+            root = ET.parse(file_path).getroot()
+
+        config = {"name": Path(file_path).stem}
+        config.update(FIELD_DEFAULTS)
+        config["mapped_folders"] = []
+
+        for elem in root:
+            key = ELEMENT_FIELDS.get(elem.tag)
+            if key == "memory_mb":
+                config[key] = int(elem.text)
+            elif key:
+                config[key] = elem.text
+            elif elem.tag == "MappedFolders":
+                for folder in elem:
+                    if folder.tag != "MappedFolder":
+                        continue
+                    host_folder = None
+                    read_only = None
+                    for child in folder:
+                        if child.tag == "HostFolder":
+                            host_folder = child.text
+                        elif child.tag == "ReadOnly":
+                            read_only = child.text
+
+                    if host_folder is not None:
+                        config["mapped_folders"].append({
+                            "path": host_folder,
+                            "readonly": read_only.lower() == "true" if read_only is not None else True
+                        })
 
         return config
     except Exception as e:
+        ERRORS.inc(component="web", kind="parse")
         return {"error": str(e)}
 
 
+# In-memory index of the workspace, shared by all requests
+WORKSPACE_INDEX = WorkspaceIndex(WORKSPACE, parser=parse_wsb_file)
+
+# SANDMAN_INDEX_PACK seeds the index from a workspace pack, so a large
+# workspace is listed at startup without parsing every file
+if os.environ.get("SANDMAN_INDEX_PACK"):
+    WORKSPACE_INDEX.load_pack(Path(os.environ["SANDMAN_INDEX_PACK"]))
+
+# Templates are parsed once at startup and reloaded only when they change
+TEMPLATE_CATALOG = TemplateCatalog(TEMPLATES_DIR, parser=parse_wsb_file)
+_templates_response = {"version": None, "body": None}
+
+# Configurations stored as a template plus overrides, rendered on demand
+OVERLAYS = OverlayResolver(WORKSPACE / "overlays", TEMPLATES_DIR)
+
+# Live change feed: one watcher thread fans out to every /api/events client
+EVENT_BUS = EventBus()
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+# Quick-launch profiles, reloaded when profiles.json changes on disk
+PROFILE_MANAGER = ProfileManager(str(WORKSPACE / "profiles.json"))
+_profiles_lock = threading.Lock()
+
+# Request metrics, labelled by route pattern rather than URL so the number
+# of series stays bounded
+HTTP_REQUESTS = REGISTRY.counter(
+    "sandman_http_requests_total", "HTTP requests by route, method and status",
+    ["route", "method", "status"])
+HTTP_SECONDS = REGISTRY.histogram(
+    "sandman_http_request_seconds", "Time to produce an HTTP response", ["route", "method"])
+WORKSPACE_CONFIGS = REGISTRY.gauge(
+    "sandman_workspace_configs", "Configurations in the workspace index")
+EVENT_SUBSCRIBERS = REGISTRY.gauge(
+    "sandman_event_subscribers", "Clients connected to /api/events")
+PROFILE_COUNT = REGISTRY.gauge(
+    "sandman_profiles", "Quick-launch profiles loaded")
+
+
+def ensure_watcher():
+    """Start the workspace watcher on first use"""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = WorkspaceWatcher(WORKSPACE_INDEX, EVENT_BUS)
+            WORKSPACE_INDEX.refresh(force=True)
+            _watcher.start()
+    return _watcher
+
+
+def validate_config(config):
+    """Check memory range and allowed values; returns an error message or None"""
+    try:
+        memory_mb = int(config.get("memory_mb", 4096))
+    except (TypeError, ValueError):
+        return f"Invalid memory value: {config.get('memory_mb')}"
+    if memory_mb < MIN_MEMORY_MB or memory_mb > MAX_MEMORY_MB:
+        return f"Memory must be between {MIN_MEMORY_MB} and {MAX_MEMORY_MB} MB"
+
+    for key, element in FIELD_ELEMENTS.items():
+        allowed = ALLOWED_VALUES.get(element)
+        if allowed and key in config and config[key] not in allowed:
+            return f"Invalid {element} value: '{config[key]}' (allowed: {', '.join(allowed)})"
+
+    for folder in config.get("mapped_folders", []):
+        if not folder.get("path"):
+            return "Mapped folder path is required"
+
+    return None
+
+
+def save_config_file(name, xml_content, backup=False):
+    """Write a configuration unless the file already holds an equivalent one.
+
+    The existing file's canonical hash comes from the workspace index, so an
+    unchanged save costs no file I/O, no backup and no cache invalidation.
+    Returns True if the file was written.
+    """
+    file_path = WORKSPACE / f"{name}.wsb"
+    written = write_wsb(file_path, xml_content,
+                        backup_path=file_path.with_suffix(".wsb.bak") if backup else None,
+                        current_hash=WORKSPACE_INDEX.content_hash(name))
+    if written:
+        WORKSPACE_INDEX.touch(name)
+    return written
+
+
+def _bool_arg(value):
+    """Parse an optional boolean query parameter"""
+    if value is None or value == "":
+        return None
+    return value.lower() in ("1", "true", "yes")
+
+
+def _int_arg(value):
+    """Parse an optional integer query parameter"""
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+@app.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.before_request
+def start_profiling():
+    """Profile this request if an admin asked for it"""
+    if not (request.headers.get(PROFILE_HEADER) or request.args.get("profile")):
+        return None
+
+    import hmac
+    supplied = request.headers.get(ADMIN_TOKEN_HEADER, "")
+    if not ADMIN_TOKEN or not hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode()):
+        return jsonify({"success": False, "error": "Profiling requires the admin token"}), 403
+
+    from metrics.profiling import ProfileSession
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    g.profile_session = ProfileSession(f"web-{request.method}-{route}").start()
+    return None
+
+
+@app.after_request
+def record_request(response):
+    """Record request count and latency (streamed bodies count until the first byte)"""
+    started = getattr(g, "request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_SECONDS.observe(time.perf_counter() - started, route=route, method=request.method)
+        HTTP_REQUESTS.inc(route=route, method=request.method, status=response.status_code)
+        if response.status_code >= 500:
+            ERRORS.inc(component="web", kind="request")
+    return response
+
+
+@app.after_request
+def finish_profiling(response):
+    """Write the request's profile and name it in the response headers.
+
+    Streamed responses are profiled up to the point their body starts.
+    """
+    session = g.pop("profile_session", None)
+    if session is not None:
+        files = session.stop()
+        response.headers[PROFILE_HEADER] = files["summary"]
+    return response
+
+
+@app.teardown_request
+def abandon_profiling(exc):
+    """Stop a session whose request failed before after_request ran"""
+    session = g.pop("profile_session", None)
+    if session is not None:
+        session.stop(write=False)
+
+
 @app.route('/')
 def index():
     """Main page"""
@@ -125,18 +334,137 @@ def index():
 
 @app.route('/api/configs', methods=['GET'])
 def list_configs():
-    """List all .wsb files"""
+    """List .wsb files with keyset pagination, sorting and filtering"""
     try:
-        files = []
-        for file_path in sorted(WORKSPACE.glob("*.wsb"), key=lambda p: p.stat().st_mtime, reverse=True):
-            stat = file_path.stat()
-            files.append({
-                "name": file_path.stem,
-                "filename": file_path.name,
-                "size": stat.st_size,
-                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
-            })
-        return jsonify({"success": True, "files": files})
+        args = request.args
+        try:
+            page = WORKSPACE_INDEX.query(
+                sort=args.get("sort", "mtime"),
+                order=args.get("order") or None,
+                limit=_int_arg(args.get("limit")) or 100,
+                cursor=args.get("cursor") or None,
+                filters={
+                    "networking": args.get("networking") or None,
+                    "memory_min": _int_arg(args.get("memory_min")),
+                    "memory_max": _int_arg(args.get("memory_max")),
+                    "has_rw": _bool_arg(args.get("has_rw"))
+                }
+            )
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        files = [{
+            "name": entry["name"],
+            "filename": entry["filename"],
+            "size": entry["size"],
+            "modified": entry["modified"],
+            "memory_mb": entry["memory_mb"],
+            "networking": entry["networking"],
+            "has_rw": entry["has_rw"]
+        } for entry in page["items"]]
+
+        return jsonify({
+            "success": True,
+            "files": files,
+            "total": page["total"],
+            "next_cursor": page["next_cursor"],
+            "sort": page["sort"],
+            "order": page["order"]
+        })
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/events', methods=['GET'])
+def events():
+    """Server-Sent Events stream of workspace, launch and validation events"""
+    ensure_watcher()
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    subscription = EVENT_BUS.subscribe(last_event_id)
+
+    def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                pending = subscription.wait(timeout=15.0)
+                if not pending:
+                    yield ": keepalive\n\n"
+                for event in pending:
+                    yield format_sse(event)
+        finally:
+            EVENT_BUS.unsubscribe(subscription)
+
+    return Response(stream_with_context(stream()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route('/api/configs/bulk-get', methods=['POST'])
+def bulk_get_configs():
+    """Fetch many parsed configurations in one request.
+
+    Takes either {"names": [...]} or {"filter": {...}} (same filters as
+    /api/configs) and streams a JSON document or JSON lines ("format": "jsonl").
+    """
+    try:
+        data = request.json or {}
+        names = data.get("names")
+        output_format = data.get("format", "json")
+
+        if output_format not in ("json", "jsonl"):
+            return jsonify({"success": False, "error": "Format must be 'json' or 'jsonl'"}), 400
+
+        if names is None:
+            try:
+                filters = data.get("filter") or {}
+                names = WORKSPACE_INDEX.select(
+                    filters={
+                        "networking": filters.get("networking"),
+                        "memory_min": filters.get("memory_min"),
+                        "memory_max": filters.get("memory_max"),
+                        "has_rw": filters.get("has_rw")
+                    },
+                    sort=data.get("sort", "name"),
+                    order=data.get("order")
+                )
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+        elif not isinstance(names, list):
+            return jsonify({"success": False, "error": "names must be a list"}), 400
+
+        if len(names) > BULK_GET_LIMIT:
+            return jsonify({"success": False, "error": f"At most {BULK_GET_LIMIT} configurations per request"}), 400
+
+        try:
+            entries = WORKSPACE_INDEX.load_many(names)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        missing = [name for name in names if entries.get(name) is None]
+
+        def result(name):
+            entry = entries.get(name)
+            if entry is None:
+                return {"name": name, "error": "Configuration not found"}
+            if "error" in entry["config"]:
+                return {"name": name, "error": entry["config"]["error"]}
+            return entry["config"]
+
+        def stream_json():
+            yield '{"success": true, "missing": ' + json.dumps(missing) + ', "configs": ['
+            first = True
+            for name in names:
+                if entries.get(name) is None:
+                    continue
+                yield ("" if first else ", ") + json.dumps(result(name))
+                first = False
+            yield ']}'
+
+        def stream_jsonl():
+            for name in names:
+                yield json.dumps(result(name)) + "\n"
+
+        if output_format == "jsonl":
+            return Response(stream_jsonl(), mimetype="application/x-ndjson")
+        return Response(stream_json(), mimetype="application/json")
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -145,11 +473,11 @@ def list_configs():
 def get_config(name):
     """Get configuration details"""
     try:
-        file_path = WORKSPACE / f"{name}.wsb"
-        if not file_path.exists():
+        entry = WORKSPACE_INDEX.load(name) if valid_config_name(name) else None
+        if entry is None:
             return jsonify({"success": False, "error": "Configuration not found"}), 404
 
-        config = parse_wsb_file(file_path)
+        config = entry["config"]
         if "error" in config:
             return jsonify({"success": False, "error": config["error"]}), 500
 
@@ -167,6 +495,8 @@ def create_config():
 
         if not name:
             return jsonify({"success": False, "error": "Name is required"}), 400
+        if not valid_config_name(name):
+            return jsonify({"success": False, "error": f"Invalid configuration name: '{name}'"}), 400
 
         # Validate memory
         memory_mb = int(data.get("memory_mb", 4096))
@@ -187,11 +517,12 @@ def create_config():
         )
 
         # Save file
-        file_path = WORKSPACE / f"{name}.wsb"
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
+        if not save_config_file(name, xml_content):
+            return jsonify({"success": True, "changed": False,
+                            "message": f"Configuration '{name}' is unchanged"})
 
-        return jsonify({"success": True, "message": f"Configuration '{name}' created successfully"})
+        return jsonify({"success": True, "changed": True,
+                        "message": f"Configuration '{name}' created successfully"})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -211,12 +542,6 @@ def update_config(name):
         if memory_mb < MIN_MEMORY_MB or memory_mb > MAX_MEMORY_MB:
             return jsonify({"success": False, "error": f"Memory must be between {MIN_MEMORY_MB} and {MAX_MEMORY_MB} MB"}), 400
 
-        # Create backup
-        backup_path = file_path.with_suffix(".wsb.bak")
-        if file_path.exists():
-            import shutil
-            shutil.copy2(file_path, backup_path)
-
         # Create XML
         xml_content = create_wsb_xml(
             memory_mb=memory_mb,
@@ -230,11 +555,13 @@ def update_config(name):
             mapped_folders=data.get("mapped_folders", [])
         )
 
-        # Save file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
+        # Save file (with a backup), unless nothing changed
+        if not save_config_file(name, xml_content, backup=True):
+            return jsonify({"success": True, "changed": False,
+                            "message": f"Configuration '{name}' is unchanged"})
 
-        return jsonify({"success": True, "message": f"Configuration '{name}' updated successfully"})
+        return jsonify({"success": True, "changed": True,
+                        "message": f"Configuration '{name}' updated successfully"})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -248,6 +575,7 @@ def delete_config(name):
             return jsonify({"success": False, "error": "Configuration not found"}), 404
 
         file_path.unlink()
+        WORKSPACE_INDEX.discard(name)
         return jsonify({"success": True, "message": f"Configuration '{name}' deleted successfully"})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
@@ -266,45 +594,218 @@ def download_config(name):
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route('/api/profiles/quick', methods=['GET'])
+def quick_launch_profiles():
+    """Find profiles by partial name, description, tag or hotkey, best match first"""
+    query = request.args.get('q', '')
+    try:
+        limit = _int_arg(request.args.get('limit')) or 10
+    except ValueError:
+        return jsonify({"success": False, "error": "limit must be an integer"}), 400
+
+    try:
+        with _profiles_lock:
+            PROFILE_MANAGER.refresh()
+            results = PROFILE_MANAGER.quick_launch(query, limit=max(1, min(limit, 100)))
+            profiles = [dict(result["profile"], match=result["match"], frecency=result["frecency"])
+                        for result in results]
+        return jsonify({"success": True, "query": query, "profiles": profiles})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @app.route('/api/templates', methods=['GET'])
 def list_templates():
-    """List available templates"""
+    """List available templates with their summaries"""
     try:
-        templates = []
-        for file_path in TEMPLATES_DIR.glob("*.wsb"):
-            templates.append({
-                "name": file_path.stem,
-                "filename": file_path.name
-            })
-        return jsonify({"success": True, "templates": templates})
+        TEMPLATE_CATALOG.refresh()
+        # The serialized listing is reused until the catalog changes
+        if _templates_response["version"] != TEMPLATE_CATALOG.version:
+            count_cache("templates_response", misses=1)
+            _templates_response["body"] = json.dumps(
+                {"success": True, "templates": TEMPLATE_CATALOG.summaries()})
+            _templates_response["version"] = TEMPLATE_CATALOG.version
+        else:
+            count_cache("templates_response", hits=1)
+        return Response(_templates_response["body"], mimetype="application/json")
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
-@app.route('/api/template/<name>/apply', methods=['POST'])
-def apply_template(name):
-    """Apply template to create new configuration"""
+@app.route('/api/template/<name>', methods=['GET'])
+def get_template(name):
+    """Get a template's summary and full configuration"""
     try:
-        template_path = TEMPLATES_DIR / f"{name}.wsb"
-        if not template_path.exists():
+        summary = TEMPLATE_CATALOG.get_summary(name)
+        if summary is None:
             return jsonify({"success": False, "error": "Template not found"}), 404
 
-        data = request.json
+        return jsonify({"success": True, "template": summary, "config": TEMPLATE_CATALOG.get(name)})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/template/<name>/apply', methods=['POST'])
+def apply_template(name):
+    """Create a new configuration from a template plus optional overrides"""
+    try:
+        data = request.json or {}
         new_name = data.get("new_name", "").strip()
+        dry_run = bool(data.get("dry_run", False))
 
-        if not new_name:
+        if not new_name and not dry_run:
             return jsonify({"success": False, "error": "New name is required"}), 400
+        if new_name and not valid_config_name(new_name):
+            return jsonify({"success": False, "error": f"Invalid configuration name: '{new_name}'"}), 400
+
+        overrides = data.get("overrides") or {}
+        try:
+            config = TEMPLATE_CATALOG.render(name, overrides)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        if config is None:
+            return jsonify({"success": False, "error": "Template not found"}), 404
+        if "error" in config:
+            return jsonify({"success": False, "error": config["error"]}), 500
+
+        error = validate_config(config)
+        if error:
+            return jsonify({"success": False, "error": error}), 400
+
+        xml_content = TEMPLATE_CATALOG.render_wsb(name, overrides)
 
-        # Copy template to workspace
-        dest_path = WORKSPACE / f"{new_name}.wsb"
-        import shutil
-        shutil.copy2(template_path, dest_path)
+        if dry_run:
+            return jsonify({"success": True, "config": config, "xml": xml_content})
 
-        return jsonify({"success": True, "message": f"Template '{name}' applied as '{new_name}'"})
+        if data.get("overlay"):
+            success, message = OVERLAYS.add(new_name, template=name, overrides=overrides)
+            if not success:
+                return jsonify({"success": False, "error": message}), 400
+            report = OVERLAYS.materialize(WORKSPACE, [new_name])
+            if report["errors"]:
+                return jsonify({"success": False, "error": report["errors"][new_name]}), 500
+            WORKSPACE_INDEX.touch(new_name)
+            return jsonify({"success": True, "changed": bool(report["written"]), "message": message})
+
+        if not save_config_file(new_name, xml_content):
+            return jsonify({"success": True, "changed": False,
+                            "message": f"Configuration '{new_name}' already matches template '{name}'"})
+
+        return jsonify({"success": True, "changed": True,
+                        "message": f"Template '{name}' applied as '{new_name}'"})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/dedupe', methods=['GET'])
+def dedupe_report():
+    """Duplicate and near-duplicate clusters in the workspace"""
+    try:
+        try:
+            max_diff = _int_arg(request.args.get('max_diff'))
+            min_size = _int_arg(request.args.get('min_size'))
+            started = time.perf_counter()
+            models, errors = load_models(WORKSPACE)
+            report = analyze(models, errors,
+                             max_differences=1 if max_diff is None else max_diff,
+                             min_size=2 if min_size is None else min_size)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        return jsonify(dict(report, success=True))
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@app.route('/api/dedupe/convert', methods=['POST'])
+def dedupe_convert():
+    """Write a cluster as a template plus overrides under <workspace>/dedupe"""
+    try:
+        data = request.json or {}
+        cluster_id = data.get("cluster")
+        if not cluster_id:
+            return jsonify({"success": False, "error": "Cluster id is required"}), 400
+        name = data.get("name")
+        if name is not None and not valid_config_name(name):
+            return jsonify({"success": False, "error": f"Invalid template name: '{name}'"}), 400
+
+        models, errors = load_models(WORKSPACE)
+        try:
+            report = analyze(models, errors, max_differences=int(data.get("max_diff", 1)),
+                             min_size=int(data.get("min_size", 2)))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        cluster = next((c for c in report["clusters"] if c["id"] == cluster_id), None)
+        if cluster is None:
+            return jsonify({"success": False, "error": "Cluster not found"}), 404
+
+        if not cluster["convertible"]:
+            return jsonify({"success": False, "error": f"Cluster {cluster_id} is not convertible: "
+                                                       f"it varies in {', '.join(cluster['varies'])}"}), 400
+
+        success, message = convert_cluster(cluster, models, WORKSPACE / "dedupe", name)
+        return jsonify({"success": success, "message": message}), 200 if success else 500
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/overlays', methods=['GET'])
+def list_overlays():
+    """List configurations stored as a template plus overrides"""
+    try:
+        overlays = [OVERLAYS.get(name) for name in OVERLAYS.names()]
+        return jsonify({"success": True, "overlays": overlays, "errors": OVERLAYS.errors})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/overlay/<name>', methods=['GET'])
+def get_overlay(name):
+    """Get an overlay's base and overrides, and the .wsb it renders to"""
+    try:
+        OVERLAYS.refresh()
+        overlay = OVERLAYS.get(name)
+        if overlay is None:
+            return jsonify({"success": False, "error": "Overlay not found"}), 404
+        try:
+            xml_content = render_xml(OVERLAYS.resolve(name))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        return jsonify({"success": True, "overlay": overlay, "xml": xml_content})
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/api/overlays/materialize', methods=['POST'])
+def materialize_overlays():
+    """Write .wsb files for overlays whose template or overrides changed"""
+    try:
+        data = request.json or {}
+        names = data.get("names")
+        if names is not None and not isinstance(names, list):
+            return jsonify({"success": False, "error": "names must be a list"}), 400
+        report = OVERLAYS.materialize(WORKSPACE, names, bool(data.get("force", False)))
+        for name in report["written"]:
+            WORKSPACE_INDEX.touch(name)
+        return jsonify(dict(report, success=not report["errors"]))
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Metrics in the Prometheus text format (?format=json for a JSON summary)"""
+    WORKSPACE_CONFIGS.set(len(WORKSPACE_INDEX))
+    EVENT_SUBSCRIBERS.set(EVENT_BUS.subscriber_count)
+    with _profiles_lock:
+        PROFILE_COUNT.set(len(PROFILE_MANAGER.data["profiles"]))
+
+    if request.args.get("format") == "json":
+        return jsonify(REGISTRY.snapshot())
+    return Response(REGISTRY.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
 if __name__ == '__main__':
     print("╔════════════════════════════════════════════════════════════╗")
     print("║          Sandman Web UI - Starting Server...              ║")
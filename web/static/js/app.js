@@ -35,15 +35,58 @@ function showNotification(message, type = 'info') {
     }, 3000);
 }
 
-// Load configurations
+// Configuration list paging state
+const CONFIGS_PAGE_SIZE = 100;
+let configsCursor = null;
+
+// Build the /api/configs query from the list controls
+function configsQuery(cursor) {
+    const params = new URLSearchParams({ limit: CONFIGS_PAGE_SIZE });
+    const sort = document.getElementById('configs-sort').value;
+    const networking = document.getElementById('configs-networking').value;
+    const hasRw = document.getElementById('configs-has-rw').value;
+
+    params.set('sort', sort);
+    if (networking) params.set('networking', networking);
+    if (hasRw) params.set('has_rw', hasRw);
+    if (cursor) params.set('cursor', cursor);
+
+    return `/api/configs?${params.toString()}`;
+}
+
+// Render configuration cards
+function renderConfigCards(files) {
+    return files.map(file => `
+            <div class="config-card">
+                <h3>📋 ${file.name}</h3>
+                <div class="meta">📅 Modified: ${new Date(file.modified).toLocaleString()}</div>
+                <div class="meta">📊 Size: ${formatBytes(file.size)}</div>
+                <div class="actions">
+                    <button class="btn btn-primary btn-small" onclick="viewConfig('${file.name}')">👁️ View</button>
+                    <button class="btn btn-success btn-small" onclick="downloadConfig('${file.name}')">⬇️ Download</button>
+                    <button class="btn btn-danger btn-small" onclick="deleteConfig('${file.name}')">🗑️ Delete</button>
+                </div>
+            </div>
+        `).join('');
+}
+
+// Update the total count and "Load More" button
+function updateConfigsPaging(data) {
+    configsCursor = data.next_cursor;
+    document.getElementById('configs-total').textContent = `${data.total} total`;
+    document.getElementById('configs-load-more').style.display = configsCursor ? 'inline-block' : 'none';
+}
+
+// Load configurations (first page)
 async function loadConfigs() {
     try {
-        const response = await fetch('/api/configs');
+        const response = await fetch(configsQuery(null));
         const data = await response.json();
 
         const container = document.getElementById('configs-list');
 
         if (!data.success || data.files.length === 0) {
+            updateConfigsPaging({ total: data.total || 0, next_cursor: null });
             container.innerHTML = `
                 <div class="empty-state">
                     <h3>No configurations yet</h3>
@@ -56,18 +99,30 @@ async function loadConfigs() {
             return;
         }
 
-        container.innerHTML = data.files.map(file => `
-            <div class="config-card">
-                <h3>📋 ${file.name}</h3>
-                <div class="meta">📅 Modified: ${new Date(file.modified).toLocaleString()}</div>
-                <div class="meta">📊 Size: ${formatBytes(file.size)}</div>
-                <div class="actions">
-                    <button class="btn btn-primary btn-small" onclick="viewConfig('${file.name}')">👁️ View</button>
-                    <button class="btn btn-success btn-small" onclick="downloadConfig('${file.name}')">⬇️ Download</button>
-                    <button class="btn btn-danger btn-small" onclick="deleteConfig('${file.name}')">🗑️ Delete</button>
-                </div>
-            </div>
-        `).join('');
+        container.innerHTML = renderConfigCards(data.files);
+        updateConfigsPaging(data);
+    } catch (error) {
+        showNotification('Failed to load configurations: ' + error.message, 'error');
+    }
+}
+
+// Load the next page of configurations
+async function loadMoreConfigs() {
+    if (!configsCursor) {
+        return;
+    }
+
+    try {
+        const response = await fetch(configsQuery(configsCursor));
+        const data = await response.json();
+
+        if (!data.success) {
+            showNotification('Failed to load configurations: ' + data.error, 'error');
+            return;
+        }
+
+        document.getElementById('configs-list').insertAdjacentHTML('beforeend', renderConfigCards(data.files));
+        updateConfigsPaging(data);
     } catch (error) {
         showNotification('Failed to load configurations: ' + error.message, 'error');
     }
@@ -247,9 +302,12 @@ async function loadTemplates() {
 
         container.innerHTML = data.templates.map(template => {
             const icon = icons[template.name.toLowerCase()] || icons.default;
+            const folders = template.mapped_folders || [];
             return `
                 <div class="template-card">
                     <h3>${icon} ${template.name}</h3>
+                    <p>${template.description || ''}</p>
+                    <div class="meta">💾 ${template.memory_mb} MB | 🌐 ${template.networking === 'Disable' ? 'No network' : 'Network'} | 📁 ${folders.length} folder(s)</div>
                     <button class="btn btn-secondary" onclick="applyTemplate('${template.name}')">
                         ✨ Use Template
                     </button>
@@ -269,11 +327,18 @@ async function applyTemplate(templateName) {
         return;
     }
 
+    // Optional override; leave blank to keep the template's memory
+    const overrides = {};
+    const memory = prompt('Memory in MB (leave blank to keep the template value):');
+    if (memory && memory.trim()) {
+        overrides.memory_mb = parseInt(memory.trim());
+    }
+
     try {
         const response = await fetch(`/api/template/${templateName}/apply`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ new_name: newName.trim() })
+            body: JSON.stringify({ new_name: newName.trim(), overrides })
         });
 
         const data = await response.json();
@@ -296,7 +361,51 @@ function formatBytes(bytes) {
     return (bytes / (1024 * 1024)).toFixed(1) + ' MB';
 }
 
+// Live workspace updates
+let configsReloadTimer = null;
+
+// Reload the configuration list once a burst of change events settles
+function scheduleConfigsReload() {
+    if (!document.getElementById('configs-tab').classList.contains('active')) {
+        return;
+    }
+    clearTimeout(configsReloadTimer);
+    configsReloadTimer = setTimeout(loadConfigs, 500);
+}
+
+function connectEvents() {
+    if (!window.EventSource) {
+        return;
+    }
+
+    // EventSource reconnects on its own and resumes with Last-Event-ID
+    const source = new EventSource('/api/events');
+
+    ['config.created', 'config.updated', 'config.deleted', 'resync'].forEach(type => {
+        source.addEventListener(type, scheduleConfigsReload);
+    });
+
+    source.addEventListener('launch', (e) => {
+        const event = JSON.parse(e.data);
+        if (event.success) {
+            showNotification(`🚀 Launched ${event.profile || event.name}`, 'success');
+        } else {
+            showNotification(`Failed to launch ${event.name}: ${event.error || 'unknown error'}`, 'error');
+        }
+    });
+
+    source.addEventListener('validation', (e) => {
+        const event = JSON.parse(e.data);
+        if (event.valid) {
+            showNotification(`✓ ${event.name} is valid`, 'success');
+        } else {
+            showNotification(`✗ ${event.name}: ${event.errors.length} validation error(s)`, 'error');
+        }
+    });
+}
+
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
     loadConfigs();
+    connectEvents();
 });
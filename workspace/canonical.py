@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Sandman Canonical Configurations
+
+A canonical form and content hash for .wsb files, built on the normalized
+model in workspace/model.py: whitespace, comments, element order, boolean
+case and settings written out at their defaults do not change the hash.
+Writers use it to skip writes (and backups) whose content would not change
+the configuration.
+"""
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from workspace.model import SETTINGS, load_model, parse_model
+
+
+_SETTING_KEYS = [key for _, key, _ in SETTINGS]
+_encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+def canonical_form(model: Dict) -> bytes:
+    """Serialize a configuration model deterministically: settings in
+    SETTINGS order, folders sorted by HostFolder, other elements by name"""
+    settings, folders = model["settings"], model["folders"]
+    return _encode([
+        [settings[key] for key in _SETTING_KEYS],
+        [[folders[key]["path"], folders[key]["sandbox_folder"], folders[key]["readonly"]]
+         for key in sorted(folders)],
+        model["logon_command"],
+        sorted(model["other"].items())
+    ]).encode("utf-8")
+
+
+def content_hash(data: Union[bytes, str]) -> Optional[str]:
+    """SHA-256 of the canonical form of .wsb content, or None if it does not parse"""
+    try:
+        return hashlib.sha256(canonical_form(parse_model(data))).hexdigest()
+    except ValueError:
+        return None
+
+
+def file_hash(path: Union[Path, str]) -> Optional[str]:
+    """SHA-256 of the canonical form of a .wsb file, or None if it is missing or invalid"""
+    try:
+        return hashlib.sha256(canonical_form(load_model(path))).hexdigest()
+    except (ValueError, OSError):
+        return None
+
+
+def write_wsb(path: Path, content: str, backup_path: Optional[Path] = None,
+              current_hash: Optional[str] = None, new_hash: Optional[str] = None) -> bool:
+    """Write a .wsb file unless it already holds an equivalent configuration.
+
+    current_hash is the existing file's hash when the caller already knows
+    it (e.g. from the workspace index); otherwise the file is read. new_hash
+    likewise saves re-parsing content when the caller rendered it from a
+    model. The backup is taken only when the file is actually rewritten.
+    Returns True if the file was written.
+    """
+    path = Path(path)
+    if path.exists():
+        existing = current_hash if current_hash is not None else file_hash(path)
+        if existing is not None and existing == (new_hash or content_hash(content)):
+            return False
+        if backup_path is not None:
+            shutil.copy2(path, backup_path)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
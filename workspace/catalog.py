@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Sandman Template Catalog
+
+Loads and parses the .wsb templates once, keeps summaries in memory and
+reloads only the templates that changed on disk.
+"""
+
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from metrics.registry import count_cache
+from workspace.model import load_model, render_xml
+from workspace.overlay import apply_overrides, check_overrides
+
+
+def read_comments(file_path: Path) -> List[str]:
+    """Return the text of every XML comment in a file, in document order"""
+    try:
+        parser = ET.XMLParser(target=ET.TreeBuilder(insert_comments=True))
+        root = ET.parse(file_path, parser=parser).getroot()
+    except (ET.ParseError, OSError):
+        return []
+
+    comments = []
+    for elem in root.iter():
+        if elem.tag is ET.Comment and elem.text and elem.text.strip():
+            comments.append(" ".join(elem.text.split()))
+    return comments
+
+
+class TemplateCatalog:
+    """In-memory catalog of the templates directory"""
+
+    def __init__(self, templates_dir: Path, parser: Callable[[Path], Dict],
+                 refresh_interval: float = 5.0):
+        """Initialize and load the catalog"""
+        self.templates_dir = Path(templates_dir)
+        self.parser = parser
+        self.refresh_interval = refresh_interval
+        self.version = 0
+
+        self._templates: Dict[str, Dict] = {}
+        self._summaries: List[Dict] = []
+        self._lock = threading.Lock()
+        self._last_refresh = None
+
+        self.refresh(force=True)
+
+    def _load(self, path: Path, stat: os.stat_result) -> Dict:
+        """Parse a template and build its summary"""
+        config = self.parser(path)
+        comments = read_comments(path)
+        try:
+            model = load_model(path)
+        except (ValueError, OSError):
+            model = None
+
+        summary = {
+            "name": path.stem,
+            "filename": path.name,
+            "description": comments[0] if comments else "",
+            "comments": comments
+        }
+        if "error" in config:
+            summary["error"] = config["error"]
+        else:
+            summary.update({
+                "memory_mb": config["memory_mb"],
+                "networking": config["networking"],
+                "vgpu": config["vgpu"],
+                "protected_client": config["protected_client"],
+                "mapped_folders": config["mapped_folders"]
+            })
+
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                "config": config, "model": model, "summary": summary}
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload templates that changed; returns True if anything changed.
+
+        Unless forced, the directory is checked at most once every
+        refresh_interval seconds, so per-request calls are cheap.
+        """
+        now = time.monotonic()
+        if (not force and self._last_refresh is not None
+                and now - self._last_refresh < self.refresh_interval):
+            return False
+
+        with self._lock:
+            self._last_refresh = now
+            changed = False
+            seen = set()
+            reloaded = 0
+
+            try:
+                scan = list(os.scandir(self.templates_dir))
+            except FileNotFoundError:
+                scan = []
+
+            for dir_entry in scan:
+                if not dir_entry.name.endswith(".wsb") or not dir_entry.is_file():
+                    continue
+
+                name = dir_entry.name[:-4]
+                stat = dir_entry.stat()
+                seen.add(name)
+
+                current = self._templates.get(name)
+                if (current is not None and current["mtime_ns"] == stat.st_mtime_ns
+                        and current["size"] == stat.st_size):
+                    continue
+
+                self._templates[name] = self._load(Path(dir_entry.path), stat)
+                reloaded += 1
+                changed = True
+
+            count_cache("template_catalog", hits=len(seen) - reloaded, misses=reloaded)
+
+            for name in list(self._templates):
+                if name not in seen:
+                    del self._templates[name]
+                    changed = True
+
+            if changed:
+                self._summaries = [self._templates[name]["summary"]
+                                   for name in sorted(self._templates, key=str.lower)]
+                self.version += 1
+
+            return changed
+
+    def summaries(self) -> List[Dict]:
+        """Get the summaries of all templates, sorted by name"""
+        self.refresh()
+        return self._summaries
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Get the parsed configuration of a template"""
+        self.refresh()
+        template = self._templates.get(name)
+        return template["config"] if template else None
+
+    def get_summary(self, name: str) -> Optional[Dict]:
+        """Get the summary of a template"""
+        self.refresh()
+        template = self._templates.get(name)
+        return template["summary"] if template else None
+
+    @staticmethod
+    def _check_overrides(overrides: Optional[Dict]) -> Dict:
+        overrides = overrides or {}
+        error = check_overrides(overrides)
+        if error is None and "extends" in overrides:
+            error = "Unknown override keys: extends"
+        if error:
+            raise ValueError(error)
+        return overrides
+
+    def render(self, name: str, overrides: Optional[Dict] = None) -> Optional[Dict]:
+        """Get a template's configuration with overrides applied.
+
+        Override keys are the overlay keys (see workspace/overlay.py);
+        raises ValueError for unknown keys or malformed values.
+        """
+        overrides = self._check_overrides(overrides)
+        config = self.get(name)
+        if config is None or "error" in config:
+            return config
+
+        rendered = dict(config)
+        rendered["mapped_folders"] = [dict(folder) for folder in config["mapped_folders"]]
+        for key, value in overrides.items():
+            if value is not None or key == "logon_command":
+                rendered[key] = value
+        return rendered
+
+    def render_wsb(self, name: str, overrides: Optional[Dict] = None) -> Optional[str]:
+        """Get a template's .wsb XML with overrides applied.
+
+        Rendered from the template's full model, so elements the parsed
+        configuration does not carry (LogonCommand, SandboxFolder, ...)
+        are kept. None if the template is missing or does not parse.
+        """
+        overrides = self._check_overrides(overrides)
+        self.refresh()
+        template = self._templates.get(name)
+        if template is None or template["model"] is None:
+            return None
+        return render_xml(apply_overrides(template["model"], overrides))
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Sandman Duplicate Detection
+
+Finds configurations in a workspace that are copies of each other:
+
+- Exact duplicates share the canonical form from workspace/canonical.py
+  (same sandbox, however the files are formatted).
+- Near duplicates differ in at most max_differences features, where a
+  feature is one setting value, one mapped folder (with its access mode),
+  the logon command or another element. They are found by hashing every
+  configuration under its feature set with up to max_differences features
+  removed: two configurations land in a shared bucket exactly when one
+  substitution, addition or removal turns one into the other. The most
+  copied configurations become cluster centres and take over the unclaimed
+  members of their buckets, so every member is within max_differences of
+  its centre and each bucket is visited once: the analysis is linear in the
+  number of configurations rather than comparing every pair.
+
+Clusters can be converted into a template (the majority value of every
+feature) plus per-configuration overrides in the form TemplateCatalog.render
+accepts. Overrides cannot express elements outside the model's settings,
+mapped folders and logon command, so clusters whose members differ in such
+an element are reported as not convertible.
+
+Usage:
+    python workspace/dedupe.py
+    python workspace/dedupe.py --max-diff 2 --json
+    python workspace/dedupe.py --convert all --out C:\\Temp\\dedupe
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from functools import reduce
+from itertools import combinations
+from operator import xor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from workspace.canonical import canonical_form
+from workspace.index import valid_config_name
+from workspace.model import SETTINGS, parse_model, render_xml
+from workspace.overlay import OVERRIDE_KEYS, apply_overrides
+
+
+DEFAULT_MAX_DIFFERENCES = 1
+MAX_DIFFERENCES_LIMIT = 3
+DEFAULT_MIN_SIZE = 2
+
+
+def features(model: Dict) -> frozenset:
+    """The configuration as a set of feature tuples; the first item of each
+    names the part of the configuration it describes"""
+    tokens = list(model["settings"].items())
+    tokens += [("mapped_folders", key, folder["sandbox_folder"], folder["readonly"])
+               for key, folder in model["folders"].items()]
+    if model["logon_command"] is not None:
+        tokens.append(("logon_command", model["logon_command"]))
+    tokens += model["other"].items()
+    return frozenset(tokens)
+
+
+def load_models(workspace: Path) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """Parse every .wsb file in a workspace; returns (models, errors by name)"""
+    models, errors = {}, {}
+    try:
+        scan = list(os.scandir(workspace))
+    except FileNotFoundError:
+        scan = []
+
+    for entry in scan:
+        if not entry.name.endswith(".wsb") or not entry.is_file():
+            continue
+        name = entry.name[:-4]
+        try:
+            with open(entry.path, 'rb') as f:
+                models[name] = parse_model(f.read())
+        except (ValueError, OSError) as e:
+            errors[name] = str(e)
+    return models, errors
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    union = len(a | b)
+    return len(a & b) / union if union else 1.0
+
+
+def exact_groups(models: Dict[str, Dict]) -> Dict[bytes, List[str]]:
+    """Canonical form -> names of the configurations that have it"""
+    groups: Dict[bytes, List[str]] = {}
+    for name in sorted(models):
+        groups.setdefault(canonical_form(models[name]), []).append(name)
+    return groups
+
+
+def find_clusters(models: Dict[str, Dict], max_differences: int = DEFAULT_MAX_DIFFERENCES,
+                  min_size: int = DEFAULT_MIN_SIZE,
+                  groups: Optional[Dict[bytes, List[str]]] = None) -> List[Dict]:
+    """Group configurations into exact and near-duplicate clusters, largest first"""
+    if not 0 <= max_differences <= MAX_DIFFERENCES_LIMIT:
+        raise ValueError(f"max_differences must be between 0 and {MAX_DIFFERENCES_LIMIT}")
+
+    # Exact duplicates: one representative per canonical form
+    if groups is None:
+        groups = exact_groups(models)
+    forms = list(groups)
+    reps = list(groups.values())
+    token_sets = [features(models[members[0]]) for members in reps]
+
+    # Near duplicates: bucket each representative under the XOR of its token
+    # hashes with every combination of up to max_differences tokens removed
+    keys_by_rep: List[set] = []
+    buckets: Dict[int, List[int]] = {}
+    for index, tokens in enumerate(token_sets):
+        hashes = list(map(hash, tokens))
+        total = reduce(xor, hashes, 0)
+        keys = {total}
+        if max_differences:
+            keys.update([total ^ value for value in hashes])
+        for removed in range(2, min(max_differences, len(hashes)) + 1):
+            keys.update([reduce(xor, combo, total) for combo in combinations(hashes, removed)])
+        keys_by_rep.append(keys)
+        for key in keys:
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [index]
+            else:
+                bucket.append(index)
+
+    # Centres: most copies first, then most neighbours
+    degree = [sum(map(len, map(buckets.__getitem__, keys))) for keys in keys_by_rep]
+    order = sorted(range(len(reps)), key=lambda index: (-len(reps[index]), -degree[index]))
+    limit = 2 * max_differences
+    centre_of = [-1] * len(reps)
+    clustered = []
+    for centre in order:
+        if centre_of[centre] != -1:
+            continue
+        centre_of[centre] = centre
+        indexes = [centre]
+        for key in keys_by_rep[centre]:
+            # Every member of a bucket is within max_differences of the centre,
+            # so the whole bucket is claimed and never needs visiting again
+            for index in buckets.pop(key, ()):
+                # Distinct sets can share an XOR by coincidence; check first
+                if (centre_of[index] == -1
+                        and len(token_sets[index] ^ token_sets[centre]) <= limit):
+                    centre_of[index] = centre
+                    indexes.append(index)
+        clustered.append(indexes)
+
+    clusters = []
+    for indexes in clustered:
+        size = sum(len(reps[index]) for index in indexes)
+        if size < min_size:
+            continue
+        members = sorted(name for index in indexes for name in reps[index])
+
+        varies = set()
+        common = frozenset.intersection(*(token_sets[index] for index in indexes))
+        for index in indexes:
+            varies.update(token[0] for token in token_sets[index] - common)
+        centre = token_sets[indexes[0]]
+
+        clusters.append({
+            "id": "c-" + hashlib.sha1("\n".join(members).encode("utf-8")).hexdigest()[:10],
+            "size": size,
+            "exact": len(indexes) == 1,
+            "centre": reps[indexes[0]][0],
+            "members": members,
+            "groups": [{"hash": hashlib.sha256(forms[index]).hexdigest(), "members": reps[index]}
+                       for index in indexes],
+            "varies": sorted(varies),
+            "convertible": varies <= OVERRIDE_KEYS,
+            "min_similarity": round(min(_jaccard(centre, token_sets[index]) for index in indexes), 3)
+        })
+
+    clusters.sort(key=lambda cluster: (-cluster["size"], cluster["members"][0]))
+    return clusters
+
+
+def analyze(models: Dict[str, Dict], errors: Optional[Dict[str, str]] = None,
+            max_differences: int = DEFAULT_MAX_DIFFERENCES,
+            min_size: int = DEFAULT_MIN_SIZE) -> Dict:
+    """Report the duplicate clusters among parsed configurations"""
+    started = time.perf_counter()
+    groups = exact_groups(models)
+    clusters = find_clusters(models, max_differences, min_size, groups=groups)
+
+    unique = len(groups)
+    return {
+        "configs": len(models),
+        "unique": unique,
+        "exact_duplicates": len(models) - unique,
+        "clustered": sum(cluster["size"] for cluster in clusters),
+        "clusters": clusters,
+        "errors": errors or {},
+        "max_differences": max_differences,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
+
+
+# ----------------------------------------------------------------------
+# Template + overrides
+# ----------------------------------------------------------------------
+
+def _majority(values: List, total: int, required: bool = True):
+    """Most common value; unless required, only if more than half have it"""
+    value, count = Counter(values).most_common(1)[0]
+    return value if required or count * 2 > total else None
+
+
+def _config_folder(folder: Dict) -> Dict:
+    result = {"path": folder["path"], "readonly": folder["readonly"]}
+    if folder["sandbox_folder"]:
+        result["sandbox_folder"] = folder["sandbox_folder"]
+    return result
+
+
+def cluster_template(models: List[Dict]) -> Dict:
+    """Base model for a cluster: the majority value of every feature"""
+    total = len(models)
+    base = {
+        "settings": {key: _majority([model["settings"][key] for model in models], total)
+                     for _, key, _ in SETTINGS},
+        "folders": {},
+        "logon_command": _majority([model["logon_command"] for model in models], total),
+        "other": {}
+    }
+
+    folder_counts = Counter(key for model in models for key in model["folders"])
+    for key, count in folder_counts.items():
+        if count * 2 > total:
+            variants = [tuple(sorted(model["folders"][key].items()))
+                        for model in models if key in model["folders"]]
+            base["folders"][key] = dict(_majority(variants, len(variants)))
+
+    element_counts = Counter(element for model in models for element in model["other"])
+    for element, count in element_counts.items():
+        if count * 2 > total:
+            base["other"][element] = _majority(
+                [model["other"][element] for model in models if element in model["other"]], count)
+    return base
+
+
+def overrides_for(model: Dict, base: Dict) -> Dict:
+    """Overrides that turn the base template into this configuration"""
+    overrides = {key: model["settings"][key] for _, key, _ in SETTINGS
+                 if model["settings"][key] != base["settings"][key]}
+    if model["folders"] != base["folders"]:
+        overrides["mapped_folders"] = [_config_folder(folder) for folder in model["folders"].values()]
+    if model["logon_command"] != base["logon_command"]:
+        overrides["logon_command"] = model["logon_command"]
+    return overrides
+
+
+def template_name(cluster: Dict) -> str:
+    """Default template name: the members' common name prefix (without
+    trailing numbers) plus a short cluster id, e.g. secure-sandbox-2b9cde"""
+    prefix = os.path.commonprefix(cluster["members"]).rstrip("0123456789-_ .")
+    return f"{prefix or 'cluster'}-{cluster['id'][2:8]}"
+
+
+def convert_cluster(cluster: Dict, models: Dict[str, Dict], out_dir: Path,
+                    name: Optional[str] = None) -> Tuple[bool, str]:
+    """Write a cluster as <template>.wsb plus <template>.overrides.json.
+
+    The overrides file maps each member to the keys that differ from the
+    template. The original files are left in place. Nothing is written
+    unless template plus overrides reproduces every member.
+    """
+    members = cluster["members"]
+    missing = [member for member in members if member not in models]
+    if missing:
+        return False, f"Configurations not found: {', '.join(missing[:5])}"
+
+    name = name or template_name(cluster)
+    if not valid_config_name(name):
+        return False, f"Invalid template name: '{name}'"
+    base = cluster_template([models[member] for member in members])
+    overrides = {member: overrides_for(models[member], base) for member in members}
+
+    lossy = [member for member in members
+             if features(apply_overrides(base, overrides[member])) != features(models[member])]
+    if lossy:
+        parts = sorted(set(cluster["varies"]) - OVERRIDE_KEYS)
+        return False, (f"{cluster['id']} is not convertible: overrides cannot express "
+                       f"{', '.join(parts) or 'its differences'} ({', '.join(lossy[:5])})")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / f"{name}.wsb", 'w', encoding='utf-8') as f:
+        f.write(render_xml(base))
+    with open(out_dir / f"{name}.overrides.json", 'w', encoding='utf-8') as f:
+        json.dump({"template": name, "configs": overrides}, f, indent=2)
+
+    overridden = sum(1 for value in overrides.values() if value)
+    return True, (f"{name}: {len(members)} configurations, {overridden} with overrides "
+                  f"({out_dir / (name + '.wsb')})")
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+
+def default_workspace() -> Path:
+    """The workspace the CLI uses when none is given"""
+    return Path(os.path.expandvars("%USERPROFILE%\\Documents\\wsb-files"))
+
+
+def print_report(report: Dict, limit: int):
+    print(f"🔍 {report['configs']} configurations analyzed in {report['seconds']}s")
+    print(f"  Unique:           {report['unique']}")
+    print(f"  Exact duplicates: {report['exact_duplicates']}")
+    print(f"  In clusters:      {report['clustered']} "
+          f"({len(report['clusters'])} clusters, up to {report['max_differences']} difference(s))")
+    for name, error in sorted(report["errors"].items()):
+        print(f"  ✗ {name}: {error}")
+
+    for cluster in report["clusters"][:limit]:
+        kind = "exact" if cluster["exact"] else f"near, similarity ≥ {cluster['min_similarity']}"
+        print(f"\n{cluster['id']}  {cluster['size']} configurations ({kind})")
+        if cluster["varies"]:
+            print(f"  varies: {', '.join(cluster['varies'])}"
+                  + ("" if cluster["convertible"] else " (not convertible)"))
+        shown = cluster["members"][:8]
+        more = len(cluster["members"]) - len(shown)
+        print(f"  {', '.join(shown)}" + (f" (+{more} more)" if more else ""))
+
+    if len(report["clusters"]) > limit:
+        print(f"\n… {len(report['clusters']) - limit} more clusters (use --limit or --json)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point (also used by `sandman dedupe`)"""
+    parser = argparse.ArgumentParser(prog="sandman.py dedupe",
+                                     description="Find duplicate and near-duplicate configurations")
+    parser.add_argument("--workspace", help="workspace directory (default: Documents\\wsb-files)")
+    parser.add_argument("--max-diff", type=int, default=DEFAULT_MAX_DIFFERENCES,
+                        help=f"features that may differ within a cluster (default {DEFAULT_MAX_DIFFERENCES}, "
+                             "0 for exact duplicates only)")
+    parser.add_argument("--min-size", type=int, default=DEFAULT_MIN_SIZE,
+                        help=f"smallest cluster to report (default {DEFAULT_MIN_SIZE})")
+    parser.add_argument("--limit", type=int, default=20, help="clusters to print (default 20)")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    parser.add_argument("--convert", metavar="ID",
+                        help="write a template plus overrides for a cluster id, or 'all'")
+    parser.add_argument("--out", help="directory for converted templates (default: <workspace>/dedupe)")
+    args = parser.parse_args(argv)
+
+    workspace = Path(args.workspace) if args.workspace else default_workspace()
+    started = time.perf_counter()
+    models, errors = load_models(workspace)
+    try:
+        report = analyze(models, errors, args.max_diff, args.min_size)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 2
+    report["seconds"] = round(time.perf_counter() - started, 3)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, max(0, args.limit))
+
+    if args.convert:
+        stream = sys.stderr if args.json else sys.stdout
+        if args.convert == "all":
+            clusters = [cluster for cluster in report["clusters"] if cluster["convertible"]]
+            skipped = len(report["clusters"]) - len(clusters)
+            if skipped:
+                print(f"⚠ Skipping {skipped} clusters that are not convertible", file=stream)
+        else:
+            clusters = [cluster for cluster in report["clusters"] if cluster["id"] == args.convert]
+            if not clusters:
+                print(f"✗ Cluster '{args.convert}' not found", file=stream)
+                return 1
+        out_dir = Path(args.out) if args.out else workspace / "dedupe"
+        for cluster in clusters:
+            success, message = convert_cluster(cluster, models, out_dir)
+            print(f"{'✓' if success else '✗'} {message}", file=stream)
+            if not success:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Sandman Workspace Events
+
+In-process event bus with per-subscriber bounded buffers and replay from an
+event id, plus a small append-only journal so other Sandman processes (the
+CLI, profile launcher) can publish launch and validation events to the web UI.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+JOURNAL_FILENAME = "events.jsonl"
+JOURNAL_MAX_BYTES = 1024 * 1024
+
+
+def format_sse(event: Tuple[Optional[int], str, str]) -> str:
+    """Format an (id, type, json data) event as a Server-Sent Events message"""
+    event_id, event_type, payload = event
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {payload}")
+    return "\n".join(lines) + "\n\n"
+
+
+def record_event(workspace, event_type: str, data: Dict) -> bool:
+    """Append an event to the workspace journal (used by other processes).
+
+    The journal is rotated to events.jsonl.1 once it grows past
+    JOURNAL_MAX_BYTES. Failures are ignored: events are best-effort.
+    """
+    journal = Path(workspace) / JOURNAL_FILENAME
+    line = json.dumps({
+        "type": event_type,
+        "timestamp": datetime.now().isoformat(),
+        "pid": os.getpid(),
+        "data": data
+    }) + "\n"
+
+    try:
+        if journal.exists() and journal.stat().st_size > JOURNAL_MAX_BYTES:
+            os.replace(journal, journal.with_name(JOURNAL_FILENAME + ".1"))
+        # Binary append keeps byte offsets exact for readers on every platform
+        with open(journal, 'ab') as f:
+            f.write(line.encode('utf-8'))
+        return True
+    except OSError:
+        return False
+
+
+class Subscription:
+    """A single client's bounded event buffer"""
+
+    def __init__(self, buffer_size: int):
+        self.buffer = deque(maxlen=buffer_size)
+        self.condition = threading.Condition()
+        self.overflowed = False
+        self.closed = False
+
+    def push(self, event: Tuple[Optional[int], str, str]):
+        """Queue an event, dropping the oldest one if the buffer is full"""
+        with self.condition:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.overflowed = True
+            self.buffer.append(event)
+            self.condition.notify()
+
+    def wait(self, timeout: float = 15.0) -> List[Tuple[Optional[int], str, str]]:
+        """Wait for events and drain the buffer.
+
+        If events were dropped because the client fell behind, a "resync"
+        event is returned first so the client knows to reload its state.
+        """
+        with self.condition:
+            if not self.buffer and not self.closed:
+                self.condition.wait(timeout)
+
+            events = list(self.buffer)
+            self.buffer.clear()
+            if self.overflowed:
+                self.overflowed = False
+                # No id: the client resumes from its last delivered event
+                events.insert(0, (None, "resync", json.dumps({"reason": "buffer_overflow"})))
+            return events
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+
+class EventBus:
+    """Fan out events to subscribers and keep a short replay history"""
+
+    def __init__(self, history_size: int = 1000, buffer_size: int = 256):
+        self.history = deque(maxlen=history_size)
+        self.buffer_size = buffer_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        # Ids start at the current time in ms so ids from a previous server
+        # process are always older than anything in this process' history
+        self._next_id = int(time.time() * 1000)
+
+    def publish(self, event_type: str, data: Dict) -> int:
+        """Publish an event to all subscribers; returns the event id"""
+        payload = json.dumps(data)
+        with self._lock:
+            self._next_id += 1
+            event = (self._next_id, event_type, payload)
+            self.history.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            subscription.push(event)
+        return event[0]
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        """Subscribe, replaying history after last_event_id if given"""
+        subscription = Subscription(self.buffer_size)
+
+        with self._lock:
+            self._subscribers.add(subscription)
+
+            if last_event_id:
+                try:
+                    last_id = int(last_event_id)
+                except ValueError:
+                    last_id = None
+
+                oldest = self.history[0][0] if self.history else self._next_id + 1
+                if last_id is None or last_id < oldest - 1:
+                    # Missed events are no longer in history
+                    subscription.push((self._next_id, "resync",
+                                       json.dumps({"reason": "history_expired"})))
+                else:
+                    for event in self.history:
+                        if event[0] > last_id:
+                            subscription.push(event)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+        subscription.close()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+class WorkspaceWatcher(threading.Thread):
+    """Poll the workspace and journal, publishing changes to an EventBus.
+
+    One watcher serves every connected client, so the cost of watching the
+    filesystem does not grow with the number of open dashboards.
+    """
+
+    def __init__(self, index, bus: EventBus, interval: float = 1.0):
+        super().__init__(name="sandman-workspace-watcher", daemon=True)
+        self.index = index
+        self.bus = bus
+        self.interval = interval
+        self.journal = Path(index.workspace) / JOURNAL_FILENAME
+        self._journal_id = self._file_id(self.journal)
+        self._journal_offset = self._journal_size()
+        self._stop_event = threading.Event()
+        index.add_listener(self._on_index_change)
+
+    def _journal_size(self) -> int:
+        try:
+            return self.journal.stat().st_size
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _file_id(path: Path) -> Optional[Tuple[int, int]]:
+        """(device, inode) of a file, to notice when it is replaced"""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def _on_index_change(self, change: str, name: str):
+        """Publish created/updated/deleted events for changed .wsb files.
+
+        The index reports every change it sees, whether found by this
+        watcher's rescan, a request-triggered refresh or a route's touch().
+        """
+        data = {"name": name}
+        entry = self.index.peek(name) if change != "deleted" else None
+        if entry:
+            data.update({"size": entry["size"], "modified": entry["modified"]})
+        self.bus.publish(f"config.{change}", data)
+
+    def poll_index(self):
+        """Rescan the workspace for changes made outside this process"""
+        self.index.refresh(force=True)
+
+    def poll_journal(self):
+        """Publish new journal lines written by other processes"""
+        lines = []
+        journal_id = self._file_id(self.journal)
+        if journal_id != self._journal_id:
+            # The journal was rotated: finish the old file, now
+            # events.jsonl.1, then start from the beginning of the new one
+            rotated = self.journal.with_name(JOURNAL_FILENAME + ".1")
+            if self._journal_id is not None and self._file_id(rotated) == self._journal_id:
+                lines, _ = self._read_lines(rotated, self._journal_offset, complete=False)
+            self._journal_id = journal_id
+            self._journal_offset = 0
+        elif self._journal_size() < self._journal_offset:
+            # Truncated in place
+            self._journal_offset = 0
+
+        if journal_id is not None and self._journal_size() > self._journal_offset:
+            new_lines, self._journal_offset = self._read_lines(self.journal, self._journal_offset)
+            lines += new_lines
+
+        for line in lines:
+            try:
+                record = json.loads(line.decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+            # Valid JSON that is not an event record is skipped the same way
+            if not isinstance(record, dict) or not isinstance(record.get("data") or {}, dict):
+                continue
+            data = dict(record.get("data") or {})
+            data["timestamp"] = record.get("timestamp")
+            self.bus.publish(record.get("type", "message"), data)
+
+    @staticmethod
+    def _read_lines(path: Path, offset: int, complete: bool = True) -> Tuple[List[bytes], int]:
+        """Lines of a file from offset to EOF, and the offset after them.
+
+        With complete=True a partially written last line is left for the
+        next poll; a rotated file is no longer written, so it is read whole.
+        """
+        try:
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                lines = f.readlines()
+        except OSError:
+            return [], offset
+        if complete and lines and not lines[-1].endswith(b"\n"):
+            lines.pop()
+        return lines, offset + sum(len(line) for line in lines)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.poll_index()
+                self.poll_journal()
+            except Exception:
+                # Keep watching; a bad file must not kill the feed
+                continue
+
+    def stop(self):
+        self._stop_event.set()
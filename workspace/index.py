@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Sandman Workspace Index
+
+In-memory index of the .wsb files in a workspace. Keeps file metadata and
+parsed configuration summaries so listings, sorting and filtering can be
+served without globbing and re-parsing the workspace on every request.
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics.registry import count_cache
+from workspace.canonical import file_hash
+
+
+# Characters Windows does not allow in file names
+INVALID_NAME_CHARS = '\\/:*?"<>|'
+
+SORT_KEYS = ["name", "mtime", "size", "memory"]
+DEFAULT_ORDER = {"name": "asc", "mtime": "desc", "size": "desc", "memory": "desc"}
+# Type of the sort value a cursor carries, per sort key
+CURSOR_TYPES = {"name": (str,), "mtime": (int, float), "size": (int,), "memory": (int,)}
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+def valid_config_name(name) -> bool:
+    """Whether name can be a configuration in the workspace: a non-empty
+    string that is not a path (no separators, not "." or "..")"""
+    return (isinstance(name, str) and bool(name.strip()) and name not in (".", "..")
+            and not any(c in name for c in INVALID_NAME_CHARS))
+
+
+def _summarize(config: Dict) -> Dict:
+    """Extract the filterable fields from a parsed configuration"""
+    if not config or "error" in config:
+        return {"memory_mb": None, "networking": None, "has_rw": None}
+
+    return {
+        "memory_mb": config.get("memory_mb"),
+        "networking": config.get("networking"),
+        "has_rw": any(not folder.get("readonly", True)
+                      for folder in config.get("mapped_folders", []))
+    }
+
+
+class _PackedEntry(dict):
+    """Index entry seeded from a pack: the parsed configuration and the
+    formatted mtime are only computed when something asks for them"""
+
+    def __init__(self, values: Dict, parse: Callable[[str], Dict]):
+        super().__init__(values)
+        self._parse = parse
+
+    def __missing__(self, key):
+        if key == "config":
+            value = self._parse(self["filename"])
+        elif key == "modified":
+            value = datetime.fromtimestamp(self["mtime"]).isoformat()
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
+
+
+def encode_cursor(sort: str, order: str, value, name: str) -> str:
+    """Encode a keyset cursor pointing just after (value, name)"""
+    raw = json.dumps([sort, order, value, name], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, order: str) -> Tuple:
+    """Decode a keyset cursor, checking it belongs to the same sort/order"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        c_sort, c_order, value, name = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+    if c_sort != sort or c_order != order:
+        raise ValueError("Cursor does not match the requested sort order")
+    if (not isinstance(value, CURSOR_TYPES[sort]) or isinstance(value, bool)
+            or not isinstance(name, str)):
+        raise ValueError("Invalid cursor")
+
+    return value, name
+
+
+class WorkspaceIndex:
+    """Cached view of the .wsb files in a workspace"""
+
+    def __init__(self, workspace: Path, parser: Callable[[Path], Dict],
+                 refresh_interval: float = 2.0, max_workers: int = 8):
+        """Initialize the index (files are scanned lazily on first use)"""
+        self.workspace = Path(workspace)
+        self.parser = parser
+        self.refresh_interval = refresh_interval
+        self.max_workers = max_workers
+
+        self._entries: Dict[str, Dict] = {}
+        self._sorted: Dict[str, List[Tuple]] = {}
+        self._lock = threading.RLock()
+        self._last_refresh = None
+        self._listeners: List[Callable[[str, str], None]] = []
+
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """Call callback(change, name) for every change the index sees"""
+        self._listeners.append(callback)
+
+    def _notify(self, changes: List[Tuple[str, str]]):
+        for change, name in changes:
+            for callback in self._listeners:
+                callback(change, name)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _build_entries(self, stale: List[Tuple[Path, os.stat_result]]) -> List[Dict]:
+        """Parse files into index entries, concurrently when there are several"""
+        paths = [path for path, _ in stale]
+        if len(paths) > 1 and self.max_workers > 1:
+            # Imported here: it is slow to import and most CLI calls never need it
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(paths))) as pool:
+                configs = list(pool.map(self.parser, paths))
+        else:
+            configs = [self.parser(path) for path in paths]
+
+        return [self._build_entry(path, stat, config)
+                for (path, stat), config in zip(stale, configs)]
+
+    def _build_entry(self, path: Path, stat: os.stat_result, config: Dict) -> Dict:
+        """Build an index entry from a file's stat and parsed configuration"""
+        entry = {
+            "name": path.stem,
+            "filename": path.name,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "mtime_ns": stat.st_mtime_ns,
+            "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            "config": config
+        }
+        entry.update(_summarize(config))
+        return entry
+
+    def refresh(self, force: bool = False) -> List[Tuple[str, str]]:
+        """Rescan the workspace, re-parsing only files whose stat changed.
+
+        Returns a list of (change, name) tuples where change is one of
+        "created", "updated" or "deleted".
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (not force and self._last_refresh is not None
+                    and now - self._last_refresh < self.refresh_interval):
+                return []
+
+            changes = []
+            seen = set()
+            stale = []
+
+            try:
+                scan = list(os.scandir(self.workspace))
+            except FileNotFoundError:
+                scan = []
+
+            for dir_entry in scan:
+                if not dir_entry.name.endswith(".wsb") or not dir_entry.is_file():
+                    continue
+
+                stat = dir_entry.stat()
+                name = dir_entry.name[:-4]
+                seen.add(name)
+
+                if not self._is_current(name, stat):
+                    stale.append((Path(dir_entry.path), stat))
+
+            for entry in self._build_entries(stale):
+                existed = entry["name"] in self._entries
+                self._entries[entry["name"]] = entry
+                changes.append(("updated" if existed else "created", entry["name"]))
+
+            for name in list(self._entries):
+                if name not in seen:
+                    del self._entries[name]
+                    changes.append(("deleted", name))
+
+            if changes:
+                self._sorted = {}
+            self._last_refresh = now
+
+        self._notify(changes)
+        return changes
+
+    def _is_current(self, name: str, stat: os.stat_result) -> bool:
+        """Check whether the indexed entry still matches the file's stat"""
+        current = self._entries.get(name)
+        return (current is not None and current["mtime_ns"] == stat.st_mtime_ns
+                and current["size"] == stat.st_size)
+
+    def touch(self, name: str) -> Optional[str]:
+        """Re-index a single file after it was written; returns the change type"""
+        path = self.workspace / f"{name}.wsb"
+        with self._lock:
+            existed = name in self._entries
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return self.discard(name)
+
+            self._entries[name] = self._build_entries([(path, stat)])[0]
+            self._sorted = {}
+            change = "updated" if existed else "created"
+
+        self._notify([(change, name)])
+        return change
+
+    def discard(self, name: str) -> Optional[str]:
+        """Drop a file from the index after it was deleted"""
+        with self._lock:
+            if self._entries.pop(name, None) is None:
+                return None
+            self._sorted = {}
+
+        self._notify([("deleted", name)])
+        return "deleted"
+
+    def load_pack(self, pack_path: Path) -> int:
+        """Seed the index from a workspace pack (see workspace/pack.py).
+
+        Entries come from the pack's index records, so no file is read or
+        parsed: configurations are parsed on first use, and the content
+        hashes come from the pack. The next refresh, due after
+        refresh_interval, checks them against the workspace and re-parses
+        only the files whose size or mtime differ from the pack. Returns
+        the number of entries loaded.
+        """
+        from workspace.pack import PackReader
+
+        parser, workspace = self.parser, self.workspace
+
+        def parse(filename: str) -> Dict:
+            return parser(workspace / filename)
+
+        entries = {}
+        with PackReader(pack_path) as pack:
+            for name, size, mtime_ns, memory_mb, networking, has_rw, content_hash in pack.summaries():
+                entries[name] = _PackedEntry({
+                    "name": name,
+                    "filename": f"{name}.wsb",
+                    "size": size,
+                    "mtime": mtime_ns / 1e9,
+                    "mtime_ns": mtime_ns,
+                    "memory_mb": memory_mb,
+                    "networking": networking,
+                    "has_rw": has_rw,
+                    "content_hash": content_hash
+                }, parse)
+
+        with self._lock:
+            self._entries = entries
+            self._sorted = {}
+            self._last_refresh = time.monotonic()
+        return len(entries)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Get the index entry for a configuration"""
+        self.refresh()
+        return self._entries.get(name)
+
+    def load_many(self, names: List[str]) -> Dict[str, Optional[Dict]]:
+        """Get up-to-date entries for specific configurations.
+
+        Each file is stat'ed; entries whose file changed since it was indexed
+        are re-parsed concurrently. Missing files map to None. Raises
+        ValueError if a name is not a valid configuration name.
+        """
+        invalid = [name for name in names if not valid_config_name(name)]
+        if invalid:
+            raise ValueError(f"Invalid configuration names: {', '.join(map(repr, invalid))}")
+
+        results = {}
+        changes = []
+
+        with self._lock:
+            stale = []
+            stale_names = []
+            missing = 0
+            for name in names:
+                path = self.workspace / f"{name}.wsb"
+                try:
+                    stat = path.stat()
+                except (FileNotFoundError, OSError):
+                    missing += 1
+                    results[name] = None
+                    if self._entries.pop(name, None) is not None:
+                        changes.append(("deleted", name))
+                    continue
+
+                if self._is_current(name, stat):
+                    results[name] = self._entries[name]
+                elif name not in results:
+                    results[name] = None
+                    stale.append((path, stat))
+                    stale_names.append(name)
+
+            count_cache("workspace_index", hits=len(names) - len(stale) - missing, misses=len(stale))
+
+            for name, entry in zip(stale_names, self._build_entries(stale)):
+                existed = name in self._entries
+                self._entries[name] = entry
+                results[name] = entry
+                changes.append(("updated" if existed else "created", name))
+
+            if changes:
+                self._sorted = {}
+
+        self._notify(changes)
+        return results
+
+    def load(self, name: str) -> Optional[Dict]:
+        """Get an up-to-date entry for one configuration (None if missing)"""
+        return self.load_many([name])[name]
+
+    def content_hash(self, name: str) -> Optional[str]:
+        """Canonical content hash of a configuration (see workspace/canonical.py).
+
+        Computed on first use and kept with the entry, which is replaced when
+        the file changes. None if the file is missing or does not parse.
+        """
+        entry = self.load(name)
+        if entry is None:
+            return None
+        if "content_hash" not in entry:
+            entry["content_hash"] = file_hash(self.workspace / entry["filename"])
+        return entry["content_hash"]
+
+    def select(self, filters: Optional[Dict] = None, sort: str = "name",
+               order: Optional[str] = None) -> List[str]:
+        """Get the names of all entries matching filters, in sort order"""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Invalid sort key: {sort} (allowed: {', '.join(SORT_KEYS)})")
+        order = order or DEFAULT_ORDER[sort]
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Invalid order: {order} (allowed: asc, desc)")
+        filters = {k: v for k, v in (filters or {}).items() if v is not None}
+
+        self.refresh()
+        with self._lock:
+            keys = self._sorted_keys(sort)
+            if order == "desc":
+                keys = reversed(keys)
+            return [name for _, name in keys
+                    if not filters or self._matches(self._entries[name], filters)]
+
+    def peek(self, name: str) -> Optional[Dict]:
+        """Get the index entry for a configuration without refreshing"""
+        return self._entries.get(name)
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._entries)
+
+    @staticmethod
+    def _sort_value(entry: Dict, sort: str):
+        if sort == "name":
+            return entry["name"].lower()
+        if sort == "mtime":
+            return entry["mtime"]
+        if sort == "size":
+            return entry["size"]
+        memory = entry.get("memory_mb")
+        return memory if memory is not None else -1
+
+    def _sorted_keys(self, sort: str) -> List[Tuple]:
+        """Get (value, name) keys for a sort field, rebuilding after changes"""
+        keys = self._sorted.get(sort)
+        if keys is None:
+            keys = sorted((self._sort_value(entry, sort), name)
+                          for name, entry in self._entries.items())
+            self._sorted[sort] = keys
+        return keys
+
+    @staticmethod
+    def _matches(entry: Dict, filters: Dict) -> bool:
+        """Check an entry against parsed-field filters"""
+        networking = filters.get("networking")
+        if networking and entry.get("networking") != networking:
+            return False
+
+        memory = entry.get("memory_mb")
+        if filters.get("memory_min") is not None:
+            if memory is None or memory < filters["memory_min"]:
+                return False
+        if filters.get("memory_max") is not None:
+            if memory is None or memory > filters["memory_max"]:
+                return False
+
+        has_rw = filters.get("has_rw")
+        if has_rw is not None and entry.get("has_rw") is not has_rw:
+            return False
+
+        return True
+
+    def query(self, sort: str = "mtime", order: Optional[str] = None,
+              limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None,
+              filters: Optional[Dict] = None) -> Dict:
+        """Return one page of entries using keyset pagination.
+
+        The cursor encodes the (sort value, name) of the last entry on the
+        previous page, so pages stay stable while files are added or removed.
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Invalid sort key: {sort} (allowed: {', '.join(SORT_KEYS)})")
+        order = order or DEFAULT_ORDER[sort]
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Invalid order: {order} (allowed: asc, desc)")
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        filters = {k: v for k, v in (filters or {}).items() if v is not None}
+
+        self.refresh()
+        with self._lock:
+            keys = self._sorted_keys(sort)
+
+            if cursor:
+                after = tuple(decode_cursor(cursor, sort, order))
+                if order == "asc":
+                    start = bisect_right(keys, after)
+                else:
+                    start = bisect_left(keys, after) - 1
+            else:
+                start = 0 if order == "asc" else len(keys) - 1
+
+            step = 1 if order == "asc" else -1
+            items = []
+            position = start
+            while 0 <= position < len(keys) and len(items) < limit:
+                entry = self._entries[keys[position][1]]
+                if not filters or self._matches(entry, filters):
+                    items.append(entry)
+                position += step
+
+            has_more = False
+            while 0 <= position < len(keys):
+                if not filters or self._matches(self._entries[keys[position][1]], filters):
+                    has_more = True
+                    break
+                position += step
+
+            if filters:
+                total = sum(1 for entry in self._entries.values() if self._matches(entry, filters))
+            else:
+                total = len(self._entries)
+
+            next_cursor = None
+            if has_more and items:
+                last = items[-1]
+                next_cursor = encode_cursor(sort, order, self._sort_value(last, sort), last["name"])
+
+            return {
+                "items": items,
+                "total": total,
+                "next_cursor": next_cursor,
+                "sort": sort,
+                "order": order
+            }
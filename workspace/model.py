@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Sandman Configuration Model
+
+Parses a .wsb file into a normalized model for comparing configurations:
+whitespace and comments are ignored, missing settings take their Windows
+Sandbox defaults, and mapped folders are keyed by HostFolder, so two files
+that configure the same sandbox produce the same model however they are
+formatted or ordered.
+"""
+
+import xml.dom.minidom as minidom
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from xml.sax.saxutils import escape, quoteattr
+
+
+# (element, configuration key, default) for the single-value settings, in
+# the order the .wsb writer emits them
+SETTINGS: List[Tuple[str, str, object]] = [
+    ("Networking", "networking", "Default"),
+    ("VGpu", "vgpu", "Default"),
+    ("MemoryInMB", "memory_mb", 4096),
+    ("AudioInput", "audio_input", "Default"),
+    ("VideoInput", "video_input", "Default"),
+    ("PrinterRedirection", "printer_redirection", "Enable"),
+    ("ClipboardRedirection", "clipboard_redirection", "Enable"),
+    ("ProtectedClient", "protected_client", "Enable"),
+]
+
+SETTING_ELEMENTS = {element: (key, default) for element, key, default in SETTINGS}
+STRUCTURED_ELEMENTS = {"MappedFolders", "LogonCommand"}
+
+
+def _text(elem: Optional[ET.Element]) -> Optional[str]:
+    if elem is None or elem.text is None:
+        return None
+    return elem.text.strip()
+
+
+def folder_key(host_folder: str) -> str:
+    """Identity of a mapped folder: Windows paths are case-insensitive and
+    the separator and trailing slash are not significant"""
+    path = host_folder.strip().replace("/", "\\")
+    if len(path) > 3:
+        path = path.rstrip("\\")
+    return path.casefold()
+
+
+def _canonical(elem: ET.Element) -> str:
+    """Whitespace-insensitive serialization of an element we do not model"""
+    attrs = "".join(f" {name}={quoteattr(value)}" for name, value in sorted(elem.attrib.items()))
+    children = "".join(_canonical(child) for child in elem if isinstance(child.tag, str))
+    return f"<{elem.tag}{attrs}>{escape((elem.text or '').strip())}{children}</{elem.tag}>"
+
+
+def _parse_folders(elem: ET.Element, folders: Dict[str, Dict]):
+    for folder in elem:
+        if folder.tag != "MappedFolder":
+            continue
+        host_folder = _text(folder.find("HostFolder"))
+        if not host_folder:
+            continue
+        read_only = _text(folder.find("ReadOnly"))
+        # A repeated HostFolder is the same mapping; the last one wins
+        folders[folder_key(host_folder)] = {
+            "path": host_folder,
+            "sandbox_folder": _text(folder.find("SandboxFolder")),
+            "readonly": read_only.lower() == "true" if read_only is not None else True
+        }
+
+
+def model_from_root(root: ET.Element) -> Dict:
+    """Build the model from a parsed <Configuration> element.
+
+    Returns {"settings": {key: value}, "folders": {folder_key: folder},
+    "logon_command": str or None, "other": {element: canonical XML}}.
+    """
+    settings = {key: default for _, key, default in SETTINGS}
+    folders: Dict[str, Dict] = {}
+    logon_command = None
+    other: Dict[str, str] = {}
+
+    for elem in root:
+        if not isinstance(elem.tag, str):
+            continue
+        setting = SETTING_ELEMENTS.get(elem.tag)
+        if setting:
+            key, default = setting
+            value = _text(elem)
+            if value is None or value == "":
+                value = default
+            elif key == "memory_mb":
+                try:
+                    value = int(value)
+                except ValueError:
+                    pass
+            settings[key] = value
+        elif elem.tag == "MappedFolders":
+            _parse_folders(elem, folders)
+        elif elem.tag == "LogonCommand":
+            logon_command = _text(elem.find("Command"))
+        else:
+            other[elem.tag] = _canonical(elem)
+
+    return {"settings": settings, "folders": folders,
+            "logon_command": logon_command, "other": other}
+
+
+def parse_model(data: Union[bytes, str]) -> Dict:
+    """Parse .wsb XML text into a model; raises ValueError if it is not valid XML"""
+    try:
+        return model_from_root(ET.fromstring(data))
+    except ET.ParseError as e:
+        raise ValueError(f"XML parsing error: {e}")
+
+
+def load_model(path: Union[Path, str]) -> Dict:
+    """Parse a .wsb file into a model; raises ValueError if it is not valid XML"""
+    try:
+        return model_from_root(ET.parse(path).getroot())
+    except ET.ParseError as e:
+        raise ValueError(f"XML parsing error: {e}")
+
+
+def render_xml(model: Dict) -> str:
+    """Write a model back out as a .wsb document"""
+    doc = ET.Element("Configuration")
+    for element, key, _ in SETTINGS:
+        ET.SubElement(doc, element).text = str(model["settings"][key])
+
+    if model["folders"]:
+        mapped_folders = ET.SubElement(doc, "MappedFolders")
+        for folder in model["folders"].values():
+            mapped_folder = ET.SubElement(mapped_folders, "MappedFolder")
+            ET.SubElement(mapped_folder, "HostFolder").text = folder["path"]
+            if folder["sandbox_folder"]:
+                ET.SubElement(mapped_folder, "SandboxFolder").text = folder["sandbox_folder"]
+            ET.SubElement(mapped_folder, "ReadOnly").text = "true" if folder["readonly"] else "false"
+
+    if model["logon_command"] is not None:
+        logon = ET.SubElement(doc, "LogonCommand")
+        ET.SubElement(logon, "Command").text = model["logon_command"]
+
+    for canonical in model["other"].values():
+        doc.append(ET.fromstring(canonical))
+
+    return minidom.parseString(ET.tostring(doc, encoding="unicode")).toprettyxml(indent="  ")
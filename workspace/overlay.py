@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+"""
+Sandman Overlays
+
+Configurations stored as a base plus overrides instead of full copies. An
+overlay set is a JSON file in <workspace>/overlays, in the layout
+`dedupe --convert` writes:
+
+    {"template": "development-sandbox",
+     "configs": {"dev-alice": {"memory_mb": 8192},
+                 "dev-bob": {"extends": "dev-alice", "networking": "Disable"}}}
+
+Every config is based on the set's template (a .wsb file in the overlays
+directory or templates/), or on another overlay config named by "extends",
+so overlays can inherit from each other. Override keys are the ones
+TemplateCatalog.render accepts: the single-value settings (memory_mb,
+networking, ...), mapped_folders (replacing the base's folders) and
+logon_command (None removes it).
+
+OverlayResolver renders configs lazily and memoizes them. It records which
+configs depend on each base, so when a template or an overlay entry changes
+only the configs downstream of it are dropped from the cache. materialize()
+writes concrete .wsb files for launching and keeps a manifest of what each
+file was rendered from: configs whose inputs did not change are skipped
+without rendering, and configs whose result did not change (e.g. the
+template changed a setting they override) are not rewritten.
+
+Usage:
+    python workspace/overlay.py list
+    python workspace/overlay.py show dev-alice
+    python workspace/overlay.py add dev-carol --template development-sandbox --set memory_mb=8192
+    python workspace/overlay.py materialize [names...] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from metrics.registry import count_cache
+from workspace.canonical import canonical_form, write_wsb
+from workspace.index import valid_config_name
+from workspace.model import SETTINGS, folder_key, load_model, render_xml
+
+
+OVERLAY_SUFFIX = ".overrides.json"
+MANIFEST_NAME = ".materialized.json"
+
+SETTING_KEYS = {key for _, key, _ in SETTINGS}
+OVERRIDE_KEYS = SETTING_KEYS | {"mapped_folders", "logon_command"}
+
+# Values the enumerated settings accept (memory_mb takes a positive integer)
+SETTING_VALUES = {
+    "networking": ("Default", "Disable"),
+    "vgpu": ("Default", "Disable"),
+    "audio_input": ("Default", "Enable", "Disable"),
+    "video_input": ("Default", "Enable", "Disable"),
+    "printer_redirection": ("Enable", "Disable"),
+    "clipboard_redirection": ("Enable", "Disable"),
+    "protected_client": ("Enable", "Disable"),
+}
+
+TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
+
+
+def check_overrides(overrides) -> Optional[str]:
+    """Error message for an invalid overrides entry, or None"""
+    if not isinstance(overrides, dict):
+        return "Overrides must be an object"
+    unknown = sorted(set(overrides) - OVERRIDE_KEYS - {"extends"})
+    if unknown:
+        return f"Unknown override keys: {', '.join(unknown)}"
+    for key, allowed in SETTING_VALUES.items():
+        value = overrides.get(key)
+        if value is not None and value not in allowed:
+            return f"Invalid {key} value: {json.dumps(value)} (allowed: {', '.join(allowed)})"
+    memory_mb = overrides.get("memory_mb")
+    if memory_mb is not None and (isinstance(memory_mb, bool) or not isinstance(memory_mb, int)
+                                  or memory_mb <= 0):
+        return f"memory_mb must be a positive integer, got {json.dumps(memory_mb)}"
+    logon_command = overrides.get("logon_command")
+    if logon_command is not None and not isinstance(logon_command, str):
+        return "logon_command must be a string or null"
+    extends = overrides.get("extends")
+    if extends is not None and not isinstance(extends, str):
+        return "extends must be an overlay name"
+    folders = overrides.get("mapped_folders")
+    if folders is not None and (not isinstance(folders, list) or
+                                not all(_valid_folder(folder) for folder in folders)):
+        return ("mapped_folders must be a list of {path, readonly, sandbox_folder} "
+                "(path a non-empty string, readonly true or false)")
+    return None
+
+
+def _valid_folder(folder) -> bool:
+    return (isinstance(folder, dict) and isinstance(folder.get("path"), str) and bool(folder["path"])
+            and isinstance(folder.get("readonly", True), bool)
+            and isinstance(folder.get("sandbox_folder"), (str, type(None))))
+
+
+def apply_overrides(base: Dict, overrides: Dict) -> Dict:
+    """A model with overrides applied on top of base.
+
+    Parts that are not overridden are shared with base, so models returned
+    by the resolver must not be modified in place.
+    """
+    model = dict(base)
+    settings = {key: value for key, value in overrides.items()
+                if key in SETTING_KEYS and value is not None}
+    if settings:
+        model["settings"] = dict(base["settings"], **settings)
+    if overrides.get("mapped_folders") is not None:
+        model["folders"] = {
+            folder_key(folder["path"]): {"path": folder["path"],
+                                         "sandbox_folder": folder.get("sandbox_folder"),
+                                         "readonly": folder.get("readonly", True)}
+            for folder in overrides["mapped_folders"]
+        }
+    if "logon_command" in overrides:
+        model["logon_command"] = overrides["logon_command"]
+    return model
+
+
+def _input_key(base_key: str, overrides: Dict) -> str:
+    data = base_key + json.dumps(overrides, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _stat(path: Path) -> Optional[os.stat_result]:
+    try:
+        return path.stat()
+    except OSError:
+        return None
+
+
+class OverlayResolver:
+    """Memoized, dependency-tracked rendering of the overlay sets in a directory"""
+
+    def __init__(self, overlays_dir: Path, templates_dir: Path = TEMPLATES_DIR):
+        """Initialize and scan the overlay sets"""
+        self.overlays_dir = Path(overlays_dir)
+        self.templates_dir = Path(templates_dir)
+        self.errors: Dict[str, str] = {}
+
+        # overlay set file -> {"mtime_ns", "size", "names"}
+        self._sets: Dict[str, Dict] = {}
+        # config -> {"base", "extends", "overrides", "set"}
+        self._entries: Dict[str, Dict] = {}
+        # template -> {"path", "mtime_ns", "size", "model", "key"}
+        self._templates: Dict[str, Dict] = {}
+        # base name -> configs built on it
+        self._dependents: Dict[str, Set[str]] = defaultdict(set)
+        self._models: Dict[str, Dict] = {}
+        self._keys: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    # Change tracking
+    # ------------------------------------------------------------------
+
+    def _read_set(self, path: Path) -> Dict[str, Dict]:
+        """Parse an overlay set file into config -> entry"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not isinstance(data.get("configs"), dict):
+            raise ValueError("expected {\"template\": ..., \"configs\": {...}}")
+
+        template = data.get("template") or path.name[:-len(OVERLAY_SUFFIX)]
+        entries = {}
+        for name, overrides in data["configs"].items():
+            error = check_overrides(overrides)
+            if not valid_config_name(name):
+                error = "Invalid configuration name"
+            if error:
+                self.errors[name] = error
+                continue
+            self.errors.pop(name, None)
+            overrides = dict(overrides)
+            extends = overrides.pop("extends", None)
+            entries[name] = {"base": extends or template, "extends": bool(extends),
+                             "overrides": overrides, "set": path.name}
+        return entries
+
+    def _set_entry(self, name: str, entry: Optional[Dict]):
+        """Replace a config's entry, keeping the dependency graph in step"""
+        previous = self._entries.get(name)
+        if previous is not None:
+            self._dependents[previous["base"]].discard(name)
+        if entry is None:
+            self._entries.pop(name, None)
+        else:
+            self._entries[name] = entry
+            self._dependents[entry["base"]].add(name)
+
+    def _invalidate(self, names: Set[str]) -> Set[str]:
+        """Drop cached renders of these names and everything built on them"""
+        invalidated = set()
+        pending = list(names)
+        while pending:
+            name = pending.pop()
+            if name in invalidated:
+                continue
+            invalidated.add(name)
+            self._models.pop(name, None)
+            self._keys.pop(name, None)
+            pending.extend(self._dependents.get(name, ()))
+        return invalidated
+
+    def refresh(self) -> Set[str]:
+        """Reload overlay sets and templates that changed on disk.
+
+        Returns the configs whose cached render was invalidated: the
+        entries that changed and every config that inherits from them or
+        from a changed template.
+        """
+        with self._lock:
+            changed: Set[str] = set()
+            removed: Set[str] = set()
+
+            try:
+                scan = [entry for entry in os.scandir(self.overlays_dir)
+                        if entry.name.endswith(OVERLAY_SUFFIX) and entry.is_file()]
+            except FileNotFoundError:
+                scan = []
+
+            seen = set()
+            for dir_entry in scan:
+                seen.add(dir_entry.name)
+                stat = dir_entry.stat()
+                current = self._sets.get(dir_entry.name)
+                if (current is not None and current["mtime_ns"] == stat.st_mtime_ns
+                        and current["size"] == stat.st_size):
+                    continue
+
+                try:
+                    entries = self._read_set(Path(dir_entry.path))
+                except (ValueError, OSError) as e:
+                    # Keep serving the last good version of a broken file
+                    self.errors[dir_entry.name] = f"{e}"
+                    continue
+                self.errors.pop(dir_entry.name, None)
+
+                old_names = current["names"] if current else set()
+                for name in old_names - set(entries):
+                    self._set_entry(name, None)
+                    removed.add(name)
+                for name, entry in entries.items():
+                    existing = self._entries.get(name)
+                    if existing is not None and existing["set"] != dir_entry.name:
+                        self.errors[name] = f"also defined in {existing['set']}"
+                        continue
+                    if existing != entry:
+                        self._set_entry(name, entry)
+                        changed.add(name)
+                self._sets[dir_entry.name] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                                              "names": set(entries)}
+
+            for set_name in list(self._sets):
+                if set_name not in seen:
+                    for name in self._sets.pop(set_name)["names"]:
+                        if self._entries.get(name, {}).get("set") == set_name:
+                            self._set_entry(name, None)
+                            removed.add(name)
+
+            for name, template in list(self._templates.items()):
+                stat = _stat(template["path"])
+                if (stat is None or stat.st_mtime_ns != template["mtime_ns"]
+                        or stat.st_size != template["size"]):
+                    del self._templates[name]
+                    changed.add(name)
+
+            invalidated = self._invalidate(changed | removed)
+            return {name for name in invalidated if name in self._entries} | removed
+
+    # ------------------------------------------------------------------
+    # Resolution
+    # ------------------------------------------------------------------
+
+    def _template(self, name: str) -> Dict:
+        """Load a template, preferring one stored next to the overlay sets"""
+        template = self._templates.get(name)
+        if template is not None:
+            return template
+        if not valid_config_name(name):
+            raise ValueError(f"Invalid template name: '{name}'")
+
+        for directory in (self.overlays_dir, self.templates_dir):
+            path = directory / f"{name}.wsb"
+            stat = _stat(path)
+            if stat is None:
+                continue
+            try:
+                model = load_model(path)
+            except (ValueError, OSError) as e:
+                raise ValueError(f"Template '{name}': {e}")
+            template = {"path": path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                        "model": model, "key": hashlib.sha256(canonical_form(model)).hexdigest()}
+            self._templates[name] = template
+            return template
+        raise ValueError(f"Template '{name}' not found")
+
+    def _entry(self, name: str, chain: Tuple[str, ...]) -> Dict:
+        if name in chain:
+            raise ValueError(f"Inheritance cycle: {' → '.join(chain + (name,))}")
+        entry = self._entries.get(name)
+        if entry is None:
+            raise ValueError(f"Overlay '{name}' not found")
+        return entry
+
+    def _key(self, name: str, chain: Tuple[str, ...] = ()) -> str:
+        """Hash of everything a config is rendered from, without rendering it"""
+        key = self._keys.get(name)
+        if key is None:
+            entry = self._entry(name, chain)
+            if entry["extends"] and entry["base"] in self._entries:
+                base_key = self._key(entry["base"], chain + (name,))
+            else:
+                base_key = self._template(entry["base"])["key"]
+            key = self._keys[name] = _input_key(base_key, entry["overrides"])
+        return key
+
+    def _render(self, name: str, chain: Tuple[str, ...] = ()) -> Dict:
+        model = self._models.get(name)
+        if model is None:
+            entry = self._entry(name, chain)
+            if entry["extends"] and entry["base"] in self._entries:
+                base = self._render(entry["base"], chain + (name,))
+            else:
+                base = self._template(entry["base"])["model"]
+            model = self._models[name] = apply_overrides(base, entry["overrides"])
+        return model
+
+    def names(self) -> List[str]:
+        """All overlay configs, sorted by name"""
+        with self._lock:
+            return sorted(self._entries, key=str.lower)
+
+    def get(self, name: str) -> Optional[Dict]:
+        """A config's base and overrides as stored"""
+        with self._lock:
+            entry = self._entries.get(name)
+            return dict(entry, name=name) if entry else None
+
+    def resolve(self, name: str) -> Dict:
+        """The rendered model of a config; raises ValueError if it cannot be
+        rendered (unknown config or template, inheritance cycle)"""
+        with self._lock:
+            cached = name in self._models
+            model = self._render(name)
+            count_cache("overlay_render", hits=int(cached), misses=int(not cached))
+            return model
+
+    # ------------------------------------------------------------------
+    # Editing
+    # ------------------------------------------------------------------
+
+    def _write_set(self, set_name: str, template: str, configs: Dict[str, Dict]):
+        path = self.overlays_dir / set_name
+        if configs:
+            self.overlays_dir.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({"template": template, "configs": configs}, f, indent=2)
+            os.replace(tmp, path)
+        elif path.exists():
+            path.unlink()
+        # mtime granularity can hide a quick rewrite; always reload it
+        if set_name in self._sets:
+            self._sets[set_name]["mtime_ns"] = None
+
+    def _load_set_file(self, set_name: str) -> Tuple[str, Dict[str, Dict]]:
+        path = self.overlays_dir / set_name
+        if not path.exists():
+            return set_name[:-len(OVERLAY_SUFFIX)], {}
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data.get("template") or set_name[:-len(OVERLAY_SUFFIX)], data.get("configs", {})
+
+    def add(self, name: str, template: Optional[str] = None, extends: Optional[str] = None,
+            overrides: Optional[Dict] = None) -> Tuple[bool, str]:
+        """Store a config as a template (or another overlay) plus overrides.
+
+        Configs based on a template go into <template>.overrides.json;
+        configs that extend another overlay go into that overlay's set.
+        An existing config of the same name is replaced, unless that would
+        create an inheritance cycle.
+        """
+        if bool(template) == bool(extends):
+            return False, "Give either a template or an overlay to extend"
+        for value in (name, template or extends):
+            if not valid_config_name(value):
+                return False, f"Invalid name: '{value}'"
+        overrides = {key: value for key, value in (overrides or {}).items() if value is not None
+                     or key == "logon_command"}
+        error = check_overrides(overrides)
+        if error:
+            return False, error
+
+        with self._lock:
+            self.refresh()
+            if template:
+                try:
+                    self._template(template)
+                except ValueError as e:
+                    return False, str(e)
+                set_name = f"{template}{OVERLAY_SUFFIX}"
+            else:
+                # Walk up from the new parent; reaching name would close a cycle
+                chain = [name, extends]
+                parent = self._entries.get(extends)
+                ancestor = parent
+                while (chain[-1] != name and ancestor is not None and ancestor["extends"]
+                       and ancestor["base"] not in chain[1:]):
+                    chain.append(ancestor["base"])
+                    ancestor = self._entries.get(ancestor["base"])
+                if chain[-1] == name:
+                    return False, f"Inheritance cycle: {' → '.join(chain)}"
+                if parent is not None:
+                    set_name = parent["set"]
+                else:
+                    try:
+                        self._template(extends)
+                    except ValueError:
+                        return False, f"Overlay or template '{extends}' not found"
+                    set_name = f"{extends}{OVERLAY_SUFFIX}"
+                overrides = dict({"extends": extends}, **overrides)
+
+            try:
+                existing = self._entries.get(name)
+                if existing is not None and existing["set"] != set_name:
+                    old_template, old_configs = self._load_set_file(existing["set"])
+                    old_configs.pop(name, None)
+                    self._write_set(existing["set"], old_template, old_configs)
+
+                set_template, configs = self._load_set_file(set_name)
+                configs[name] = overrides
+                self._write_set(set_name, set_template, configs)
+            except (ValueError, OSError) as e:
+                return False, f"Error saving overlay: {e}"
+
+            self.refresh()
+            base = f"overlay '{extends}'" if extends else f"template '{template}'"
+            return True, f"Overlay '{name}' saved ({base} + {len(overrides) - bool(extends)} override(s))"
+
+    def remove(self, name: str) -> Tuple[bool, str]:
+        """Delete a config from its overlay set (materialized files are kept)"""
+        with self._lock:
+            self.refresh()
+            entry = self._entries.get(name)
+            if entry is None:
+                return False, f"Overlay '{name}' not found"
+            dependents = sorted(self._dependents.get(name, ()))
+            if dependents:
+                return False, f"Overlays extend '{name}': {', '.join(dependents[:5])}"
+            try:
+                template, configs = self._load_set_file(entry["set"])
+                configs.pop(name, None)
+                self._write_set(entry["set"], template, configs)
+            except (ValueError, OSError) as e:
+                return False, f"Error saving overlay: {e}"
+            self.refresh()
+            return True, f"Overlay '{name}' removed"
+
+    # ------------------------------------------------------------------
+    # Materializing
+    # ------------------------------------------------------------------
+
+    def materialize(self, out_dir: Path, names: Optional[List[str]] = None,
+                    force: bool = False) -> Dict:
+        """Write <name>.wsb for overlay configs (default: all of them).
+
+        out_dir/.materialized.json records the input key, content hash and
+        stat of each written file. A file that is untouched since it was
+        written and whose inputs are unchanged is skipped without rendering;
+        one whose rendered result is unchanged is not rewritten. force
+        ignores the manifest and re-checks every file's content.
+        """
+        started = time.perf_counter()
+        out_dir = Path(out_dir)
+        manifest_path = out_dir / MANIFEST_NAME
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+
+        report = {"written": [], "unchanged": 0, "skipped": 0, "errors": {}}
+        dirty = False
+        with self._lock:
+            self.refresh()
+            targets = self.names() if names is None else names
+            checked = misses = 0
+
+            for name in targets:
+                if not valid_config_name(name):
+                    report["errors"][str(name)] = "Invalid configuration name"
+                    continue
+                path = out_dir / f"{name}.wsb"
+                checked += 1
+                try:
+                    key = self._key(name)
+                    record = manifest.get(name)
+                    stat = _stat(path)
+                    current = (not force and record is not None and stat is not None
+                               and record["mtime_ns"] == stat.st_mtime_ns
+                               and record["size"] == stat.st_size)
+                    if current and record["key"] == key:
+                        report["skipped"] += 1
+                        continue
+
+                    misses += name not in self._models
+                    model = self._render(name)
+                    digest = hashlib.sha256(canonical_form(model)).hexdigest()
+                    if current and record["hash"] == digest:
+                        report["unchanged"] += 1
+                    else:
+                        out_dir.mkdir(parents=True, exist_ok=True)
+                        if write_wsb(path, render_xml(model), new_hash=digest,
+                                     current_hash=record["hash"] if current else None):
+                            report["written"].append(name)
+                        else:
+                            report["unchanged"] += 1
+                        stat = path.stat()
+                    manifest[name] = {"key": key, "hash": digest,
+                                      "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+                    dirty = True
+                except (ValueError, OSError) as e:
+                    report["errors"][name] = str(e)
+
+            count_cache("overlay_render", hits=checked - misses, misses=misses)
+
+        if dirty:
+            tmp = manifest_path.with_suffix(".tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, separators=(",", ":"))
+            os.replace(tmp, manifest_path)
+
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        return report
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+
+def default_workspace() -> Path:
+    """The workspace the CLI uses when none is given"""
+    return Path(os.path.expandvars("%USERPROFILE%\\Documents\\wsb-files"))
+
+
+def _parse_override(text: str) -> Tuple[str, object]:
+    """KEY=VALUE, where VALUE is JSON if it parses (8192, false, [...]) and a string otherwise"""
+    key, sep, value = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got '{text}'")
+    try:
+        return key.strip(), json.loads(value)
+    except ValueError:
+        return key.strip(), value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point (also used by `sandman overlay`)"""
+    parser = argparse.ArgumentParser(prog="sandman.py overlay",
+                                     description="Configurations stored as a template plus overrides")
+    parser.add_argument("--workspace", help="workspace directory (default: Documents\\wsb-files)")
+    parser.add_argument("--overlays", help="overlay sets directory (default: <workspace>/overlays)")
+    parser.add_argument("--templates", help="templates directory (default: Sandman's templates)")
+    sub = parser.add_subparsers(dest="command")
+    sub.required = True
+
+    sub.add_parser("list", help="list overlay configs and their bases")
+    show = sub.add_parser("show", help="print a config's overrides and rendered .wsb")
+    show.add_argument("name")
+    add = sub.add_parser("add", help="store a config as a template plus overrides")
+    add.add_argument("name")
+    base = add.add_mutually_exclusive_group(required=True)
+    base.add_argument("--template", help="template to start from")
+    base.add_argument("--extends", help="overlay config to inherit from")
+    add.add_argument("--set", dest="overrides", action="append", default=[], type=_parse_override,
+                     metavar="KEY=VALUE", help="override, e.g. memory_mb=8192 (repeatable)")
+    remove = sub.add_parser("remove", help="delete a config from its overlay set")
+    remove.add_argument("name")
+    materialize = sub.add_parser("materialize", help="write .wsb files for overlay configs")
+    materialize.add_argument("names", nargs="*", help="configs to write (default: all)")
+    materialize.add_argument("--out", help="output directory (default: the workspace)")
+    materialize.add_argument("--force", action="store_true",
+                             help="ignore the manifest and re-check every file")
+    args = parser.parse_args(argv)
+
+    workspace = Path(args.workspace) if args.workspace else default_workspace()
+    resolver = OverlayResolver(Path(args.overlays) if args.overlays else workspace / "overlays",
+                               Path(args.templates) if args.templates else TEMPLATES_DIR)
+
+    if args.command == "list":
+        names = resolver.names()
+        if not names:
+            print("No overlay configurations found")
+        for name in names:
+            entry = resolver.get(name)
+            keys = ", ".join(sorted(entry["overrides"])) or "no overrides"
+            print(f"  {name:30} {'↳' if entry['extends'] else '◆'} {entry['base']:30} {keys}")
+        for name, error in sorted(resolver.errors.items()):
+            print(f"  ✗ {name}: {error}")
+        return 0
+
+    if args.command == "show":
+        entry = resolver.get(args.name)
+        if entry is None:
+            print(f"✗ Overlay '{args.name}' not found")
+            return 3
+        try:
+            model = resolver.resolve(args.name)
+        except ValueError as e:
+            print(f"✗ {e}")
+            return 1
+        kind = "extends" if entry["extends"] else "template"
+        print(f"{args.name}: {kind} {entry['base']} ({entry['set']})")
+        print(json.dumps(entry["overrides"], indent=2))
+        print(render_xml(model))
+        return 0
+
+    if args.command == "add":
+        success, message = resolver.add(args.name, args.template, args.extends, dict(args.overrides))
+    elif args.command == "remove":
+        success, message = resolver.remove(args.name)
+    else:
+        report = resolver.materialize(Path(args.out) if args.out else workspace,
+                                      args.names or None, args.force)
+        for name in report["written"]:
+            print(f"✓ {name}.wsb")
+        for name, error in sorted(report["errors"].items()):
+            print(f"✗ {name}: {error}")
+        print(f"{len(report['written'])} written, {report['unchanged']} unchanged, "
+              f"{report['skipped']} up to date, {len(report['errors'])} failed "
+              f"in {report['seconds']}s")
+        return 1 if report["errors"] else 0
+
+    print(f"{'✓' if success else '✗'} {message}")
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+"""
+Sandman Workspace Packs
+
+A whole workspace in one file: every .wsb configuration plus the state
+files (analytics, profiles, notifications, overlay sets), each stored as a
+zlib-compressed blob, and an index that lists them with offset, length,
+SHA-256, mtime and the parsed summary the workspace index filters on.
+
+Layout (little-endian):
+
+    header   magic, version, entry count, index offset/length, index SHA-256
+    blobs    zlib-compressed file contents, back to back
+    index    meta JSON, compression dictionary, fixed-size records, names
+
+Configurations are small and alike, so each blob is compressed against a
+shared zlib dictionary sampled from the workspace: blobs stay individually
+readable but compress about as well as the workspace would as one stream.
+
+Records hold configurations sorted by name, then the state files, so the
+index is usable straight from a memory map: opening a pack reads only the
+header and meta, a lookup is a binary search over the records, and a
+filtered listing scans them without decompressing anything. A
+WorkspaceIndex can be seeded from a pack (WorkspaceIndex.load_pack) so a
+cold start parses no XML; configurations are parsed on first use.
+
+Usage:
+    python workspace/pack.py create workspace.sandpack
+    python workspace/pack.py list workspace.sandpack --networking Disable
+    python workspace/pack.py cat workspace.sandpack dev-box
+    python workspace/pack.py verify workspace.sandpack
+    python workspace/pack.py unpack workspace.sandpack --out C:\\Temp\\restored
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from workspace.canonical import canonical_form
+from workspace.model import parse_model
+
+
+MAGIC = b"SANDPAK\x01"
+VERSION = 1
+PACK_SUFFIX = ".sandpack"
+
+# magic, version, entry count, index offset, index length, index SHA-256
+HEADER = struct.Struct("<8sIIQQ32s")
+# name offset, name length, kind, has_rw (-1 unknown), networking (index
+# into meta["networking"], at most MAX_NETWORKING_VALUES distinct values;
+# the rest are stored as unknown), memory_mb (-1 unknown), mtime_ns, raw size,
+# blob offset, blob length, SHA-256 of the raw bytes, canonical hash
+RECORD = struct.Struct("<IHBbBxxxiqQQQ32s32s")
+MAX_NETWORKING_VALUES = 256
+
+KIND_CONFIG = 0
+KIND_FILE = 1
+
+# Workspace state stored next to the configurations
+STATE_FILES = ["analytics.json", "profiles.json",
+               "notifications-config.json", "notifications-history.json"]
+STATE_DIRS = {"overlays": ".json"}
+
+NO_HASH = b"\0" * 32
+
+# zlib looks back at most 32 KB, so a larger dictionary would not help
+DICTIONARY_SIZE = 32768
+DICTIONARY_SAMPLES = 64
+
+
+def _summary(data: bytes) -> Tuple[Optional[int], Optional[str], Optional[bool], bytes]:
+    """memory_mb, networking, has_rw and canonical hash of a .wsb file;
+    unknown (None) when it does not parse, as in the workspace index"""
+    try:
+        model = parse_model(data)
+    except ValueError:
+        return None, None, None, NO_HASH
+    memory = model["settings"]["memory_mb"]
+    if not isinstance(memory, int) or not 0 <= memory < 2 ** 31:
+        return None, None, None, hashlib.sha256(canonical_form(model)).digest()
+    has_rw = any(not folder["readonly"] for folder in model["folders"].values())
+    return (memory, model["settings"]["networking"], has_rw,
+            hashlib.sha256(canonical_form(model)).digest())
+
+
+def _workspace_files(workspace: Path) -> List[Tuple[int, str, Path]]:
+    """(kind, name, path) for everything a pack holds, in record order"""
+    configs = []
+    try:
+        scan = list(os.scandir(workspace))
+    except FileNotFoundError:
+        scan = []
+    for entry in scan:
+        if entry.name.endswith(".wsb") and entry.is_file():
+            configs.append((KIND_CONFIG, entry.name[:-4], Path(entry.path)))
+    configs.sort(key=lambda item: item[1].encode("utf-8"))
+
+    files = [(KIND_FILE, name, workspace / name) for name in STATE_FILES
+             if (workspace / name).is_file()]
+    for directory, suffix in STATE_DIRS.items():
+        if (workspace / directory).is_dir():
+            files.extend((KIND_FILE, f"{directory}/{path.name}", path)
+                         for path in sorted((workspace / directory).iterdir())
+                         if path.suffix == suffix and path.is_file())
+    return configs + files
+
+
+def _dictionary(items: List[Tuple[int, str, Path]]) -> bytes:
+    """Compression dictionary: configurations sampled evenly across the workspace"""
+    configs = [path for kind, _, path in items if kind == KIND_CONFIG]
+    step = max(1, len(configs) // DICTIONARY_SAMPLES)
+    sample = b""
+    for path in configs[::step][:DICTIONARY_SAMPLES]:
+        with open(path, 'rb') as f:
+            sample += f.read()
+    return sample[-DICTIONARY_SIZE:]
+
+
+def create_pack(workspace: Path, out_path: Path, level: int = 6,
+                progress: Optional[Callable[[int], None]] = None) -> Dict:
+    """Pack a workspace into a single file; returns counts and sizes.
+
+    The pack is written to a temporary file and renamed into place, so an
+    existing pack is never left half-written.
+    """
+    started = time.perf_counter()
+    workspace, out_path = Path(workspace), Path(out_path)
+    items = _workspace_files(workspace)
+    dictionary = _dictionary(items)
+    # Priming a compressor with the dictionary costs more than compressing
+    # a small file; copying a primed one does not
+    primed = zlib.compressobj(level, zdict=dictionary) if dictionary else zlib.compressobj(level)
+    networking_values: List[Optional[str]] = [None]
+    networking_codes = {None: 0}
+    networking_dropped = 0
+
+    records = []
+    names = bytearray()
+    raw_total = 0
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp, 'wb') as f:
+        f.write(b"\0" * HEADER.size)
+        offset = HEADER.size
+        for count, (kind, name, path) in enumerate(items, 1):
+            with open(path, 'rb') as source:
+                data = source.read()
+            stat = os.stat(path)
+            compressor = primed.copy()
+            blob = compressor.compress(data) + compressor.flush()
+            f.write(blob)
+
+            memory, networking, has_rw, canonical = (
+                _summary(data) if kind == KIND_CONFIG else (None, None, None, NO_HASH))
+            if networking not in networking_codes:
+                if len(networking_values) < MAX_NETWORKING_VALUES:
+                    networking_codes[networking] = len(networking_values)
+                    networking_values.append(networking)
+                else:
+                    # Only hand-edited files get this many distinct values
+                    networking = None
+                    networking_dropped += 1
+
+            encoded = name.encode("utf-8")
+            records.append(RECORD.pack(
+                len(names), len(encoded), kind, -1 if has_rw is None else int(has_rw),
+                networking_codes[networking], -1 if memory is None else memory,
+                stat.st_mtime_ns, len(data), offset, len(blob),
+                hashlib.sha256(data).digest(), canonical))
+            names += encoded
+            offset += len(blob)
+            raw_total += len(data)
+            if progress and count % 10000 == 0:
+                progress(count)
+
+        configs = sum(1 for kind, _, _ in items if kind == KIND_CONFIG)
+        meta = json.dumps({
+            "created": datetime.now().isoformat(),
+            "workspace": str(workspace),
+            "configs": configs,
+            "networking": networking_values,
+            "dictionary": len(dictionary)
+        }).encode("utf-8")
+        index = (struct.pack("<I", len(meta)) + meta + dictionary
+                 + b"".join(records) + bytes(names))
+        f.write(index)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(items), offset, len(index),
+                            hashlib.sha256(index).digest()))
+    os.replace(tmp, out_path)
+
+    return {"configs": configs, "files": len(items) - configs, "raw_bytes": raw_total,
+            "pack_bytes": offset + len(index), "networking_dropped": networking_dropped,
+            "seconds": round(time.perf_counter() - started, 3)}
+
+
+class PackReader:
+    """Read-only, memory-mapped view of a pack"""
+
+    def __init__(self, path: Path):
+        """Map a pack and read its header; raises ValueError if it is not one"""
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{self.path} is not a Sandman pack")
+
+        try:
+            self._read_header()
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_header(self):
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{self.path} is not a Sandman pack")
+        magic, version, self.count, self.index_offset, self.index_length, self.index_hash = \
+            HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a Sandman pack")
+        if version != VERSION:
+            raise ValueError(f"{self.path}: unsupported pack version {version}")
+        if self.index_offset + self.index_length > len(self._map):
+            raise ValueError(f"{self.path} is truncated")
+        if self.index_length < 4:
+            raise ValueError(f"{self.path}: damaged index (too short)")
+
+        meta_length, = struct.unpack_from("<I", self._map, self.index_offset)
+        meta_start = self.index_offset + 4
+        try:
+            if 4 + meta_length > self.index_length:
+                raise ValueError("metadata runs past the index")
+            self.meta = json.loads(self._map[meta_start:meta_start + meta_length])
+            self.config_count = self.meta["configs"]
+            self._networking = self.meta["networking"]
+            dictionary_length = self.meta["dictionary"]
+            if not isinstance(dictionary_length, int) or dictionary_length < 0:
+                raise ValueError("invalid dictionary length")
+            # The header is not covered by the index checksum, so its record
+            # count must be checked against the index before it is used
+            if 4 + meta_length + dictionary_length + self.count * RECORD.size > self.index_length:
+                raise ValueError(f"{self.count} records do not fit in the index")
+            if not isinstance(self.config_count, int) or not 0 <= self.config_count <= self.count:
+                raise ValueError("invalid configuration count")
+            dictionary_start = meta_start + meta_length
+            self._dictionary = self._map[dictionary_start:dictionary_start + dictionary_length]
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"{self.path}: damaged index ({e})")
+        self._records = dictionary_start + len(self._dictionary)
+        self._names = self._records + self.count * RECORD.size
+
+    def close(self):
+        """Unmap the pack"""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.config_count
+
+    # ------------------------------------------------------------------
+    # Records
+    # ------------------------------------------------------------------
+
+    def _record(self, position: int) -> Tuple:
+        return RECORD.unpack_from(self._map, self._records + position * RECORD.size)
+
+    def _name_bytes(self, record: Tuple) -> bytes:
+        start = self._names + record[0]
+        return self._map[start:start + record[1]]
+
+    def _name(self, record: Tuple) -> str:
+        return self._name_bytes(record).decode("utf-8")
+
+    def _iter_records(self) -> Iterator[Tuple]:
+        end = self._records + self.count * RECORD.size
+        return RECORD.iter_unpack(self._map[self._records:end])
+
+    def _find(self, name: str, kind: int = KIND_CONFIG) -> Optional[Tuple]:
+        if kind == KIND_FILE:
+            for position in range(self.config_count, self.count):
+                record = self._record(position)
+                if self._name(record) == name:
+                    return record
+            return None
+
+        # Binary search over the mapped records; only the names it visits are read
+        target = name.encode("utf-8")
+        low, high = 0, self.config_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name_bytes(self._record(middle)) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.config_count:
+            record = self._record(low)
+            if self._name_bytes(record) == target:
+                return record
+        return None
+
+    def _info(self, record: Tuple) -> Dict:
+        (_, _, kind, has_rw, networking, memory, mtime_ns, size,
+         _, blob_length, digest, canonical) = record
+        info = {"name": self._name(record), "kind": "config" if kind == KIND_CONFIG else "file",
+                "size": size, "packed_size": blob_length, "mtime_ns": mtime_ns,
+                "sha256": digest.hex()}
+        if kind == KIND_CONFIG:
+            info.update({
+                "memory_mb": None if memory < 0 else memory,
+                "networking": self._networking[networking],
+                "has_rw": None if has_rw < 0 else bool(has_rw),
+                "content_hash": canonical.hex() if canonical != NO_HASH else None
+            })
+        return info
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def names(self) -> List[str]:
+        """Names of the packed configurations, sorted"""
+        start = self._names
+        return [self._map[start + record[0]:start + record[0] + record[1]].decode("utf-8")
+                for record in self._iter_records() if record[2] == KIND_CONFIG]
+
+    def files(self) -> List[str]:
+        """Relative paths of the packed state files"""
+        return [self._name(self._record(position))
+                for position in range(self.config_count, self.count)]
+
+    def info(self, name: str) -> Optional[Dict]:
+        """Index record of a configuration (None if it is not in the pack)"""
+        record = self._find(name)
+        return self._info(record) if record else None
+
+    def entries(self) -> Iterator[Dict]:
+        """Index records of every configuration, in name order"""
+        for record in self._iter_records():
+            if record[2] == KIND_CONFIG:
+                yield self._info(record)
+
+    def summaries(self) -> Iterator[Tuple]:
+        """(name, size, mtime_ns, memory_mb, networking, has_rw, content_hash)
+        for every configuration: the fields a workspace index needs, without
+        building a dict per record"""
+        start, networking = self._names, self._networking
+        for record in self._iter_records():
+            if record[2] != KIND_CONFIG:
+                break
+            yield (self._map[start + record[0]:start + record[0] + record[1]].decode("utf-8"),
+                   record[7], record[6], None if record[5] < 0 else record[5],
+                   networking[record[4]], None if record[3] < 0 else bool(record[3]),
+                   record[11].hex() if record[11] != NO_HASH else None)
+
+    def select(self, networking: Optional[str] = None, memory_min: Optional[int] = None,
+               memory_max: Optional[int] = None, has_rw: Optional[bool] = None) -> List[str]:
+        """Names of the configurations matching the workspace index filters,
+        answered from the records alone"""
+        code = None
+        if networking is not None:
+            if networking not in self._networking:
+                return []
+            code = self._networking.index(networking)
+
+        names = []
+        start = self._names
+        for record in self._iter_records():
+            if record[2] != KIND_CONFIG:
+                break
+            memory = record[5]
+            if code is not None and record[4] != code:
+                continue
+            if memory_min is not None and (memory < 0 or memory < memory_min):
+                continue
+            if memory_max is not None and (memory < 0 or memory > memory_max):
+                continue
+            if has_rw is not None and record[3] != int(has_rw):
+                continue
+            names.append(self._map[start + record[0]:start + record[0] + record[1]].decode("utf-8"))
+        return names
+
+    def _read(self, record: Tuple, check: bool = True) -> bytes:
+        offset, length = record[8], record[9]
+        decompressor = zlib.decompressobj(zdict=self._dictionary) if self._dictionary else \
+            zlib.decompressobj()
+        data = decompressor.decompress(self._map[offset:offset + length]) + decompressor.flush()
+        if check and (len(data) != record[7] or hashlib.sha256(data).digest() != record[10]):
+            raise ValueError(f"{self._name(record)}: content does not match its checksum")
+        return data
+
+    def read(self, name: str) -> Optional[bytes]:
+        """Contents of a configuration (None if it is not in the pack);
+        raises ValueError if the blob is corrupt"""
+        record = self._find(name)
+        return self._read(record) if record else None
+
+    def read_file(self, name: str) -> Optional[bytes]:
+        """Contents of a state file, e.g. "profiles.json" """
+        record = self._find(name, KIND_FILE)
+        return self._read(record) if record else None
+
+    def verify(self) -> List[str]:
+        """Check the index hash and every blob; returns the problems found"""
+        problems = []
+        index = self._map[self.index_offset:self.index_offset + self.index_length]
+        if hashlib.sha256(index).digest() != self.index_hash:
+            problems.append("index does not match its checksum")
+        for record in self._iter_records():
+            try:
+                self._read(record)
+            except (ValueError, zlib.error) as e:
+                problems.append(str(e) if isinstance(e, ValueError)
+                                else f"{self._name(record)}: {e}")
+        return problems
+
+
+def _target_path(out_dir: Path, kind: int, name: str) -> Path:
+    """Where a record is unpacked to; names that would escape out_dir are rejected"""
+    relative = Path(f"{name}.wsb" if kind == KIND_CONFIG else name)
+    if relative.is_absolute() or ".." in relative.parts or relative.drive:
+        raise ValueError(f"Unsafe path in pack: {name}")
+    return out_dir / relative
+
+
+def unpack(pack_path: Path, out_dir: Path, overwrite: bool = False) -> Dict:
+    """Restore a pack's files into out_dir, keeping their mtimes.
+
+    Files that already hold the packed content are left alone; files with
+    different content are reported as conflicts unless overwrite is set.
+    Keeping the mtimes lets a WorkspaceIndex seeded from the same pack
+    trust the restored files without parsing them.
+    """
+    started = time.perf_counter()
+    out_dir = Path(out_dir)
+    report = {"written": 0, "unchanged": 0, "conflicts": [], "errors": {}}
+
+    with PackReader(pack_path) as pack:
+        for record in pack._iter_records():
+            name = pack._name(record)
+            try:
+                path = _target_path(out_dir, record[2], name)
+                if path.exists():
+                    with open(path, 'rb') as f:
+                        if hashlib.sha256(f.read()).digest() == record[10]:
+                            report["unchanged"] += 1
+                            continue
+                    if not overwrite:
+                        report["conflicts"].append(name)
+                        continue
+                data = pack._read(record)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, 'wb') as f:
+                    f.write(data)
+                os.utime(path, ns=(record[6], record[6]))
+                report["written"] += 1
+            except (ValueError, OSError, zlib.error) as e:
+                report["errors"][name] = str(e)
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+
+def default_workspace() -> Path:
+    """The workspace the CLI uses when none is given"""
+    return Path(os.path.expandvars("%USERPROFILE%\\Documents\\wsb-files"))
+
+
+def _size(size: int) -> str:
+    for unit in ["B", "KB", "MB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point (also used by `sandman pack`)"""
+    parser = argparse.ArgumentParser(prog="sandman.py pack",
+                                     description="Single-file workspace packs")
+    sub = parser.add_subparsers(dest="command")
+    sub.required = True
+
+    create = sub.add_parser("create", help="pack a workspace into one file")
+    create.add_argument("pack", help=f"pack file to write (e.g. workspace{PACK_SUFFIX})")
+    create.add_argument("--workspace", help="workspace directory (default: Documents\\wsb-files)")
+    create.add_argument("--level", type=int, default=6, help="zlib compression level 0-9 (default 6)")
+    listing = sub.add_parser("list", help="list packed configurations without unpacking")
+    listing.add_argument("pack")
+    listing.add_argument("--networking", help="only this networking mode")
+    listing.add_argument("--memory-min", type=int)
+    listing.add_argument("--memory-max", type=int)
+    listing.add_argument("--has-rw", choices=["true", "false"], help="has read-write mappings")
+    listing.add_argument("--json", action="store_true", help="print index records as JSON lines")
+    cat = sub.add_parser("cat", help="print a packed configuration")
+    cat.add_argument("pack")
+    cat.add_argument("name")
+    verify = sub.add_parser("verify", help="check every blob against its checksum")
+    verify.add_argument("pack")
+    restore = sub.add_parser("unpack", help="restore a pack into a directory")
+    restore.add_argument("pack")
+    restore.add_argument("--out", help="target directory (default: the workspace)")
+    restore.add_argument("--overwrite", action="store_true",
+                         help="replace files whose content differs from the pack")
+    args = parser.parse_args(argv)
+
+    if args.command == "create":
+        workspace = Path(args.workspace) if args.workspace else default_workspace()
+        try:
+            stats = create_pack(workspace, Path(args.pack), args.level,
+                                progress=lambda n: print(f"  {n} files...", file=sys.stderr))
+        except OSError as e:
+            print(f"✗ {e}")
+            return 1
+        print(f"✓ Packed {stats['configs']} configurations and {stats['files']} state files: "
+              f"{_size(stats['raw_bytes'])} → {_size(stats['pack_bytes'])} in {stats['seconds']}s")
+        if stats["networking_dropped"]:
+            print(f"  {stats['networking_dropped']} configurations have a networking value beyond "
+                  f"the first {MAX_NETWORKING_VALUES - 1} distinct ones; it is listed as unknown")
+        return 0
+
+    if args.command == "unpack":
+        out_dir = Path(args.out) if args.out else default_workspace()
+        try:
+            report = unpack(Path(args.pack), out_dir, args.overwrite)
+        except (ValueError, OSError) as e:
+            print(f"✗ {e}")
+            return 1
+        for name in report["conflicts"]:
+            print(f"✗ {name}: differs from the pack (use --overwrite)")
+        for name, error in sorted(report["errors"].items()):
+            print(f"✗ {name}: {error}")
+        print(f"{report['written']} written, {report['unchanged']} unchanged, "
+              f"{len(report['conflicts'])} conflicts in {report['seconds']}s")
+        return 1 if report["conflicts"] or report["errors"] else 0
+
+    try:
+        pack = PackReader(Path(args.pack))
+    except (ValueError, OSError) as e:
+        print(f"✗ {e}")
+        return 1
+
+    with pack:
+        if args.command == "list":
+            filters = {"networking": args.networking, "memory_min": args.memory_min,
+                       "memory_max": args.memory_max,
+                       "has_rw": None if args.has_rw is None else args.has_rw == "true"}
+            names = pack.select(**filters) if any(v is not None for v in filters.values()) \
+                else pack.names()
+            for name in names:
+                if args.json:
+                    print(json.dumps(pack.info(name)))
+                else:
+                    info = pack.info(name)
+                    print(f"  {name:40} {info['memory_mb'] or '?':>6} MB  "
+                          f"{info['networking'] or '?':8} {_size(info['size'])}")
+            if not args.json:
+                print(f"{len(names)} of {len(pack)} configurations")
+            return 0
+
+        if args.command == "cat":
+            try:
+                data = pack.read(args.name)
+                if data is None:
+                    data = pack.read_file(args.name)
+            except (ValueError, zlib.error) as e:
+                print(f"✗ {e}")
+                return 1
+            if data is None:
+                print(f"✗ '{args.name}' is not in the pack")
+                return 3
+            sys.stdout.write(data.decode("utf-8", errors="replace"))
+            return 0
+
+        problems = pack.verify()
+        for problem in problems:
+            print(f"✗ {problem}")
+        if problems:
+            return 1
+        print(f"✓ {pack.count} files verified ({len(pack)} configurations)")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())